@@ -0,0 +1,3 @@
+# app/bench/__init__.py
+# Offline benchmarks. Run from the repo root, e.g.
+#   python -m app.bench.pantry_embedding
@@ -0,0 +1,71 @@
+# app/bench/artifact_load.py
+"""
+Load time and memory of recommender artifact formats.
+
+    python -m app.bench.artifact_load legacy v3
+
+Each version is loaded in a fresh interpreter (so the numbers don't share
+caches or heap): time to open the artifacts, time to build the indexes,
+time to format 100 results, and RSS after each step.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from .common import Timer, rss_mb
+
+
+def _measure(version: str) -> dict:
+    from ..services.artifacts import load_version
+
+    base = rss_mb()
+    with Timer() as t_load:
+        catalog = load_version(version, verify=False)
+    rss_load = rss_mb()
+    with Timer() as t_warm:
+        catalog.warm()
+    rss_warm = rss_mb()
+    with Timer() as t_rows:
+        for i in range(0, len(catalog), max(1, len(catalog) // 100)):
+            catalog.record(i)
+
+    return {
+        "version": version,
+        "recipes": len(catalog),
+        "load_s": t_load.seconds,
+        "warm_s": t_warm.seconds,
+        "rows_ms": t_rows.seconds * 1000.0,
+        "rss_load_mb": rss_load - base,
+        "rss_warm_mb": rss_warm - base,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("versions", nargs="+")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_measure(args.versions[0])))
+        return
+
+    print(f"{'version':<12} {'recipes':>8} {'load s':>8} {'warm s':>8} "
+          f"{'100 rows ms':>12} {'RSS load MB':>12} {'RSS warm MB':>12}")
+    for version in args.versions:
+        out = subprocess.run(
+            [sys.executable, "-m", "app.bench.artifact_load", "--child", version],
+            check=True, capture_output=True, text=True, env=os.environ,
+        ).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(f"{r['version']:<12} {r['recipes']:>8} {r['load_s']:>8.3f} "
+              f"{r['warm_s']:>8.3f} {r['rows_ms']:>12.2f} "
+              f"{r['rss_load_mb']:>12.1f} {r['rss_warm_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
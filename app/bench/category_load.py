@@ -0,0 +1,83 @@
+# app/bench/category_load.py
+"""
+Import time and memory of the category classifier: the training pickles
+(joblib, what category_service used to load at import) against the
+exported arrays (services/category_model.py, memory-mapped on first use).
+
+    python -m app.bench.category_load [pickle npy]
+
+Each format runs in a fresh interpreter: time to import
+app.services.category_service (pickle: to joblib.load both pickles), time
+of the first tag_categories call, and RSS growth after each step.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from .common import Timer, rss_mb
+
+FORMATS = ("pickle", "npy")
+SAMPLE = ["2 chicken breasts", "1 tbsp olive oil", "salt", "pepper"]
+
+
+def _measure(fmt: str) -> dict:
+    base = rss_mb()
+    if fmt == "pickle":
+        with Timer() as t_import:
+            import joblib
+
+            from ..config import CATEGORY_CLASSIFIER_PATH, CATEGORY_VECTORIZER_PATH
+
+            model = joblib.load(CATEGORY_CLASSIFIER_PATH)
+            vectorizer = joblib.load(CATEGORY_VECTORIZER_PATH)
+        rss_import = rss_mb()
+        with Timer() as t_first:
+            model.predict(vectorizer.transform([" ".join(SAMPLE).lower()])).tolist()
+    else:
+        with Timer() as t_import:
+            from ..services import category_service
+        rss_import = rss_mb()
+        with Timer() as t_first:
+            category_service.tag_categories(SAMPLE)
+
+    return {
+        "format": fmt,
+        "import_ms": t_import.seconds * 1000.0,
+        "first_ms": t_first.seconds * 1000.0,
+        "rss_import_mb": rss_import - base,
+        "rss_first_mb": rss_mb() - base,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("formats", nargs="*", help=f"any of {', '.join(FORMATS)}")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    formats = args.formats or list(FORMATS)
+    for fmt in set(formats) - set(FORMATS):
+        parser.error(f"unknown format {fmt!r}")
+
+    if args.child:
+        print(json.dumps(_measure(formats[0])))
+        return
+
+    print(f"{'format':<8} {'import ms':>10} {'first call ms':>14} "
+          f"{'RSS import MB':>14} {'RSS first MB':>13}")
+    for fmt in formats:
+        out = subprocess.run(
+            [sys.executable, "-m", "app.bench.category_load", "--child", fmt],
+            check=True, capture_output=True, text=True, env=os.environ,
+        ).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        print(f"{r['format']:<8} {r['import_ms']:>10.1f} {r['first_ms']:>14.2f} "
+              f"{r['rss_import_mb']:>14.1f} {r['rss_first_mb']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
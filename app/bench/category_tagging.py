@@ -0,0 +1,70 @@
+# app/bench/category_tagging.py
+"""
+Category tagging throughput: one tag_categories call per ingredient list
+against one tag_categories_batch call for the whole batch.
+
+    python -m app.bench.category_tagging [--sizes 1 10 100 1000 10000] [--top-k 3]
+
+Ingredient lists are the (quantity-stripped) ingredient lines of held-out
+recipes, cycled to fill the largest batch. Reported per batch size: lists/s
+of the per-item loop and of the batched call, and the speed-up. The
+per-item loop is capped at --loop-max lists and extrapolated above it.
+"""
+from __future__ import annotations
+
+import argparse
+
+import pandas as pd
+
+from ..services import category_service
+from .common import TEST_CSV, Timer, _strip_quantity
+
+
+def ingredient_lists(n: int, csv_path: str = TEST_CSV):
+    df = pd.read_csv(csv_path, usecols=["ingredients_text"]).dropna()
+    lists = [
+        [x for x in (_strip_quantity(line) for line in text.split(",")) if x]
+        for text in df["ingredients_text"]
+    ]
+    lists = [x for x in lists if x]
+    return [lists[i % len(lists)] for i in range(n)]
+
+
+def _rate(fn, n: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        with Timer() as t:
+            fn()
+        best = min(best, t.seconds)
+    return n / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--loop-max", type=int, default=2000,
+                        help="most lists timed one call at a time")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--csv", default=TEST_CSV)
+    args = parser.parse_args()
+
+    lists = ingredient_lists(max(args.sizes), args.csv)
+    category_service.tag_categories_batch(lists[:8], args.top_k)  # warm up
+
+    print(f"{len(category_service.get_model().classes)} classes, top_k={args.top_k}")
+    print(f"{'batch':>7} {'loop/s':>10} {'batch/s':>10} {'speed-up':>9}")
+    for size in args.sizes:
+        batch = lists[:size]
+        looped = batch[:args.loop_max]
+        loop_rate = _rate(lambda: [category_service.tag_categories(x) for x in looped],
+                          len(looped), args.repeat)
+        batch_rate = _rate(lambda: category_service.tag_categories_batch(batch, args.top_k),
+                           size, args.repeat)
+        print(f"{size:>7} {loop_rate:>10.0f} {batch_rate:>10.0f} "
+              f"{batch_rate / loop_rate:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
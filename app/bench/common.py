@@ -0,0 +1,64 @@
+# app/bench/common.py
+from __future__ import annotations
+
+import random
+import re
+import resource
+import time
+from typing import List
+
+import pandas as pd
+
+TEST_CSV = "data/processed/appetite_test.csv"
+VAL_CSV = "data/processed/appetite_val.csv"
+
+_QTY_RE = re.compile(r"^[\d\s/\.\-½¼¾⅓⅔]+")
+
+
+def _strip_quantity(line: str) -> str:
+    return _QTY_RE.sub("", line).strip().lower()
+
+
+def sample_pantries(n: int = 200, min_size: int = 3, max_size: int = 8,
+                    csv_path: str = TEST_CSV, seed: int = 13) -> List[List[str]]:
+    """Random pantries built from ingredient lines of held-out recipes."""
+    rng = random.Random(seed)
+    df = pd.read_csv(csv_path, usecols=["ingredients_text"]).dropna()
+    texts = df["ingredients_text"].tolist()
+
+    pantries = []
+    while len(pantries) < n:
+        lines = [_strip_quantity(x) for x in rng.choice(texts).split(",")]
+        lines = [x for x in lines if x]
+        if len(lines) < min_size:
+            continue
+        size = rng.randint(min_size, min(max_size, len(lines)))
+        pantries.append(rng.sample(lines, size))
+    return pantries
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self.start
+
+
+def percentile_ms(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))
+    return ordered[idx] * 1000.0
+
+
+def rss_mb() -> float:
+    """Current resident set size (Linux /proc), else peak RSS."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
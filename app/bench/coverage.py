@@ -0,0 +1,59 @@
+# app/bench/coverage.py
+"""
+"Cook now" query latency as the catalog grows.
+
+    python -m app.bench.coverage legacy synth-100k synth-1m [--n 200] [--k 2]
+
+Per version: the one-off cost of the canonical ingredient sets and the
+coverage index, then p50/p95 of CoverageIndex.query for sample pantries
+against a full scan (row lengths minus IdSets.overlap_counts over every
+recipe), and how many recipes qualify.
+"""
+from __future__ import annotations
+
+import argparse
+
+from ..services.artifacts import load_version
+from ..services.ingredient_parser import canonical_names
+from .common import Timer, percentile_ms, sample_pantries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("versions", nargs="+")
+    parser.add_argument("--n", type=int, default=200)
+    parser.add_argument("--k", type=int, default=2)
+    args = parser.parse_args()
+
+    pantries = [canonical_names(", ".join(p).lower())
+                for p in sample_pantries(n=args.n, min_size=5, max_size=15)]
+
+    print(f"{'version':<12} {'recipes':>9} {'build s':>8} {'query p50':>10} "
+          f"{'query p95':>10} {'scan p50':>9} {'matches':>8}")
+    for version in args.versions:
+        catalog = load_version(version, verify=False)
+        with Timer() as t_build:
+            coverage = catalog.coverage()
+        ingredients = coverage.ingredients
+
+        query, scan, matches = [], [], 0
+        for names in pantries:
+            with Timer() as t:
+                ids, _, _ = coverage.query(names, args.k)
+            query.append(t.seconds)
+            matches += len(ids)
+
+            owned = ingredients.vocab.encode(coverage.covered_names(names))
+            with Timer() as t:
+                missing = coverage.needed - ingredients.overlap_counts(owned)
+                (missing <= args.k).nonzero()
+            scan.append(t.seconds)
+
+        print(f"{version:<12} {len(catalog):>9} {t_build.seconds:>8.2f} "
+              f"{percentile_ms(query, 50):>10.3f} {percentile_ms(query, 95):>10.3f} "
+              f"{percentile_ms(scan, 50):>9.3f} {matches / len(pantries):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# app/bench/encoder_batching.py
+"""
+Query encoder throughput under concurrent load, with and without
+cross-request micro-batching (services/batching_encoder.py).
+
+    python -m app.bench.encoder_batching [--threads 1 4 16 64] [--calls 50]
+                                         [--backend onnx] [--max-wait-ms 2] [--max-items 5]
+
+Each of T client threads encodes --calls distinct single pantries, one
+encode([text]) call each, as API requests do on cache misses. Reported
+per T: texts/s over the whole run, p50 / p95 latency of one call, and for
+the batched encoder the mean forward-pass batch size.
+"""
+from __future__ import annotations
+
+import argparse
+import threading
+
+from ..config import (
+    EMBED_BACKEND,
+    ENCODER_MAX_BATCH,
+    ENCODER_MAX_WAIT_MS,
+    RECOMMENDER_EMBEDDING_MODEL,
+)
+from ..services.batching_encoder import BatchingEncoder
+from .common import Timer, percentile_ms, sample_pantries
+
+
+def _load(threads: int, calls: int, encoder, texts):
+    samples = [[] for _ in range(threads)]
+
+    def _client(i):
+        for text in texts[i * calls:(i + 1) * calls]:
+            with Timer() as t:
+                encoder.encode([text])
+            samples[i].append(t.seconds)
+
+    workers = [threading.Thread(target=_client, args=(i,)) for i in range(threads)]
+    with Timer() as wall:
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+    flat = [s for per in samples for s in per]
+    return len(flat) / wall.seconds, percentile_ms(flat, 50), percentile_ms(flat, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--calls", type=int, default=50, help="encode calls per thread")
+    parser.add_argument("--max-items", type=int, default=5, help="ingredients per pantry")
+    parser.add_argument("--backend", default=EMBED_BACKEND)
+    parser.add_argument("--max-batch", type=int, default=ENCODER_MAX_BATCH or 64)
+    parser.add_argument("--max-wait-ms", type=float, default=ENCODER_MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    from ..deps import load_embed_model
+
+    model = load_embed_model(RECOMMENDER_EMBEDDING_MODEL, backend=args.backend)
+    model.encode(["warm up"])
+    pantries = sample_pantries(n=max(args.threads) * args.calls, min_size=2,
+                               max_size=args.max_items, seed=7)
+    # Distinct texts, so no two calls in a batch are deduplicated
+    texts = [f"Ingredients: {', '.join(p)} #{i}" for i, p in enumerate(pantries)]
+
+    print(f"{args.backend}: max_batch={args.max_batch}, max_wait={args.max_wait_ms} ms")
+    print(f"{'threads':>7} {'mode':>8} {'texts/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'batch':>6}")
+    for threads in args.threads:
+        qps, p50, p95 = _load(threads, args.calls, model, texts)
+        print(f"{threads:>7} {'direct':>8} {qps:>9.0f} {p50:>8.2f} {p95:>8.2f} {1:>6}")
+
+        batching = BatchingEncoder(model, args.max_batch, args.max_wait_ms / 1000.0)
+        qps, p50, p95 = _load(threads, args.calls, batching, texts)
+        mean_batch = batching.stats["texts"] / max(batching.stats["batches"], 1)
+        print(f"{threads:>7} {'batched':>8} {qps:>9.0f} {p50:>8.2f} {p95:>8.2f} "
+              f"{mean_batch:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
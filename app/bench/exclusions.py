@@ -0,0 +1,70 @@
+# app/bench/exclusions.py
+"""
+Cost of allergen / ingredient exclusions against a category filter.
+
+    python -m app.bench.exclusions legacy synth-100k [--n 300] [--category dessert]
+
+Per version: the one-off cost of resolving and masking the ten default
+exclusions (nine allergen groups plus one ingredient), then p50/p95 of
+recommend_recipes with no filter, with one category, with the exclusions,
+and with both. Pantry embeddings are cached first so only retrieval and
+scoring are timed.
+"""
+from __future__ import annotations
+
+import argparse
+
+from .. import deps
+from ..services import recommender
+from ..services.artifacts import load_version
+from ..services.exclusions import ALLERGEN_GROUPS
+from .common import Timer, percentile_ms, sample_pantries
+
+EXCLUDE = sorted(ALLERGEN_GROUPS) + ["cilantro"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("versions", nargs="+")
+    parser.add_argument("--n", type=int, default=300)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--category", default="dessert")
+    args = parser.parse_args()
+
+    queries = [", ".join(p) for p in sample_pantries(n=args.n)]
+    cases = (
+        ("none", None, None),
+        ("category", args.category, None),
+        ("exclude 10", None, EXCLUDE),
+        ("both", args.category, EXCLUDE),
+    )
+
+    print(f"{'version':<12} {'recipes':>9} {'excluded':>9} {'mask ms':>8}  "
+          + "  ".join(f"{label + ' p50/p95':>22}" for label, _, _ in cases))
+    for version in args.versions:
+        catalog = load_version(version, verify=False).warm()
+        deps.set_catalog(catalog)
+        for q in queries:
+            recommender.recommend_recipes(q, args.top_k)
+
+        with Timer() as t_mask:
+            mask = catalog.exclusion_mask(EXCLUDE)
+
+        cells = []
+        for _, category, exclude in cases:
+            samples = []
+            for q in queries:
+                with Timer() as t:
+                    recommender.recommend_recipes(q, args.top_k, category=category,
+                                                  exclude=exclude)
+                samples.append(t.seconds)
+            cells.append(f"{percentile_ms(samples, 50):>10.3f}/"
+                         f"{percentile_ms(samples, 95):<11.3f}")
+
+        print(f"{version:<12} {len(catalog):>9} {int(mask.sum()):>9} "
+              f"{t_mask.seconds * 1e3:>8.2f}  " + "  ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
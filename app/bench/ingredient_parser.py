@@ -0,0 +1,78 @@
+# app/bench/ingredient_parser.py
+"""
+Ingredient parser throughput and its effect on the word index.
+
+    python -m app.bench.ingredient_parser [--catalog] [--n 300]
+
+Parses every recipe of data/processed/*.csv (or, with --catalog, the
+active catalog's ingredients_text) under both word schemes: recipes and
+lines per second (parse cache cleared first, then again warm), then the
+vocabulary size, total ids and IdSets bytes, and the latency of
+IngredientIndex.match_counts for sample pantries.
+"""
+from __future__ import annotations
+
+import argparse
+
+import pandas as pd
+
+from ..services.ingredient_parser import WORD_SCHEME, parse_line, split_lines, word_set_fn
+from ..services.recipe_index import IngredientIndex
+from ..services.vocab import IdSets
+from .common import TEST_CSV, VAL_CSV, Timer, percentile_ms, sample_pantries
+
+SCHEMES = ("split", WORD_SCHEME)
+
+
+def _texts(from_catalog: bool):
+    if from_catalog:
+        from ..deps import get_catalog
+
+        texts = get_catalog().column("ingredients_text")
+    else:
+        texts = pd.concat([pd.read_csv(p, usecols=["ingredients_text"])
+                           for p in (TEST_CSV, VAL_CSV)])["ingredients_text"].tolist()
+    return [t.strip().lower() for t in texts if isinstance(t, str) and t.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--catalog", action="store_true")
+    parser.add_argument("--n", type=int, default=300)
+    args = parser.parse_args()
+
+    texts = _texts(args.catalog)
+    n_lines = sum(len(split_lines(t)) for t in texts)
+    pantries = [", ".join(p) for p in sample_pantries(n=args.n)]
+    print(f"{len(texts)} recipes, {n_lines} ingredient lines\n")
+
+    print(f"{'scheme':<10} {'recipes/s':>10} {'lines/s':>10} {'warm lines/s':>13} "
+          f"{'vocab':>7} {'ids':>9} {'IdSets MB':>10} {'words/recipe':>13} "
+          f"{'match p50 ms':>13}")
+    for scheme in SCHEMES:
+        to_words = word_set_fn(scheme)
+        parse_line.cache_clear()
+        with Timer() as t_cold:
+            rows = [to_words(t) for t in texts]
+        with Timer() as t_warm:
+            for t in texts:
+                to_words(t)
+
+        id_sets = IdSets.from_token_sets(rows)
+        index = IngredientIndex.from_id_sets(id_sets)
+        samples = []
+        for p in pantries:
+            words = to_words(p)
+            with Timer() as t:
+                index.match_counts(words)
+            samples.append(t.seconds)
+
+        print(f"{scheme:<10} {len(texts) / t_cold.seconds:>10.0f} "
+              f"{n_lines / t_cold.seconds:>10.0f} {n_lines / t_warm.seconds:>13.0f} "
+              f"{len(id_sets.vocab):>7} {len(id_sets.ids):>9} "
+              f"{id_sets.nbytes / 1e6:>10.2f} {len(id_sets.ids) / len(texts):>13.1f} "
+              f"{percentile_ms(samples, 50):>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# app/bench/lexical.py
+"""
+Lexical (TF-IDF) vs embedding retrieval latency.
+
+    python -m app.bench.lexical --n 300 [--gamma 0.2]
+
+Runs lexical mode first, so it is timed on a process where the embedding
+model was never loaded (checked), then hybrid on a warm pantry embedding
+cache, then hybrid with the TF-IDF term at weight --gamma. Also reports
+the one-off cost of the recipe TF-IDF matrix and batch throughput.
+"""
+from __future__ import annotations
+
+import argparse
+
+from .. import deps
+from ..services import recommender
+from .common import Timer, percentile_ms, sample_pantries
+
+
+def _latency(queries, top_k, mode):
+    samples = []
+    for q in queries:
+        with Timer() as t:
+            recommender.recommend_recipes(q, top_k, mode=mode)
+        samples.append(t.seconds)
+    with Timer() as t_batch:
+        recommender.recommend_recipes_batch(queries, top_k, mode=mode)
+    return samples, len(queries) / t_batch.seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=300)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--gamma", type=float, default=0.2)
+    args = parser.parse_args()
+
+    catalog = deps.get_catalog()
+    with Timer() as t_build:
+        lexical = catalog.lexical()
+    print(f"TF-IDF matrix: {len(lexical)} recipes x {lexical.matrix.shape[1]} terms, "
+          f"{lexical.matrix.nnz} nnz, {lexical.nbytes / 1e6:.1f} MB, "
+          f"built in {t_build.seconds:.2f}s\n")
+
+    queries = [", ".join(p) for p in sample_pantries(n=args.n)]
+
+    print(f"{'mode':<16} {'p50 ms':>8} {'p95 ms':>8} {'batch q/s':>10}")
+
+    def report(label, samples, qps):
+        print(f"{label:<16} {percentile_ms(samples, 50):8.3f} "
+              f"{percentile_ms(samples, 95):8.3f} {qps:10.0f}")
+
+    report("lexical", *_latency(queries, args.top_k, "lexical"))
+    assert deps.load_embed_model.cache_info().currsize == 0, "lexical loaded the encoder"
+
+    catalog.warm()
+    for q in queries:  # warm the pantry embedding cache
+        recommender.recommend_recipes(q, args.top_k, mode="hybrid")
+    report("hybrid", *_latency(queries, args.top_k, "hybrid"))
+
+    recommender.GAMMA_LEXICAL = args.gamma
+    report("hybrid+tfidf", *_latency(queries, args.top_k, "hybrid"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# app/bench/mmr.py
+"""
+MMR diversification: re-rank cost and what it does to the top results.
+
+    python -m app.bench.mmr [--n 300] [--top-k 5]
+
+First the cost of diversify.mmr alone for pools of N candidates (real
+catalog embeddings, random relevance). Then, per lambda, recommend_recipes
+over sample pantries: p50 latency, mean pairwise cosine within the top-k,
+repeated titles per result list and the mean hybrid score kept.
+"""
+from __future__ import annotations
+
+import argparse
+from itertools import combinations
+
+import numpy as np
+
+from ..deps import get_catalog
+from ..services import recommender
+from ..services.diversify import mmr
+from .common import Timer, percentile_ms, sample_pantries
+
+POOLS = (50, 200, 500)
+LAMBDAS = (1.0, 0.8, 0.6, 0.4)
+
+
+def _title_key(title) -> str:
+    return " ".join(str(title).lower().split())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=300)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    catalog = get_catalog().warm()
+    emb = catalog.normalized_embeddings
+    rng = np.random.default_rng(0)
+
+    print(f"{'pool':>6} {'k':>4} {'p50 ms':>8} {'p95 ms':>8}")
+    for n in POOLS:
+        for k in (5, 20):
+            samples = []
+            for _ in range(300):
+                rows = np.sort(rng.choice(len(catalog), size=min(n, len(catalog)),
+                                          replace=False))
+                rel, block = rng.random(len(rows)), emb[rows]
+                with Timer() as t:
+                    mmr(rel, block, k, 0.6)
+                samples.append(t.seconds)
+            print(f"{n:>6} {k:>4} {percentile_ms(samples, 50):>8.3f} "
+                  f"{percentile_ms(samples, 95):>8.3f}")
+
+    queries = [", ".join(p) for p in sample_pantries(n=args.n)]
+    for q in queries:
+        recommender.recommend_recipes(q, args.top_k)
+
+    print(f"\n{'lambda':>6} {'p50 ms':>8} {'pair cos':>9} {'dup titles':>11} {'score':>7}")
+    for lam in LAMBDAS:
+        samples, pair_cos, dups, scores = [], [], 0, []
+        for q in queries:
+            with Timer() as t:
+                res = recommender.recommend_recipes(q, args.top_k, diversity=lam)
+            samples.append(t.seconds)
+            ids = [r["id"] for r in res]
+            pair_cos.extend(float(emb[a] @ emb[b]) for a, b in combinations(ids, 2))
+            dups += len(res) - len({_title_key(r["title"]) for r in res})
+            scores.extend(r["final_score"] for r in res)
+        print(f"{lam:>6.1f} {percentile_ms(samples, 50):>8.3f} {np.mean(pair_cos):>9.3f} "
+              f"{dups / len(queries):>11.2f} {np.mean(scores):>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# app/bench/onnx_encoder.py
+"""
+PyTorch vs int8 ONNX query encoder: cold start, latency and agreement.
+
+    python -m app.bench.onnx_encoder [--queries 200] [--top-k 5] [--min-cosine 0.99]
+
+Each backend runs in a fresh interpreter: startup is import + model load,
+then single-pantry encode latency (p50/p95) and RSS. The parent compares
+the two sets of pantry embeddings: per-pantry cosine and the overlap of
+the top-k recipes by cosine against the active catalog. Exits 1 if the
+minimum cosine is below --min-cosine.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from .common import Timer, percentile_ms, rss_mb, sample_pantries
+
+BACKENDS = ("sentence-transformers", "onnx")
+
+
+def _measure(backend: str, n: int, out_path: str) -> dict:
+    base = rss_mb()
+    with Timer() as t_start:
+        from ..config import RECOMMENDER_EMBEDDING_MODEL
+        from ..deps import load_embed_model
+
+        model = load_embed_model(RECOMMENDER_EMBEDDING_MODEL, backend=backend)
+        model.encode(["warm up"])
+
+    texts = [f"Ingredients: {', '.join(p)}" for p in sample_pantries(n)]
+    samples, embs = [], []
+    for text in texts:
+        with Timer() as t:
+            embs.append(np.asarray(model.encode([text]), dtype=np.float32)[0])
+        samples.append(t.seconds)
+    with Timer() as t_batch:
+        model.encode(texts, batch_size=32)
+    np.save(out_path, np.vstack(embs))
+
+    return {
+        "backend": backend,
+        "startup_s": t_start.seconds,
+        "p50_ms": percentile_ms(samples, 50),
+        "p95_ms": percentile_ms(samples, 95),
+        "batch_qps": len(texts) / t_batch.seconds,
+        "rss_mb": rss_mb() - base,
+        "torch_loaded": "torch" in sys.modules,
+    }
+
+
+def _agreement(a: np.ndarray, b: np.ndarray, top_k: int) -> dict:
+    from ..deps import get_normalized_embeddings
+
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    cos = (a * b).sum(axis=1)
+
+    recipes = get_normalized_embeddings()
+    top_a = np.argsort(-(a @ recipes.T), axis=1)[:, :top_k]
+    top_b = np.argsort(-(b @ recipes.T), axis=1)[:, :top_k]
+    overlap = [len(set(x) & set(y)) / top_k for x, y in zip(top_a, top_b)]
+    return {"min_cos": float(cos.min()), "mean_cos": float(cos.mean()),
+            "topk_overlap": float(np.mean(overlap))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    parser.add_argument("--child", nargs=2, metavar=("BACKEND", "OUT"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_measure(args.child[0], args.queries, args.child[1])))
+        return
+
+    print(f"{'backend':<22} {'startup s':>10} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'batch q/s':>10} {'RSS MB':>8} {'torch':>6}")
+    embs = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in BACKENDS:
+            path = os.path.join(tmp, f"{backend}.npy")
+            out = subprocess.run(
+                [sys.executable, "-m", "app.bench.onnx_encoder", "--queries",
+                 str(args.queries), "--child", backend, path],
+                check=True, capture_output=True, text=True, env=os.environ,
+            ).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            print(f"{r['backend']:<22} {r['startup_s']:>10.2f} {r['p50_ms']:>8.2f} "
+                  f"{r['p95_ms']:>8.2f} {r['batch_qps']:>10.0f} {r['rss_mb']:>8.0f} "
+                  f"{str(r['torch_loaded']):>6}")
+            embs[backend] = np.load(path)
+
+    agree = _agreement(embs[BACKENDS[0]], embs[BACKENDS[1]], args.top_k)
+    print(f"\ncosine(pytorch, onnx): min {agree['min_cos']:.4f} "
+          f"mean {agree['mean_cos']:.4f}; top-{args.top_k} overlap "
+          f"{agree['topk_overlap']:.3f}")
+    if agree["min_cos"] < args.min_cosine:
+        print(f"FAIL: min cosine below {args.min_cosine}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
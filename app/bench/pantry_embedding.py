@@ -0,0 +1,73 @@
+# app/bench/pantry_embedding.py
+"""
+Compare pantry embedding modes ("full" vs "compose").
+
+Reports, over pantries sampled from held-out recipes:
+  - encode latency with a cold and a warm cache
+  - cosine between the full and the composed pantry vector
+  - top-k title overlap between the two rankings
+
+    python -m app.bench.pantry_embedding --n 200 --top-k 5
+"""
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+
+from ..deps import get_catalog, get_embed_model
+from ..services import recommender
+from ..services.embedding_cache import PantryEmbeddingCache
+from .common import Timer, percentile_ms, sample_pantries
+
+
+def _time_encodes(cache: PantryEmbeddingCache, pantries, mode: str):
+    samples = []
+    for p in pantries:
+        with Timer() as t:
+            cache.encode_pantry(p, mode=mode)
+        samples.append(t.seconds)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    get_catalog()
+    get_embed_model()
+    pantries = sample_pantries(n=args.n)
+
+    print(f"{'mode':<8} {'cache':<5} {'p50 ms':>8} {'p95 ms':>8}")
+    for mode in ("full", "compose"):
+        cache = PantryEmbeddingCache(get_embed_model)
+        for label in ("cold", "warm"):
+            samples = _time_encodes(cache, pantries, mode)
+            print(f"{mode:<8} {label:<5} {percentile_ms(samples, 50):8.2f} "
+                  f"{percentile_ms(samples, 95):8.2f}")
+        print(f"         stats {cache.stats}")
+
+    cache = PantryEmbeddingCache(get_embed_model)
+    cosines, overlaps = [], []
+    for p in pantries:
+        full = cache.encode_pantry(p, mode="full")
+        comp = cache.encode_pantry(p, mode="compose")
+        cosines.append(float(np.dot(full, comp) /
+                             (np.linalg.norm(full) * np.linalg.norm(comp))))
+
+        pantry_text = ", ".join(p)
+        a = {r["title"] for r in recommender.recommend_recipes(
+            pantry_text, top_k=args.top_k, embed_mode="full")}
+        b = {r["title"] for r in recommender.recommend_recipes(
+            pantry_text, top_k=args.top_k, embed_mode="compose")}
+        overlaps.append(len(a & b) / float(args.top_k))
+
+    print(f"\npantry vector cosine(full, compose): mean={np.mean(cosines):.3f} "
+          f"min={np.min(cosines):.3f}")
+    print(f"top-{args.top_k} overlap(full, compose): mean={np.mean(overlaps):.3f}")
+
+
+if __name__ == "__main__":
+    main()
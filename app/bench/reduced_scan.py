@@ -0,0 +1,118 @@
+# app/bench/reduced_scan.py
+"""
+Reduced-dimension first pass + full-dimension rescoring vs the full scan.
+
+    python -m app.jobs.build_recommender --convert synth-100k --version s100k-r64 --reduce-dim 64
+    python -m app.bench.reduced_scan s100k-r64 s100k-r128 [--n 200] [--top-k 5]
+
+Per version (built with --reduce-dim), over sample pantries:
+    cosine  the embedding-only scan (legacy recommender_service): exact
+            top-k vs projection.top_rescored per rescoring pool size,
+            plus the reduced scan alone (pool = top-k, no rescoring)
+    hybrid  recommend_recipes with CANDIDATE_POOL_SIZE = 0 (every recipe
+            scored), REDUCED_RESCORE_POOL = 0 vs the configured pool
+recall@k is the share of the exact top-k ids found; latency is p50 / p95
+of the scoring only (pantry embeddings are cached before timing).
+"""
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+
+from .. import deps
+from ..config import REDUCED_RESCORE_POOL
+from ..services import recommender
+from ..services.artifacts import load_version
+from ..services.projection import top_rescored
+from .common import Timer, percentile_ms, sample_pantries
+
+POOLS = (50, 100, 200, 500)
+
+
+def _recall(found, exact) -> float:
+    return len(set(found) & set(exact)) / max(len(exact), 1)
+
+
+def _row(label, samples, recall):
+    print(f"  {label:<22} {percentile_ms(samples, 50):>8.2f} "
+          f"{percentile_ms(samples, 95):>8.2f} {np.mean(recall):>9.3f}")
+
+
+def _cosine(catalog, reduced, queries, top_k):
+    emb = catalog.normalized_embeddings
+    exact, samples = [], []
+    for q in queries:
+        with Timer() as t:
+            sims = emb @ q
+            top = np.argpartition(-sims, top_k - 1)[:top_k]
+            top = top[np.argsort(-sims[top], kind="stable")]
+        samples.append(t.seconds)
+        exact.append(top.tolist())
+    _row("full scan", samples, [1.0])
+
+    for pool in (top_k,) + POOLS:
+        samples, recall = [], []
+        for q, ex in zip(queries, exact):
+            with Timer() as t:
+                top, _ = top_rescored(reduced, emb, q, top_k, pool)
+            samples.append(t.seconds)
+            recall.append(_recall(top.tolist(), ex))
+        label = "reduced only" if pool == top_k else f"rescore {pool}"
+        _row(label, samples, recall)
+
+
+def _hybrid(texts, top_k):
+    def _run(pool):
+        recommender.REDUCED_RESCORE_POOL = pool
+        samples, ids = [], []
+        for text in texts:
+            with Timer() as t:
+                res = recommender.recommend_recipes(text, top_k)
+            samples.append(t.seconds)
+            ids.append([r["id"] for r in res])
+        return samples, ids
+
+    saved = recommender.CANDIDATE_POOL_SIZE, recommender.REDUCED_RESCORE_POOL
+    recommender.CANDIDATE_POOL_SIZE = 0
+    try:
+        samples, exact = _run(0)
+        _row("full scan", samples, [1.0])
+        pool = REDUCED_RESCORE_POOL or 200
+        samples, ids = _run(pool)
+        _row(f"rescore {pool}", samples, [_recall(a, b) for a, b in zip(ids, exact)])
+    finally:
+        recommender.CANDIDATE_POOL_SIZE, recommender.REDUCED_RESCORE_POOL = saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("versions", nargs="+")
+    parser.add_argument("--n", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    texts = [", ".join(p) for p in sample_pantries(n=args.n)]
+    for version in args.versions:
+        catalog = load_version(version, verify=False).warm()
+        reduced = catalog.reduced()
+        if reduced is None:
+            print(f"{version}: no reduced embeddings (build with --reduce-dim)")
+            continue
+        deps.set_catalog(catalog)
+        embs = deps.get_pantry_embedding_cache().encode_pantries(texts)
+        queries = embs / np.maximum(np.linalg.norm(embs, axis=1, keepdims=True), 1e-12)
+
+        print(f"{version}: {len(catalog)} recipes, {catalog.embeddings.shape[1]} -> "
+              f"{reduced.dim} dims, embeddings "
+              f"{catalog.normalized_embeddings.nbytes / 1e6:.1f} MB, reduced "
+              f"{reduced.rows.nbytes / 1e6:.1f} MB")
+        print(f"  {'cosine':<22} {'p50 ms':>8} {'p95 ms':>8} {f'recall@{args.top_k}':>9}")
+        _cosine(catalog, reduced, queries.astype(np.float32), args.top_k)
+        print(f"  {'hybrid':<22} {'p50 ms':>8} {'p95 ms':>8} {f'recall@{args.top_k}':>9}")
+        _hybrid(texts, args.top_k)
+
+
+if __name__ == "__main__":
+    main()
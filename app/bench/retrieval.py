@@ -0,0 +1,134 @@
+# app/bench/retrieval.py
+"""
+Offline retrieval quality and speed: can each mode find a held-out recipe
+from part of its own ingredient list?
+
+    python -m app.bench.retrieval [--version v3] [--keep 0.5] [--k 1 5 10]
+                                  [--modes hybrid embedding lexical ...]
+
+Every recipe of appetite_test.csv that is in the catalog (same title and
+ingredients_text) becomes one query: a random `--keep` share of its
+ingredient lines (at least --min-lines), quantities stripped. All queries
+go through each mode in one batched call:
+    hybrid      recommender.recommend_recipes_batch (overlap + embedding)
+    hybrid-ann  the same with the reduced-dimension first pass (projection.py)
+    embedding   recommender_service.recommend_recipes_batch (cosine only)
+    ann         the same with the reduced-dimension first pass
+    lexical     recommend_recipes_batch in lexical mode (overlap + TF-IDF)
+The *-ann modes need a version built with --reduce-dim. Reported: recall@k
+(source recipe in the top k), MRR over the top max(k), and queries/s of the
+batched call. Pantry embeddings are cached before timing, so only
+retrieval is measured.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from .. import deps
+from ..services import recommender, recommender_service
+from ..services.artifacts import load_version
+from .common import TEST_CSV, Timer, _strip_quantity
+
+MODES = ("hybrid", "hybrid-ann", "embedding", "ann", "lexical")
+
+
+def masked_queries(catalog, csv_path: str, keep: float, min_lines: int, seed: int):
+    """(pantry texts, catalog ids of each query's source recipe), skipped count."""
+    ids_by_key = defaultdict(list)
+    for rid, key in enumerate(zip(catalog.column("Title"), catalog.column("ingredients_text"))):
+        ids_by_key[key].append(rid)
+
+    rng = random.Random(seed)
+    df = pd.read_csv(csv_path, usecols=["Title", "ingredients_text"]).dropna()
+    texts, sources, skipped = [], [], 0
+    for title, ingredients in zip(df["Title"], df["ingredients_text"]):
+        source = ids_by_key.get((title, ingredients))
+        lines = [x for x in (_strip_quantity(x) for x in ingredients.split(",")) if x]
+        if not source or len(lines) < min_lines:
+            skipped += 1
+            continue
+        size = min(len(lines), max(min_lines, round(keep * len(lines))))
+        texts.append(", ".join(rng.sample(lines, size)))
+        sources.append(set(source))
+    return texts, sources, skipped
+
+
+def _run(mode: str, texts, top_k: int):
+    if mode in ("embedding", "ann"):
+        saved = recommender_service.REDUCED_RESCORE_POOL
+        if mode == "embedding":
+            recommender_service.REDUCED_RESCORE_POOL = 0
+        try:
+            return recommender_service.recommend_recipes_batch(texts, top_k)
+        finally:
+            recommender_service.REDUCED_RESCORE_POOL = saved
+
+    saved = recommender.REDUCED_RESCORE_POOL
+    if mode != "hybrid-ann":
+        recommender.REDUCED_RESCORE_POOL = 0
+    try:
+        return recommender.recommend_recipes_batch(
+            texts, top_k, mode="lexical" if mode == "lexical" else "hybrid",
+        )
+    finally:
+        recommender.REDUCED_RESCORE_POOL = saved
+
+
+def score(results, sources, ks):
+    """recall@k per k and MRR over the full result lists."""
+    ranks = []
+    for res, source in zip(results, sources):
+        rank = next((i + 1 for i, r in enumerate(res) if r["id"] in source), None)
+        ranks.append(rank)
+    recall = {k: np.mean([r is not None and r <= k for r in ranks]) for k in ks}
+    mrr = np.mean([1.0 / r if r else 0.0 for r in ranks])
+    return recall, mrr
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--version", help="catalog version (default: the active one)")
+    parser.add_argument("--csv", default=TEST_CSV)
+    parser.add_argument("--keep", type=float, default=0.5,
+                        help="share of each recipe's ingredient lines kept as the pantry")
+    parser.add_argument("--min-lines", type=int, default=2)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    if args.version:
+        deps.set_catalog(load_version(args.version, verify=False))
+    catalog = deps.get_catalog().warm()
+    top_k = max(args.k)
+
+    texts, sources, skipped = masked_queries(catalog, args.csv, args.keep,
+                                             args.min_lines, args.seed)
+    print(f"{catalog.version}: {len(catalog)} recipes, {len(texts)} queries "
+          f"({skipped} test recipes skipped), keep={args.keep}")
+    if not texts:
+        return
+    deps.get_pantry_embedding_cache().encode_pantries(texts)
+
+    header = "".join(f"{f'R@{k}':>8}" for k in args.k)
+    print(f"{'mode':<12}{header}{f'MRR@{top_k}':>9}{'q/s':>10}")
+    for mode in args.modes:
+        if mode.endswith("ann") and catalog.reduced() is None:
+            print(f"{mode:<12}  skipped: no reduced embeddings (build with --reduce-dim)")
+            continue
+        _run(mode, texts[:8], top_k)  # lazy set-up (TF-IDF matrix, DataFrame)
+        with Timer() as t:
+            results = _run(mode, texts, top_k)
+        recall, mrr = score(results, sources, args.k)
+        cells = "".join(f"{recall[k]:>8.3f}" for k in args.k)
+        print(f"{mode:<12}{cells}{mrr:>9.3f}{len(texts) / t.seconds:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
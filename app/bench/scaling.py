@@ -0,0 +1,122 @@
+# app/bench/scaling.py
+"""
+How each recommender path scales with catalog size.
+
+    python -m app.jobs.synth_catalog 100000 1000000 5000000
+    python -m app.bench.scaling legacy synth-100k synth-1m synth-5m --n 50
+
+Each version is measured in a fresh interpreter: load time, index /
+normalization warm-up time, RSS, then p50 / p95 per-query latency of
+    two_stage   recommend_recipes (inverted-index candidates + rerank)
+    full_scan   recommend_recipes with CANDIDATE_POOL_SIZE = 0
+    batch       recommend_recipes_batch, per query
+    user_build  building a materialized UserRecState from a pantry
+    user_rank   ranking from that state
+    service     the legacy recommender_service full scan
+Pantry embeddings are cached before timing, so only scoring is measured.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from .common import Timer, percentile_ms, rss_mb, sample_pantries
+
+PATHS = ("two_stage", "full_scan", "batch", "user_build", "user_rank", "service")
+
+
+def _time_each(fn, items):
+    fn(items[0])  # first call pays lazy set-up (e.g. DataFrame materialization)
+    samples = []
+    for item in items:
+        with Timer() as t:
+            fn(item)
+        samples.append(t.seconds)
+    return percentile_ms(samples, 50), percentile_ms(samples, 95)
+
+
+def _measure(version: str, n: int, top_k: int) -> dict:
+    from .. import deps
+    from ..services import recommender, recommender_service
+    from ..services.artifacts import load_version
+    from ..services.user_recommendations import UserRecState
+
+    base = rss_mb()
+    with Timer() as t_load:
+        catalog = load_version(version, verify=False)
+    with Timer() as t_warm:
+        catalog.warm()
+    deps.set_catalog(catalog)
+    rss = rss_mb() - base
+
+    pantries = sample_pantries(n=n)
+    queries = [", ".join(p) for p in pantries]
+    deps.get_pantry_embedding_cache().encode_pantries(queries)
+    deps.get_pantry_embedding_cache().encode_pantries(pantries)
+
+    latency = {}
+    latency["two_stage"] = _time_each(lambda q: recommender.recommend_recipes(q, top_k), queries)
+
+    pool_size = recommender.CANDIDATE_POOL_SIZE
+    recommender.CANDIDATE_POOL_SIZE = 0
+    latency["full_scan"] = _time_each(lambda q: recommender.recommend_recipes(q, top_k), queries)
+    recommender.CANDIDATE_POOL_SIZE = pool_size
+
+    with Timer() as t:
+        recommender.recommend_recipes_batch(queries, top_k)
+    latency["batch"] = (t.seconds * 1000.0 / len(queries),) * 2
+
+    states = []
+    latency["user_build"] = _time_each(
+        lambda p: states.append(UserRecState((name, None, None) for name in p)), pantries
+    )
+    latency["user_rank"] = _time_each(lambda s: s.rank(None, top_k), states[1:])
+    latency["service"] = _time_each(
+        lambda q: recommender_service.recommend_recipes(q, top_k), queries
+    )
+
+    return {
+        "version": version,
+        "recipes": len(catalog),
+        "load_s": t_load.seconds,
+        "warm_s": t_warm.seconds,
+        "rss_mb": rss,
+        "latency": latency,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("versions", nargs="+")
+    parser.add_argument("--n", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_measure(args.versions[0], args.n, args.top_k)))
+        return
+
+    print(f"{'version':<12} {'recipes':>9} {'load s':>7} {'warm s':>7} {'RSS MB':>8}  "
+          + " ".join(f"{p:>12}" for p in PATHS))
+    print(f"{'':<47}" + " ".join(f"{'p50/p95 ms':>12}" for _ in PATHS))
+    for version in args.versions:
+        out = subprocess.run(
+            [sys.executable, "-m", "app.bench.scaling", "--child", version,
+             "--n", str(args.n), "--top-k", str(args.top_k)],
+            check=True, capture_output=True, text=True, env=os.environ,
+        ).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        cells = " ".join(
+            f"{r['latency'][p][0]:>6.1f}/{r['latency'][p][1]:<5.1f}" for p in PATHS
+        )
+        print(f"{r['version']:<12} {r['recipes']:>9} {r['load_s']:>7.2f} "
+              f"{r['warm_s']:>7.2f} {r['rss_mb']:>8.1f}  {cells}")
+
+
+if __name__ == "__main__":
+    main()
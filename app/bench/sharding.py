@@ -0,0 +1,65 @@
+# app/bench/sharding.py
+"""
+Latency and throughput of the sharded recommender vs in-process scoring.
+
+    python -m app.bench.sharding --shards 1 2 4 8 --n 200 --batch 64
+
+"0 shards" is recommend_recipes_batch in this process. For each shard
+count: pool start-up time, single-query p50/p95 (two IPC rounds), and
+throughput of batched queries. Use a large catalog to see scaling; on
+the 13k corpus IPC dominates.
+"""
+from __future__ import annotations
+
+import argparse
+
+from ..deps import get_catalog, get_pantry_embedding_cache
+from ..services.recommender import recommend_recipes_batch
+from ..services.sharding import ShardedRecommender
+from .common import Timer, percentile_ms, sample_pantries
+
+
+def _run(label, one, many, queries, batch):
+    samples = []
+    for q in queries:
+        with Timer() as t:
+            one(q)
+        samples.append(t.seconds)
+    with Timer() as t:
+        for i in range(0, len(queries), batch):
+            many(queries[i:i + batch])
+    print(f"{label:>8} {percentile_ms(samples, 50):10.2f} {percentile_ms(samples, 95):10.2f} "
+          f"{len(queries) / t.seconds:12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--n", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=64)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    catalog = get_catalog().warm()
+    queries = [", ".join(p) for p in sample_pantries(n=args.n)]
+    # Encode once up front so only scoring is compared
+    get_pantry_embedding_cache().encode_pantries(queries)
+
+    print(f"catalog: {len(catalog)} recipes")
+    print(f"{'shards':>8} {'p50 ms':>10} {'p95 ms':>10} {'queries/s':>12}")
+    _run("0", lambda q: recommend_recipes_batch([q], args.top_k),
+         lambda qs: recommend_recipes_batch(qs, args.top_k), queries, args.batch)
+
+    for n in args.shards:
+        with Timer() as t:
+            pool = ShardedRecommender(catalog, n)
+        try:
+            _run(str(n), lambda q: pool.recommend(q, args.top_k),
+                 lambda qs: pool.recommend_many(qs, args.top_k), queries, args.batch)
+        finally:
+            pool.close()
+        print(f"{'':>8} start-up {t.seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# app/bench/vocab_memory.py
+"""
+Memory of recipe word sets / categories: Python set + list columns (the
+pickled metadata layout) vs interned IdSets (services/vocab.py).
+
+    python -m app.bench.vocab_memory --rows 13495 1000000
+
+Rows are sampled from the processed CSVs. The object layout is measured
+with tracemalloc up to --max-measured rows and extrapolated linearly
+beyond that (marked "est."); IdSets are always built at full size.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import tracemalloc
+from typing import Callable, List, Tuple
+
+import pandas as pd
+
+from ..services.category_rules import assign_categories, to_word_set
+from ..services.vocab import IdSets
+from .common import TEST_CSV, VAL_CSV, Timer
+
+
+def _load_rows():
+    df = pd.concat([pd.read_csv(p) for p in (TEST_CSV, VAL_CSV)], ignore_index=True)
+    df = df.dropna(subset=["ingredients_text"])
+    texts = df["ingredients_text"].str.lower().tolist()
+    cats = [
+        assign_categories(t, i, g)
+        for t, i, g in zip(df["Title"], df["ingredients_text"], df["target_text"])
+    ]
+    return texts, cats
+
+
+def _traced(build: Callable[[], object]) -> Tuple[int, object]:
+    """(bytes still allocated after build(), its result)"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        size = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return size, kept
+
+
+def _object_columns(texts: List[str], cats: List[str]):
+    # What the pickled DataFrame holds per row
+    return (
+        [to_word_set(t) for t in texts],
+        [[c for c in s.split("|") if c] for s in cats],
+    )
+
+
+def _id_sets(texts: List[str], cats: List[str]):
+    return (
+        IdSets.from_token_sets(to_word_set(t) for t in texts),
+        IdSets.from_token_sets((c for c in s.split("|") if c) for s in cats),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[13495, 1_000_000])
+    parser.add_argument("--max-measured", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    base_texts, base_cats = _load_rows()
+    rng = random.Random(args.seed)
+
+    print(f"{'rows':>9} {'sets+lists MB':>14} {'IdSets MB':>10} {'ratio':>7} "
+          f"{'vocab':>7} {'build s':>8}")
+    for n in args.rows:
+        picks = [rng.randrange(len(base_texts)) for _ in range(n)]
+        texts = [base_texts[i] for i in picks]
+        cats = [base_cats[i] for i in picks]
+
+        m = min(n, args.max_measured)
+        objects, _ = _traced(lambda: _object_columns(texts[:m], cats[:m]))
+        objects = objects * n / m
+        est = " est." if m < n else ""
+
+        # Build time includes tracemalloc overhead
+        with Timer() as t:
+            interned, (words, _) = _traced(lambda: _id_sets(texts, cats))
+
+        print(f"{n:>9} {objects / 2**20:>9.1f}{est:<5} {interned / 2**20:>10.1f} "
+              f"{objects / max(interned, 1):>6.1f}x {len(words.vocab):>7} {t.seconds:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# app/bench/weighted_scoring.py
+"""
+Query latency of recommend_recipes with and without pantry word weights.
+
+    python -m app.bench.weighted_scoring --n 300
+
+Weights are random expiry dates / quantities per pantry item, so the
+weighted path does the same work as a real waste-aware query.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+from datetime import date, timedelta
+
+from ..deps import get_catalog
+from ..services import recommender
+from ..services.pantry_weights import item_weight, word_weights
+from .common import Timer, percentile_ms, sample_pantries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=300)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    catalog = get_catalog().warm()
+    rng = random.Random(7)
+    pantries = sample_pantries(n=args.n)
+    weights = [
+        word_weights(
+            ((name, item_weight(date.today() + timedelta(days=rng.randint(0, 14)),
+                                rng.choice([None, 1, 4, 12])))
+             for name in p),
+            catalog.query_words,
+        )
+        for p in pantries
+    ]
+    queries = [", ".join(p) for p in pantries]
+
+    # Warm the pantry embedding cache so only scoring is timed
+    for q in queries:
+        recommender.recommend_recipes(q, args.top_k)
+
+    print(f"{'mode':<10} {'p50 ms':>8} {'p95 ms':>8}")
+    for label, use_weights in (("uniform", False), ("weighted", True)):
+        samples = []
+        for q, w in zip(queries, weights):
+            with Timer() as t:
+                recommender.recommend_recipes(q, args.top_k,
+                                              weights=w if use_weights else None)
+            samples.append(t.seconds)
+        print(f"{label:<10} {percentile_ms(samples, 50):8.3f} {percentile_ms(samples, 95):8.3f}")
+
+
+if __name__ == "__main__":
+    main()
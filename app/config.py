@@ -1,3 +1,4 @@
+import os
 from typing import List
 
 
@@ -17,4 +18,150 @@ class Settings:
     ]
 
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
+
+# Operator accounts allowed to change the shared recommender catalog (recipe
+# ingestion, version activate / rollback): comma-separated usernames in
+# APPETITE_ADMIN_USERS. Empty = those endpoints refuse everyone and only
+# the CLI jobs (app/jobs) can do it.
+ADMIN_USERNAMES = frozenset(
+    u.strip() for u in os.environ.get("APPETITE_ADMIN_USERS", "").split(",") if u.strip()
+)
+
+# -------------------------
+# Recommender artifacts
+# -------------------------
+MODEL_DIR = "model"
+RECOMMENDER_EMB_PATH = f"{MODEL_DIR}/recommender_embeddings.npy"
+RECOMMENDER_META_PATH = f"{MODEL_DIR}/recommender_metadata.pkl"
+RECOMMENDER_INFO_PATH = f"{MODEL_DIR}/recommender_model_info.json"
+RECOMMENDER_SEGMENTS_DIR = f"{MODEL_DIR}/recommender_segments"
+RECOMMENDER_VECTORIZER_PATH = f"{MODEL_DIR}/recommender_vectorizer.pkl"
+RECOMMENDER_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Category classifier: the exported arrays (services/category_model.py,
+# app/jobs/export_category_model.py), memory-mapped on first use; the
+# training pickles are only read when the export is missing
+CATEGORY_MODEL_DIR = f"{MODEL_DIR}/category_classifier"
+CATEGORY_CLASSIFIER_PATH = f"{MODEL_DIR}/category_classifier.pkl"
+CATEGORY_VECTORIZER_PATH = f"{MODEL_DIR}/category_vectorizer.pkl"
+# Word sets of newly built catalogs: "parsed-v1" (canonical ingredient names,
+# services/ingredient_parser.py) or "split" (every token, as the notebook).
+# Each catalog records its scheme; queries always follow the catalog's.
+INGREDIENT_WORD_SCHEME = "parsed-v1"
+
+# Query encoder backend: "sentence-transformers" (PyTorch) or "onnx" (the
+# int8 export in ONNX_ENCODER_DIR, see app/jobs/export_onnx_encoder.py;
+# no torch import)
+EMBED_BACKEND = "sentence-transformers"
+ONNX_ENCODER_DIR = f"{MODEL_DIR}/minilm_onnx"
+
+# Query encoder micro-batching (services/batching_encoder.py): concurrent
+# encode calls from API requests share one forward pass of up to
+# ENCODER_MAX_BATCH texts, collected for at most ENCODER_MAX_WAIT_MS
+# (ENCODER_MAX_BATCH = 0 -> every call encodes on its own). Off until
+# app/bench/encoder_batching.py shows a gain on the serving hardware; 64
+# is the size to start from.
+ENCODER_MAX_BATCH = 0
+ENCODER_MAX_WAIT_MS = 2.0
+
+# Versioned artifacts: model/recommender/<version>/ + ACTIVE pointer.
+# Each worker polls ACTIVE and hot-swaps when it changes (0 = off).
+RECOMMENDER_VERSIONS_DIR = f"{MODEL_DIR}/recommender"
+RECOMMENDER_VERSION_POLL_SECONDS = 30
+
+# Hybrid score weights (see 4_Recommender.ipynb)
+ALPHA_INGREDIENT = 0.6
+BETA_EMBEDDING = 0.4
+# Third hybrid term: TF-IDF cosine from RECOMMENDER_VECTORIZER_PATH (0 = off)
+GAMMA_LEXICAL = 0.0
+
+# "hybrid"  -> overlap + embedding cosine (+ GAMMA_LEXICAL * TF-IDF)
+# "lexical" -> overlap + TF-IDF cosine, which takes the embedding's weight;
+#              the embedding model is never loaded
+# Lexical scoring runs in-process even when RECOMMENDER_SHARDS > 1.
+RECOMMENDER_MODE = "hybrid"
+
+# Pantry query embeddings
+# "full"    -> encode the whole pantry string (cached per pantry text)
+# "compose" -> encode each ingredient once, pantry vector = normalized mean
+PANTRY_EMBED_MODE = "full"
+PANTRY_EMBED_CACHE_SIZE = 4096
+INGREDIENT_EMBED_CACHE_SIZE = 50000
+
+# Two-stage retrieval: candidates picked from the inverted ingredient
+# index before the embedding rerank (0 = score every recipe)
+CANDIDATE_POOL_SIZE = 500
+
+# Batch recommendations: pantries scored per embeddings matmul
+BATCH_SCORE_CHUNK = 256
+
+# Sharded recommender (services/sharding.py): number of worker processes
+# that each score a slice of the catalog (0 or 1 = score in-process)
+RECOMMENDER_SHARDS = 0
+
+# "Cook now" coverage queries (services/coverage.py): canonical ingredient
+# names assumed to be in every pantry, and the default / largest number
+# of missing ingredients a request may allow
+COOK_NOW_STAPLES = [
+    "salt", "black pepper", "pepper", "water", "ice", "sugar", "olive oil",
+    "vegetable oil", "oil", "flour", "butter", "vegetable oil spray",
+]
+COOK_NOW_MAX_MISSING = 2
+COOK_NOW_MAX_MISSING_LIMIT = 10
+
+# Ingredient exclusions / allergens (services/exclusions.py): excluded-recipe
+# masks kept per catalog, one per distinct exclusion list
+EXCLUSION_CACHE_SIZE = 256
+
+# MMR diversification of results (services/diversify.py): lambda trades
+# relevance (1.0 = plain ranking) against similarity to results already
+# picked; None = off unless a request asks for it. Re-ranks the
+# MMR_POOL_SIZE best candidates. Per-user ranked lists are cached per
+# lambda clamped to [0, 1] and rounded to MMR_LAMBDA_STEP.
+MMR_LAMBDA = None
+MMR_POOL_SIZE = 200
+MMR_LAMBDA_STEP = 0.05
+
+# Near-duplicate collapsing at build time (services/dedup.py,
+# build_recommender --dedup): MinHash permutations and LSH bands, and the
+# ingredient-set / title-word Jaccard two recipes need to be merged
+DEDUP_NUM_PERM = 120
+DEDUP_BANDS = 20
+DEDUP_INGREDIENT_THRESHOLD = 0.8
+DEDUP_TITLE_THRESHOLD = 0.5
+
+# Reduced-dimension first pass (services/projection.py, build_recommender
+# --reduce-dim 64): full scans of versions built with a projection score
+# the reduced embeddings, then rescore the REDUCED_RESCORE_POOL best at
+# full dimension (0 = always scan at full dimension)
+REDUCED_RESCORE_POOL = 200
+
+# "More like this" (services/neighbors.py, app/jobs/build_neighbors.py):
+# neighbours stored per recipe, and the similarity block memory budget
+NEIGHBORS_K = 50
+NEIGHBORS_BLOCK_MB = 256
+
+# Per-user materialized recommendation state (users kept in memory), and
+# the ranked result lists kept per user (LRU over category / exclusions /
+# diversity combinations)
+USER_REC_CACHE_SIZE = 1024
+USER_RANKED_CACHE_SIZE = 8
+
+# Catalog ingestion: recipes embedded per encode call, and the number of
+# segments that triggers a background compaction
+INGEST_BATCH_SIZE = 256
+COMPACT_MIN_SEGMENTS = 8
+
+# Waste-aware ranking: pantry words are weighted by their items' expiry and
+# quantity (see services/pantry_weights.py); False = every word weighs 1
+WASTE_AWARE_SCORING = True
+EXPIRY_BOOST = 1.0              # extra weight for an item expiring today
+EXPIRY_HALF_LIFE_DAYS = 3.0     # boost halves every N days further out
+QUANTITY_BOOST = 0.25           # extra weight for holding >= QUANTITY_REF
+QUANTITY_REF = 10.0
+
+# Batch category tagging (POST /categories/batch): labels returned per
+# ingredient list by default, and the most lists one request may send
+CATEGORY_TOP_K = 3
+CATEGORY_BATCH_MAX = 10000
@@ -1,10 +1,23 @@
-from fastapi import Depends
+import threading
+from functools import lru_cache
+
+from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from .database import SessionLocal
 from .auth import get_current_user_from_token
 from . import models
+from .config import (
+    ADMIN_USERNAMES,
+    PANTRY_EMBED_CACHE_SIZE,
+    INGREDIENT_EMBED_CACHE_SIZE,
+    EMBED_BACKEND,
+    ENCODER_MAX_BATCH,
+    ENCODER_MAX_WAIT_MS,
+    ONNX_ENCODER_DIR,
+    RECOMMENDER_VECTORIZER_PATH,
+)
 
 # Frontend calls /login to get a token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
@@ -26,4 +39,125 @@ def get_current_user_dep(
     This is the only dependency you should use in routes
     to get the authenticated user.
     """
-    return get_current_user_from_token(token, db)
\ No newline at end of file
+    return get_current_user_from_token(token, db)
+
+
+def get_admin_user_dep(
+    current_user: models.User = Depends(get_current_user_dep),
+) -> models.User:
+    """For routes that change what every user is served (ADMIN_USERNAMES)."""
+    if current_user.username not in ADMIN_USERNAMES:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Admin access required.")
+    return current_user
+
+# -------------------------
+# Recommender resources (loaded lazily, once per process)
+# -------------------------
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """
+    The active RecipeCatalog (base artifacts + ingested segments).
+    Loaded on first use from the ACTIVE version (or the flat model/ files).
+    """
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                from .services.artifacts import load_active_catalog
+                from .metrics import set_recommender_version
+
+                _catalog = load_active_catalog()
+                set_recommender_version(_catalog.version, len(_catalog))
+    return _catalog
+
+
+def peek_catalog():
+    """The active catalog if one is loaded, without triggering a load."""
+    return _catalog
+
+
+def set_catalog(catalog, expected=None) -> bool:
+    """
+    Swap the active catalog (a single reference assignment); queries that
+    already hold the old one finish on it. With `expected`, only swap if
+    the active catalog is still that object.
+    """
+    global _catalog
+    with _catalog_lock:
+        if expected is not None and _catalog is not expected:
+            return False
+        _catalog = catalog
+        return True
+
+
+def get_recommender_data():
+    """Return (metadata DataFrame, recipe embeddings, model info)."""
+    return get_catalog().as_tuple()
+
+
+def get_embed_model():
+    """
+    Query encoder for the model named by the active catalog's model info,
+    micro-batched across requests when ENCODER_MAX_BATCH is set
+    (services/batching_encoder.py).
+    """
+    return _query_encoder(get_catalog().info["embedding_model"])
+
+
+@lru_cache(maxsize=2)
+def _query_encoder(name: str):
+    model = load_embed_model(name)
+    if not ENCODER_MAX_BATCH:
+        return model
+    from .services.batching_encoder import BatchingEncoder
+
+    return BatchingEncoder(model, ENCODER_MAX_BATCH, ENCODER_MAX_WAIT_MS / 1000.0)
+
+
+@lru_cache(maxsize=2)
+def load_embed_model(name: str, backend: str = EMBED_BACKEND):
+    """
+    SentenceTransformer, or with backend="onnx" the quantized ONNX export
+    of the same model (same encode() contract, never imports torch).
+    """
+    if backend == "onnx":
+        from .services.onnx_encoder import OnnxSentenceEncoder
+
+        return OnnxSentenceEncoder.for_model(name, ONNX_ENCODER_DIR)
+
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(name)
+
+
+@lru_cache(maxsize=1)
+def get_lexical_vectorizer():
+    """The fitted TfidfVectorizer shipped with the recommender artifacts."""
+    import joblib
+
+    return joblib.load(RECOMMENDER_VECTORIZER_PATH)
+
+
+@lru_cache(maxsize=1)
+def get_pantry_embedding_cache():
+    from .services.embedding_cache import PantryEmbeddingCache
+
+    return PantryEmbeddingCache(
+        get_embed_model,
+        max_pantries=PANTRY_EMBED_CACHE_SIZE,
+        max_ingredients=INGREDIENT_EMBED_CACHE_SIZE,
+    )
+
+
+def get_recipe_indexes():
+    """Return (ingredient inverted index, category inverted index)."""
+    return get_catalog().indexes()
+
+
+def get_normalized_embeddings():
+    """Unit-length float32 recipe embeddings (cosine == dot product)."""
+    return get_catalog().normalized_embeddings
@@ -0,0 +1,3 @@
+# app/jobs/__init__.py
+# Offline / scheduled jobs. Run from the repo root, e.g.
+#   python -m app.jobs.nightly_recommendations
@@ -0,0 +1,105 @@
+# app/jobs/build_neighbors.py
+"""
+Precompute the "more like this" neighbour table of a recommender version.
+
+    python -m app.jobs.build_neighbors [--version v3] [--new-version v4]
+                                       [--k 50] [--workers 8] [--activate]
+
+Scores every recipe against every other with blocked matmuls over the
+unit-normalized embeddings (services/neighbors.py) and publishes a new
+version (artifacts.publish_built): the source version's catalog as a
+columnar bundle, ingested segments folded in, with its aliases and reduced
+embeddings, plus the top-k ids (int32) and cosines (float16). Published
+versions are never modified in place. Defaults to the active version;
+--activate points ACTIVE at the new one, which running API workers load
+on their next poll.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from ..config import NEIGHBORS_BLOCK_MB, NEIGHBORS_K
+from ..services import artifacts
+from ..services.columnar import write_bundle
+from ..services.dedup import read_aliases, write_aliases
+from ..services.neighbors import NeighborTable, compute_neighbors, live_neighbors
+
+
+def build(version: str, k: int = NEIGHBORS_K, workers: int = 1,
+          block_mb: float = NEIGHBORS_BLOCK_MB, new_version: str = None) -> dict:
+    catalog = artifacts.load_version(version)
+    emb = catalog.normalized_embeddings
+
+    t0 = time.perf_counter()
+    ids, scores = compute_neighbors(emb, k, block_mb, workers)
+    seconds = time.perf_counter() - t0
+
+    table = NeighborTable(ids, scores)
+    aliases = read_aliases(artifacts.artifact_dir(version))
+    reduced = catalog.reduced()
+
+    def _write(tmp: str) -> dict:
+        write_bundle(tmp, catalog)
+        if aliases:
+            write_aliases(tmp, aliases)
+        if reduced is not None:
+            reduced.save(tmp)
+        table.save(tmp)
+        return catalog.info
+
+    new_version = artifacts.publish_built(_write, new_version)
+
+    # Spot check against the exact live computation
+    rng = np.random.default_rng(0)
+    sample = rng.choice(len(catalog), size=min(100, len(catalog)), replace=False)
+    agree = np.mean([
+        len(set(ids[i].tolist()) & set(live_neighbors(emb, int(i), table.k)[0].tolist()))
+        / max(table.k, 1)
+        for i in sample
+    ])
+    return {
+        "recipes": len(catalog),
+        "k": table.k,
+        "seconds": seconds,
+        "mb": (ids.nbytes + scores.nbytes) / 1e6,
+        "agreement": float(agree),
+        "version": new_version,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--version", default=None, help="source version")
+    parser.add_argument("--new-version", default=None,
+                        help="name of the published version (default: timestamp)")
+    parser.add_argument("--k", type=int, default=NEIGHBORS_K)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--block-mb", type=float, default=NEIGHBORS_BLOCK_MB)
+    parser.add_argument("--activate", action="store_true")
+    args = parser.parse_args()
+
+    version = args.version or artifacts.read_active_pointer() or artifacts.LEGACY_VERSION
+    try:
+        report = build(version, args.k, args.workers, args.block_mb, args.new_version)
+    except artifacts.ArtifactError as e:
+        print(f"error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(
+        f"{version}: {report['recipes']} recipes, k={report['k']} in "
+        f"{report['seconds']:.2f}s ({report['recipes'] / max(report['seconds'], 1e-9):.0f} "
+        f"recipes/s), {report['mb']:.1f} MB, exact top-k agreement "
+        f"{report['agreement']:.3f} -> {report['version']}"
+    )
+    if args.activate:
+        artifacts.write_active_pointer(report["version"])
+        print(f"active -> {report['version']}")
+
+
+if __name__ == "__main__":
+    main()
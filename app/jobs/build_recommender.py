@@ -0,0 +1,147 @@
+# app/jobs/build_recommender.py
+"""
+Build a recommender artifact version (replaces 4_Recommender.ipynb).
+
+    python -m app.jobs.build_recommender data/processed/*.csv --version v3 [--activate]
+    python -m app.jobs.build_recommender --convert legacy --version v3 [--word-scheme parsed-v1]
+    python -m app.jobs.build_recommender ... --dedup
+    python -m app.jobs.build_recommender ... --reduce-dim 64 [--reduce-method random]
+
+Recipes are read from CSVs in the data/processed format (Title,
+ingredients_text, target_text), tagged with the notebook's category rules,
+embedded in batches and written as a columnar bundle (services/columnar.py)
+under model/recommender/<version>/. --convert re-packs an existing version
+(including its ingested segments) without re-embedding; with --word-scheme
+it also re-derives the ingredient word sets (services/ingredient_parser.py).
+--dedup collapses near-duplicate recipes into one representative each
+(services/dedup.py); the other titles are kept as its aliases.
+--reduce-dim fits a projection of the embeddings (services/projection.py)
+and stores the reduced embeddings that full scans use for their first pass.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+import pandas as pd
+
+from ..config import (
+    DEDUP_BANDS,
+    DEDUP_INGREDIENT_THRESHOLD,
+    DEDUP_NUM_PERM,
+    DEDUP_TITLE_THRESHOLD,
+    INGEST_BATCH_SIZE,
+    INGREDIENT_WORD_SCHEME,
+    RECOMMENDER_EMBEDDING_MODEL,
+)
+from ..services import artifacts
+from ..services.catalog import RecipeCatalog
+from ..services.catalog_ingest import _norm, build_segment_frame, embed_frame
+from ..services.columnar import write_bundle
+from ..services.dedup import dedup_catalog, read_aliases, write_aliases
+from ..services.ingredient_parser import WORD_SCHEMES, word_set_fn
+from ..services.projection import METHODS as PROJECTION_METHODS, ReducedEmbeddings
+from ..services.vocab import IdSets
+
+
+def build_from_csvs(paths, model_name: str, batch_size: int,
+                    word_scheme: str = INGREDIENT_WORD_SCHEME):
+    from ..deps import load_embed_model
+
+    raw = pd.concat([pd.read_csv(p) for p in paths], ignore_index=True)
+    df = build_segment_frame(raw, word_scheme)
+    # Catalog vectors always come from the reference (PyTorch) model
+    model = load_embed_model(model_name, backend="sentence-transformers")
+    emb = embed_frame(df, batch_size, model=model)
+    return RecipeCatalog(df, emb, {"embedding_model": model_name,
+                                   "word_scheme": word_scheme})
+
+
+def rederive_words(catalog: RecipeCatalog, word_scheme: str) -> RecipeCatalog:
+    """Same recipes and embeddings, word sets rebuilt under `word_scheme`."""
+    to_words = word_set_fn(word_scheme)
+    words = IdSets.from_token_sets(
+        to_words(_norm(t)) for t in catalog.column("ingredients_text")
+    )
+    return RecipeCatalog(catalog.df, catalog.embeddings,
+                         dict(catalog.info, word_scheme=word_scheme),
+                         words=words, categories=catalog.categories)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv", nargs="*")
+    parser.add_argument("--convert", metavar="VERSION",
+                        help="re-pack an existing version instead of building from CSVs")
+    parser.add_argument("--version")
+    parser.add_argument("--model", default=RECOMMENDER_EMBEDDING_MODEL)
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE)
+    parser.add_argument("--word-scheme", choices=sorted(WORD_SCHEMES),
+                        help=f"ingredient word sets (default: {INGREDIENT_WORD_SCHEME} "
+                             "for builds, unchanged for --convert)")
+    parser.add_argument("--dedup", action="store_true",
+                        help="collapse near-duplicate recipes (services/dedup.py)")
+    parser.add_argument("--reduce-dim", type=int, metavar="D",
+                        help="also store D-dimensional embeddings (e.g. 64 or 128) "
+                             "for the first-pass scan (services/projection.py)")
+    parser.add_argument("--reduce-method", choices=PROJECTION_METHODS, default="pca")
+    parser.add_argument("--activate", action="store_true")
+    args = parser.parse_args()
+
+    if bool(args.csv) == bool(args.convert):
+        parser.error("give either CSV paths or --convert VERSION")
+    if args.reduce_dim is not None and args.reduce_dim <= 0:
+        parser.error("--reduce-dim must be positive")
+
+    t0 = time.perf_counter()
+    aliases = {}
+    try:
+        if args.convert:
+            catalog = artifacts.load_version(args.convert)
+            aliases = read_aliases(artifacts.artifact_dir(args.convert))
+            if args.word_scheme and args.word_scheme != catalog.word_scheme:
+                catalog = rederive_words(catalog, args.word_scheme)
+        else:
+            catalog = build_from_csvs(args.csv, args.model, args.batch_size,
+                                      args.word_scheme or INGREDIENT_WORD_SCHEME)
+        if args.dedup:
+            catalog, aliases, report = dedup_catalog(
+                catalog, DEDUP_NUM_PERM, DEDUP_BANDS,
+                DEDUP_INGREDIENT_THRESHOLD, DEDUP_TITLE_THRESHOLD, aliases,
+            )
+            print(f"dedup: {report['before']} -> {report['after']} recipes "
+                  f"({1 - report['after'] / max(report['before'], 1):.1%} smaller, "
+                  f"{report['clusters']} clusters), embeddings "
+                  f"{report['embedding_mb_before']:.1f} -> "
+                  f"{report['embedding_mb_after']:.1f} MB")
+        reduced = None
+        if args.reduce_dim:
+            reduced = ReducedEmbeddings.from_embeddings(catalog.normalized_embeddings,
+                                                        args.reduce_dim, args.reduce_method)
+        t1 = time.perf_counter()
+
+        def _write(tmp: str) -> dict:
+            write_bundle(tmp, catalog)
+            if aliases:
+                write_aliases(tmp, aliases)
+            if reduced is not None:
+                reduced.save(tmp)
+            return catalog.info
+
+        version = artifacts.publish_built(_write, args.version)
+    except artifacts.ArtifactError as e:
+        print(f"error: {e}", file=sys.stderr)
+        sys.exit(1)
+    t2 = time.perf_counter()
+
+    print(f"built {version}: {len(catalog)} recipes, prepare={t1 - t0:.1f}s "
+          f"write={t2 - t1:.1f}s")
+    if args.activate:
+        artifacts.write_active_pointer(version)
+        print(f"active -> {version}")
+
+
+if __name__ == "__main__":
+    main()
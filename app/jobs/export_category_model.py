@@ -0,0 +1,70 @@
+# app/jobs/export_category_model.py
+"""
+Export the category classifier pickles to the array format that
+services/category_service.py memory-maps (services/category_model.py).
+
+    python -m app.jobs.export_category_model [--out DIR] [--texts 2000]
+
+Needs scikit-learn (to unpickle); the API then never imports it. The
+export is checked against the pickled pipeline on --texts held-out
+ingredient lists: labels must match and probabilities agree to 1e-4.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from ..config import CATEGORY_CLASSIFIER_PATH, CATEGORY_MODEL_DIR, CATEGORY_VECTORIZER_PATH
+from ..services.category_model import CategoryModel
+
+TEST_CSV = "data/processed/appetite_test.csv"
+
+
+def _sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def check(exported: CategoryModel, vectorizer, model, texts) -> float:
+    """Largest probability difference; raises if any label differs."""
+    X = vectorizer.transform(texts)
+    expected = model.predict_proba(X)
+    got = exported.predict_proba(texts)
+    if not np.array_equal(model.predict(X), exported.predict(texts)):
+        raise SystemExit("Exported classifier disagrees with the pickled one")
+    return float(np.abs(expected - got).max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=CATEGORY_MODEL_DIR)
+    parser.add_argument("--texts", type=int, default=2000,
+                        help="held-out ingredient lists to check the export on")
+    args = parser.parse_args()
+
+    import joblib
+
+    vectorizer = joblib.load(CATEGORY_VECTORIZER_PATH)
+    model = joblib.load(CATEGORY_CLASSIFIER_PATH)
+    exported = CategoryModel.from_sklearn(vectorizer, model, source={
+        "classifier_sha256": _sha256(CATEGORY_CLASSIFIER_PATH),
+        "vectorizer_sha256": _sha256(CATEGORY_VECTORIZER_PATH),
+    })
+
+    texts = (pd.read_csv(TEST_CSV, usecols=["ingredients_text"]).dropna()
+             ["ingredients_text"].str.lower().head(args.texts).tolist())
+    diff = check(exported, vectorizer, model, texts)
+    if diff > 1e-4:
+        raise SystemExit(f"Exported probabilities differ by up to {diff:.2e}")
+
+    exported.save(args.out)
+    print(f"{args.out}: {len(exported.vocab)} terms, {len(exported.classes)} classes; "
+          f"max probability difference on {len(texts)} texts {diff:.1e}")
+
+
+if __name__ == "__main__":
+    main()
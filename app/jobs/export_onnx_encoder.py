@@ -0,0 +1,151 @@
+# app/jobs/export_onnx_encoder.py
+"""
+Export the query encoder to int8 ONNX for EMBED_BACKEND = "onnx".
+
+    python -m app.jobs.export_onnx_encoder [--model NAME] [--out DIR]
+    python -m app.jobs.export_onnx_encoder --onnx model.onnx   # skip the export
+
+Offline only (needs torch + sentence-transformers): traces the transformer
+(token embeddings, before pooling) to FP32 ONNX, quantizes the weights to
+int8 with onnxruntime's dynamic quantization, and saves the fast tokenizer
+next to it. The export is then checked against the PyTorch model on
+CHECK_PANTRIES: the job fails if any cosine is below --min-cosine. For
+latency and top-k agreement see `python -m app.bench.onnx_encoder`.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from typing import List
+
+import numpy as np
+
+from ..config import ONNX_ENCODER_DIR, RECOMMENDER_EMBEDDING_MODEL
+from ..services.onnx_encoder import INFO_FILE
+
+MODEL_FILE = "model_int8.onnx"
+OPSET = 14
+MIN_COSINE = 0.99
+
+# Query texts as the recommender builds them (embedding_cache.py)
+CHECK_PANTRIES = [
+    "Ingredients: eggs, flour, milk, butter",
+    "Ingredients: chicken thighs, garlic, soy sauce, rice vinegar, brown sugar",
+    "Ingredients: canned chickpeas, tahini, lemon, olive oil",
+    "Ingredients: ground beef, onion, tomato paste, spaghetti, parmesan",
+    "Ingredients: salmon, dill, sour cream, capers",
+    "Ingredients: tofu, broccoli, ginger, sesame oil, scallions",
+    "Ingredients: black beans, corn tortillas, avocado, lime, cilantro",
+    "Ingredients: oats, banana, peanut butter, honey",
+    "Ingredients: potatoes, leeks, chicken stock, heavy cream",
+    "Ingredients: shrimp",
+    "Ingredients: fat free milk, cocoa powder, sugar, vanilla extract",
+    "Ingredients: lamb shoulder, rosemary, anchovies, red wine, shallots, thyme",
+]
+
+
+def export_fp32(model_name: str, path: str):
+    """Trace the SentenceTransformer's transformer to `path`; returns the model."""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st = SentenceTransformer(model_name, device="cpu")
+    transformer = st[0].auto_model.eval()
+    dummy = st.tokenizer(["pantry: eggs, flour"], return_tensors="pt")
+    names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in dummy]
+    dynamic = {n: {0: "batch", 1: "tokens"} for n in names}
+    dynamic["last_hidden_state"] = {0: "batch", 1: "tokens"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(dummy[n] for n in names),
+            path,
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic,
+            opset_version=OPSET,
+        )
+    return st
+
+
+def export(model_name: str, out_dir: str, onnx_path: str = None):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    os.makedirs(out_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        st = None
+        if onnx_path is None:
+            onnx_path = os.path.join(tmp, "model_fp32.onnx")
+            st = export_fp32(model_name, onnx_path)
+
+        quantize_dynamic(onnx_path, os.path.join(out_dir, MODEL_FILE),
+                         weight_type=QuantType.QInt8)
+
+    if st is not None:
+        st.tokenizer.backend_tokenizer.save(os.path.join(out_dir, "tokenizer.json"))
+        dim = st.get_sentence_embedding_dimension()
+        max_seq_length = st.max_seq_length
+        pad_token = st.tokenizer.pad_token
+    else:
+        # Bring-your-own graph: the tokenizer.json must already be in out_dir
+        if not os.path.exists(os.path.join(out_dir, "tokenizer.json")):
+            raise SystemExit(f"--onnx needs {out_dir}/tokenizer.json")
+        dim, max_seq_length, pad_token = 384, 256, "[PAD]"
+
+    info = {
+        "source_model": model_name,
+        "model_file": MODEL_FILE,
+        "quantization": "dynamic-int8",
+        "dim": dim,
+        "max_seq_length": max_seq_length,
+        "pad_token": pad_token,
+        "normalize": True,
+    }
+    with open(os.path.join(out_dir, INFO_FILE), "w") as f:
+        json.dump(info, f, indent=4)
+    return info
+
+
+def check_equivalence(model_name: str, out_dir: str,
+                      texts: List[str] = CHECK_PANTRIES) -> dict:
+    """Cosine between the PyTorch and the ONNX embedding of each text."""
+    from ..deps import load_embed_model
+    from ..services.onnx_encoder import OnnxSentenceEncoder
+
+    reference = load_embed_model(model_name, backend="sentence-transformers")
+    a = np.asarray(reference.encode(texts), dtype=np.float32)
+    b = np.asarray(OnnxSentenceEncoder.for_model(model_name, out_dir).encode(texts),
+                   dtype=np.float32)
+    a /= np.linalg.norm(a, axis=1, keepdims=True)
+    b /= np.linalg.norm(b, axis=1, keepdims=True)
+    cos = (a * b).sum(axis=1)
+    return {"texts": len(texts), "min_cos": float(cos.min()), "mean_cos": float(cos.mean())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=RECOMMENDER_EMBEDDING_MODEL)
+    parser.add_argument("--out", default=ONNX_ENCODER_DIR)
+    parser.add_argument("--onnx", help="existing FP32 export to quantize")
+    parser.add_argument("--min-cosine", type=float, default=MIN_COSINE)
+    args = parser.parse_args()
+
+    info = export(args.model, args.out, args.onnx)
+    size = os.path.getsize(os.path.join(args.out, MODEL_FILE)) / 1e6
+    print(f"wrote {args.out}/{MODEL_FILE} ({size:.1f} MB): {json.dumps(info)}")
+
+    check = check_equivalence(args.model, args.out)
+    print(f"cosine(pytorch, onnx) over {check['texts']} pantries: "
+          f"min {check['min_cos']:.4f} mean {check['mean_cos']:.4f}")
+    if check["min_cos"] < args.min_cosine:
+        print(f"FAIL: min cosine below {args.min_cosine}; do not switch EMBED_BACKEND")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# app/jobs/ingest_recipes.py
+"""
+Append recipes from a CSV (Title, ingredients_text, target_text — the
+data/processed format) to the recommender catalog as a new segment.
+
+    python -m app.jobs.ingest_recipes new_recipes.csv --batch-size 256
+    python -m app.jobs.ingest_recipes --compact
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import pandas as pd
+
+from ..config import INGEST_BATCH_SIZE
+from ..services.artifacts import active_segments_dir
+from ..services.catalog import compact_segments, list_segments
+from ..services.catalog_ingest import ingest_frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("csv", nargs="?")
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE)
+    parser.add_argument("--compact", action="store_true",
+                        help="merge all segments into one after ingesting")
+    args = parser.parse_args()
+
+    if args.csv:
+        t0 = time.perf_counter()
+        raw = pd.read_csv(args.csv)
+        report = ingest_frame(raw, batch_size=args.batch_size)
+        dt = time.perf_counter() - t0
+        print(f"added={report['added']} segment={report['segment']} "
+              f"total={report['total_recipes']} in {dt:.1f}s "
+              f"({report['added'] / dt if dt else 0:.1f} recipes/sec)")
+
+    seg_dir = active_segments_dir()
+
+    if args.compact:
+        merged = compact_segments(seg_dir)
+        print(f"compacted -> {merged}" if merged else "nothing to compact")
+
+    print(f"segments: {len(list_segments(seg_dir))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# app/jobs/nightly_recommendations.py
+"""
+Precompute "tonight's suggestions" for every user with pantry items and
+store them in the user_recommendations table.
+
+    python -m app.jobs.nightly_recommendations --workers 4 --top-k 5
+
+Users are split into batches; each batch is encoded in one encode call and
+scored with one embeddings matmul (recommender.recommend_recipes_batch);
+the overlap term uses each user's expiry/quantity word weights. Users are
+grouped by their stored exclusions first, so every batch shares one
+excluded-recipe mask (most users have none and form one group).
+Batches run in a process pool; the recommender data is loaded in the
+parent first so forked workers share it copy-on-write.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from .. import models
+from ..database import Base, SessionLocal, engine
+from ..deps import get_catalog, get_embed_model
+from ..services.exclusions import normalize_terms
+from ..services.pantry_weights import pantry_word_weights
+
+
+def load_user_pantries(db) -> Dict[int, List[models.PantryItem]]:
+    rows = db.query(models.PantryItem).all()
+    pantries: Dict[int, List[models.PantryItem]] = defaultdict(list)
+    for item in rows:
+        if item.name and item.name.strip():
+            pantries[item.user_id].append(item)
+    return dict(pantries)
+
+
+def load_user_exclusions(db) -> Dict[int, Tuple[str, ...]]:
+    terms: Dict[int, List[str]] = defaultdict(list)
+    for user_id, term in db.query(models.UserExclusion.user_id, models.UserExclusion.term):
+        terms[user_id].append(term)
+    return {u: normalize_terms(t) for u, t in terms.items()}
+
+
+def _warm():
+    get_catalog().warm()
+    # Load the query encoder here so forked workers inherit it instead of
+    # each loading the model (no encode: torch thread pools don't fork well)
+    get_embed_model()
+
+
+def _score_batch(args) -> List[Tuple[int, List[dict]]]:
+    from ..services.recommender import recommend_recipes_batch
+
+    user_ids, pantries, weights, top_k, category, exclude = args
+    recs = recommend_recipes_batch(
+        [", ".join(p) for p in pantries], top_k=top_k, category=category,
+        weights=weights, exclude=exclude,
+    )
+    return list(zip(user_ids, recs))
+
+
+def write_results(db, results: List[Tuple[int, List[dict]]]):
+    """
+    Replace the whole table with `results`, so users the run skipped (their
+    pantry is now empty) keep no suggestions from an old pantry.
+    """
+    db.query(models.UserRecommendation).delete(synchronize_session=False)
+    db.add_all([
+        models.UserRecommendation(
+            user_id=uid,
+            rank=rank,
+            recipe_id=r["id"],
+            title=r["title"],
+            score=r["final_score"],
+        )
+        for uid, recs in results
+        for rank, r in enumerate(recs, 1)
+    ])
+    db.commit()
+
+
+def run(workers: int = 1, batch_size: int = 512, top_k: int = 5,
+        category: Optional[str] = None) -> Dict[str, float]:
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        t0 = time.perf_counter()
+        items = load_user_pantries(db)
+        user_ids = sorted(items)
+        pantries = {u: [item.name.strip() for item in items[u]] for u in user_ids}
+        query_words = get_catalog().query_words
+        weights = {u: pantry_word_weights(items[u], words=query_words) for u in user_ids}
+        exclusions = load_user_exclusions(db)
+
+        groups: Dict[Tuple[str, ...], List[int]] = defaultdict(list)
+        for u in user_ids:
+            groups[exclusions.get(u, ())].append(u)
+        batches = [
+            (
+                group[i:i + batch_size],
+                [pantries[u] for u in group[i:i + batch_size]],
+                [weights[u] for u in group[i:i + batch_size]],
+                top_k,
+                category,
+                exclude,
+            )
+            for exclude, group in groups.items()
+            for i in range(0, len(group), batch_size)
+        ]
+
+        _warm()
+        t1 = time.perf_counter()
+
+        results: List[Tuple[int, List[dict]]] = []
+        if workers > 1 and len(batches) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for part in pool.map(_score_batch, batches):
+                    results.extend(part)
+        else:
+            for batch in batches:
+                results.extend(_score_batch(batch))
+        t2 = time.perf_counter()
+
+        write_results(db, results)
+        t3 = time.perf_counter()
+    finally:
+        db.close()
+
+    n = len(user_ids)
+    return {
+        "users": n,
+        "load_s": t1 - t0,
+        "score_s": t2 - t1,
+        "write_s": t3 - t2,
+        "users_per_sec": n / (t2 - t1) if t2 > t1 else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--category", default=None)
+    args = parser.parse_args()
+
+    report = run(args.workers, args.batch_size, args.top_k, args.category)
+    print(
+        f"users={report['users']} load={report['load_s']:.2f}s "
+        f"score={report['score_s']:.2f}s write={report['write_s']:.2f}s "
+        f"throughput={report['users_per_sec']:.1f} users/sec"
+    )
+
+
+if __name__ == "__main__":
+    main()
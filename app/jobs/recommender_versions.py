@@ -0,0 +1,89 @@
+# app/jobs/recommender_versions.py
+"""
+Manage versioned recommender artifacts (model/recommender/<version>/).
+
+    python -m app.jobs.recommender_versions publish model/ [--version v2] [--activate]
+    python -m app.jobs.recommender_versions list
+    python -m app.jobs.recommender_versions verify <version>
+    python -m app.jobs.recommender_versions activate <version>
+    python -m app.jobs.recommender_versions rollback
+
+activate / rollback only move the ACTIVE pointer; running API workers
+notice it within RECOMMENDER_VERSION_POLL_SECONDS and hot-swap. rollback
+goes back to the version that was active before the current one (ACTIVE
+keeps that history), not to the one that sorts before it.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+
+from ..services import artifacts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("publish")
+    p.add_argument("src_dir")
+    p.add_argument("--version")
+    p.add_argument("--activate", action="store_true")
+
+    sub.add_parser("list")
+
+    p = sub.add_parser("verify")
+    p.add_argument("version")
+
+    p = sub.add_parser("activate")
+    p.add_argument("version")
+
+    sub.add_parser("rollback")
+
+    args = parser.parse_args()
+    versions = artifacts.list_versions()
+    active = artifacts.read_active_pointer()
+
+    try:
+        if args.cmd == "publish":
+            version = artifacts.publish_version(args.src_dir, args.version)
+            print(f"published {version}")
+            if args.activate:
+                artifacts.write_active_pointer(version)
+                print(f"active -> {version}")
+
+        elif args.cmd == "list":
+            for v in versions:
+                m = artifacts.read_manifest(v)
+                mark = "*" if v == active else " "
+                print(f"{mark} {v}  {m['created_at']}  {m.get('embedding_model')}")
+
+        elif args.cmd == "verify":
+            artifacts.verify_version(args.version)
+            print(f"{args.version}: ok")
+
+        elif args.cmd == "activate":
+            if args.version not in versions:
+                raise artifacts.ArtifactError(f"unknown version {args.version}")
+            artifacts.verify_version(args.version)
+            artifacts.write_active_pointer(args.version)
+            print(f"active -> {args.version}")
+
+        elif args.cmd == "rollback":
+            previous = artifacts.read_previous_pointer()
+            if previous is None:
+                raise artifacts.ArtifactError("no previous version to roll back to")
+            if previous not in versions:
+                raise artifacts.ArtifactError(f"previous version {previous} no longer exists")
+            artifacts.verify_version(previous)
+            artifacts.rollback_active_pointer()
+            print(f"active -> {previous}")
+
+    except artifacts.ArtifactError as e:
+        print(f"error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# app/jobs/synth_catalog.py
+"""
+Synthesize large recommender catalogs for capacity planning.
+
+    python -m app.jobs.synth_catalog 100000 1000000 5000000 [--dim 384]
+
+Writes one columnar bundle version per size (synth-100k, synth-1m, ...).
+Each synthetic recipe resamples a recipe from data/processed/*.csv: its
+title, instructions and categories are kept, and about KEEP_LINES of its
+ingredient lines are kept, the rest replaced by random lines from the whole
+corpus. Embeddings are a fixed random projection of the recipe's words
+plus noise, so lexically similar recipes stay close. They are not MiniLM
+vectors, but --dim must match the query encoder (384) for benchmarks to
+run queries against them.
+
+Rows are generated and written in chunks, so memory stays bounded at
+millions of recipes (embeddings go straight into a memory-mapped .npy).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from array import array
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from ..config import INGREDIENT_WORD_SCHEME, RECOMMENDER_EMBEDDING_MODEL
+from ..services import artifacts
+from ..services.catalog import DISPLAY_COLUMNS
+from ..services.catalog_ingest import build_segment_frame
+from ..services.ingredient_parser import word_set_fn
+from ..services.columnar import EMBEDDINGS_FILE, INFO_FILE, RECIPES_FILE, save_id_sets
+from ..services.vocab import IdSets, Vocabulary
+
+SOURCE_CSVS = ("data/processed/appetite_test.csv", "data/processed/appetite_val.csv")
+KEEP_LINES = 0.7        # share of the source recipe's ingredient lines kept
+NOISE = 0.1             # embedding noise, relative to a unit word vector
+
+
+def _size_label(n: int) -> str:
+    if n % 1_000_000 == 0:
+        return f"{n // 1_000_000}m"
+    if n % 1_000 == 0:
+        return f"{n // 1_000}k"
+    return str(n)
+
+
+class _Source:
+    """The real corpus, broken into reusable ingredient lines."""
+
+    def __init__(self, paths=SOURCE_CSVS):
+        df = build_segment_frame(pd.concat([pd.read_csv(p) for p in paths],
+                                           ignore_index=True))
+        self.df = df[DISPLAY_COLUMNS].reset_index(drop=True)
+
+        line_ids: Dict[str, int] = {}
+        self.recipe_lines: List[np.ndarray] = []
+        for text in df["ingredients_text"]:
+            ids = [line_ids.setdefault(line.strip(), len(line_ids))
+                   for line in str(text).split(", ") if line.strip()]
+            self.recipe_lines.append(np.asarray(ids, dtype=np.int32))
+        self.lines = list(line_ids)
+
+        # Word ids per line; a recipe's word set is the union over its lines
+        self.words = Vocabulary()
+        to_words = word_set_fn(INGREDIENT_WORD_SCHEME)
+        self.line_words = [self.words.encode(to_words(line.lower()), add=True)
+                           for line in self.lines]
+        self.categories = IdSets.from_token_sets(
+            {str(c).lower() for c in cats} for cats in df["categories_list"]
+        )
+
+
+def write_synthetic(vdir: str, source: _Source, n: int, dim: int, seed: int,
+                    chunk: int = 50_000) -> Dict:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401
+
+    rng = np.random.default_rng(seed)
+    projection = rng.standard_normal((len(source.words), dim)).astype(np.float32)
+    projection /= np.sqrt(dim)
+
+    emb_out = np.lib.format.open_memmap(f"{vdir}/{EMBEDDINGS_FILE}", mode="w+",
+                                        dtype=np.float32, shape=(n, dim))
+    word_indptr, word_ids = array("i", [0]), array("i")
+    cat_indptr, cat_ids = array("i", [0]), array("i")
+
+    schema = pa.schema([(c, pa.string()) for c in DISPLAY_COLUMNS])
+    with pa.OSFile(f"{vdir}/{RECIPES_FILE}", "wb") as sink, \
+            pa.ipc.new_file(sink, schema) as writer:
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+            picks = rng.integers(0, len(source.df), stop - start)
+            texts = []
+            row_start = len(word_ids)
+            for b in picks:
+                own = source.recipe_lines[b]
+                keep = own[rng.random(len(own)) < KEEP_LINES]
+                lines = np.concatenate([
+                    keep, rng.integers(0, len(source.lines), len(own) - len(keep))
+                ]).astype(np.int32)
+                texts.append(", ".join(source.lines[i] for i in lines))
+                if len(lines):
+                    word_ids.extend(np.unique(np.concatenate(
+                        [source.line_words[i] for i in lines])).tolist())
+                word_indptr.append(len(word_ids))
+                cat_ids.extend(source.categories[b].tolist())
+                cat_indptr.append(len(cat_ids))
+
+            base = source.df.iloc[picks]
+            writer.write_batch(pa.record_batch([
+                pa.array(base["Title"].tolist(), pa.string()),
+                pa.array(texts, pa.string()),
+                pa.array(base["target_text"].tolist(), pa.string()),
+                pa.array(base["categories"].tolist(), pa.string()),
+            ], schema=schema))
+
+            # Random projection of the chunk's bag of words, plus noise.
+            # Slicing copies, so the growing arrays never export a buffer.
+            indptr = np.frombuffer(word_indptr[start:stop + 1], dtype=np.int32) - row_start
+            ids = np.frombuffer(word_ids[row_start:], dtype=np.int32)
+            bow = sparse.csr_matrix((np.ones(len(ids), dtype=np.float32), ids, indptr),
+                                    shape=(stop - start, len(source.words)))
+            emb = bow @ projection
+            emb += NOISE * rng.standard_normal(emb.shape).astype(np.float32)
+            norms = np.linalg.norm(emb, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            emb_out[start:stop] = emb / norms
+            print(f"  {stop}/{n}", flush=True)
+
+    emb_out.flush()
+    del emb_out
+
+    save_id_sets(vdir, "word", IdSets(np.frombuffer(word_indptr, dtype=np.int32),
+                                      np.frombuffer(word_ids, dtype=np.int32),
+                                      source.words))
+    save_id_sets(vdir, "category", IdSets(np.frombuffer(cat_indptr, dtype=np.int32),
+                                          np.frombuffer(cat_ids, dtype=np.int32),
+                                          source.categories.vocab))
+
+    info = {"embedding_model": RECOMMENDER_EMBEDDING_MODEL, "total_recipes": n,
+            "word_scheme": INGREDIENT_WORD_SCHEME, "synthetic": True,
+            "embedding_dim": dim, "seed": seed}
+    with open(f"{vdir}/{INFO_FILE}", "w") as f:
+        json.dump(info, f, indent=4)
+    return info
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sizes", type=int, nargs="+")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk", type=int, default=50_000)
+    args = parser.parse_args()
+
+    source = _Source()
+    print(f"source: {len(source.df)} recipes, {len(source.lines)} ingredient lines, "
+          f"{len(source.words)} words")
+
+    for n in args.sizes:
+        version = f"synth-{_size_label(n)}"
+        t0 = time.perf_counter()
+        artifacts.publish_built(
+            lambda vdir: write_synthetic(vdir, source, n, args.dim, args.seed, args.chunk),
+            version,
+        )
+        print(f"built {version}: {n} recipes in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
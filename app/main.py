@@ -1,6 +1,7 @@
 # app/main.py
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
 from datetime import timedelta
 import json
 import time
@@ -19,8 +20,9 @@ from .auth import (
     authenticate_user,
     create_access_token,
 )
-from .deps import get_current_user_dep, get_db_dep
+from .deps import get_admin_user_dep, get_current_user_dep, get_db_dep
 
+from .services import exclusions as exclusions_service
 from .services import pantry as pantry_service
 from .services import recipes as recipes_service
 from .services import shopping as shopping_service
@@ -35,10 +37,23 @@ from .metrics import (
 
 Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from .config import RECOMMENDER_VERSION_POLL_SECONDS
+    from .services.artifacts import registry
+
+    # Pick up ACTIVE pointer changes made by the CLI / other workers
+    if RECOMMENDER_VERSION_POLL_SECONDS > 0:
+        registry.start_watcher(RECOMMENDER_VERSION_POLL_SECONDS)
+    yield
+
+
 app = FastAPI(
     title="AppetIte Backend",
     description="Backend API for AppetIte project",
     version="0.3.0",
+    lifespan=lifespan,
 )
 
 # ---------------------------
@@ -165,18 +180,163 @@ def get_recommendations(
     db: Session = Depends(get_db_dep),
     current_user: models.User = Depends(get_current_user_dep),
 ):
+    if len(req.exclude) > exclusions_service.MAX_TERMS:
+        raise HTTPException(status_code=400,
+                            detail=f"At most {exclusions_service.MAX_TERMS} exclusions.")
+    if req.diversity is not None and not 0.0 <= req.diversity <= 1.0:
+        raise HTTPException(status_code=400, detail="diversity must be between 0 and 1.")
     USAGE_COUNT.labels(feature="recommendations").inc()
 
     pantry_items = pantry_service.list_pantry_items(db, current_user.id)
     ingredients = [item.name for item in pantry_items]
 
-    return recipes_service.recommend_recipes_from_inventory(
+    return recipes_service.recommend_recipes_for_user(
+        db,
+        current_user.id,
         ingredients=ingredients,
         category=req.category,
         max_recipes=5,
+        include_generated=req.include_generated,
+        exclude=req.exclude,
+        diversity=req.diversity,
+    )
+
+
+@app.post("/recommendations/cook-now", response_model=List[schemas.CookNowRecipe])
+def cook_now(
+    req: schemas.CookNowRequest,
+    db: Session = Depends(get_db_dep),
+    current_user: models.User = Depends(get_current_user_dep),
+):
+    """Recipes makeable from the pantry with at most max_missing ingredients to buy."""
+    from .config import COOK_NOW_MAX_MISSING, COOK_NOW_MAX_MISSING_LIMIT
+
+    max_missing = COOK_NOW_MAX_MISSING if req.max_missing is None else req.max_missing
+    if not 0 <= max_missing <= COOK_NOW_MAX_MISSING_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"max_missing must be between 0 and {COOK_NOW_MAX_MISSING_LIMIT}.",
+        )
+    if len(req.exclude) > exclusions_service.MAX_TERMS:
+        raise HTTPException(status_code=400,
+                            detail=f"At most {exclusions_service.MAX_TERMS} exclusions.")
+    USAGE_COUNT.labels(feature="cook_now").inc()
+
+    return recipes_service.cook_now_for_user(
+        db,
+        current_user.id,
+        max_missing,
+        category=req.category,
+        limit=max(1, min(req.limit, 100)),
+        exclude=req.exclude,
     )
 
 
+@app.get("/users/me/exclusions", response_model=schemas.Exclusions)
+def get_exclusions(
+    db: Session = Depends(get_db_dep),
+    current_user: models.User = Depends(get_current_user_dep),
+):
+    """Ingredients / allergen groups left out of every recommendation."""
+    return schemas.Exclusions(exclude=exclusions_service.get_user_exclusions(db, current_user.id))
+
+
+@app.put("/users/me/exclusions", response_model=schemas.Exclusions)
+def set_exclusions(
+    req: schemas.Exclusions,
+    db: Session = Depends(get_db_dep),
+    current_user: models.User = Depends(get_current_user_dep),
+):
+    try:
+        terms = exclusions_service.set_user_exclusions(db, current_user.id, req.exclude)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    USAGE_COUNT.labels(feature="exclusions_set").inc()
+    return schemas.Exclusions(exclude=terms)
+
+
+@app.get("/exclusions/groups")
+def exclusion_groups():
+    """Allergen group names accepted in `exclude`, with the terms they cover."""
+    return exclusions_service.ALLERGEN_GROUPS
+
+
+@app.get("/recipes/{recipe_id}/similar", response_model=List[schemas.SimilarRecipe])
+def similar_recipes(
+    recipe_id: int,
+    limit: int = 10,
+    current_user: models.User = Depends(get_current_user_dep),
+):
+    """"More like this": the catalog recipes closest to one recipe."""
+    from .config import NEIGHBORS_K
+
+    recipes = recipes_service.similar_recipes(recipe_id, max(1, min(limit, NEIGHBORS_K)))
+    if recipes is None:
+        raise HTTPException(status_code=404, detail=f"Unknown recipe {recipe_id}.")
+    USAGE_COUNT.labels(feature="similar_recipes").inc()
+    return recipes
+
+
+@app.post("/recipes/ingest", response_model=schemas.RecipeIngestResponse, status_code=201)
+def ingest_recipes(
+    req: schemas.RecipeIngestRequest,
+    current_user: models.User = Depends(get_admin_user_dep),
+):
+    """Embed and append new recipes to the shared recommender catalog (admins only)."""
+    import pandas as pd
+    from .services.catalog_ingest import ingest_frame
+
+    USAGE_COUNT.labels(feature="recipe_ingest").inc()
+
+    raw = pd.DataFrame({
+        "Title": [r.title for r in req.recipes],
+        "ingredients_text": [", ".join(r.ingredients) for r in req.recipes],
+        "target_text": [
+            f"Title: {r.title}\nInstructions: {r.instructions}" for r in req.recipes
+        ],
+    })
+    return schemas.RecipeIngestResponse(**ingest_frame(raw))
+
+
+# ---------- Recommender artifact versions ----------
+
+@app.get("/recommender/versions")
+def recommender_versions(current_user: models.User = Depends(get_admin_user_dep)):
+    from .services import artifacts
+
+    return {
+        "active": artifacts.registry.active_version(),
+        "pointer": artifacts.read_active_pointer(),
+        "previous": artifacts.read_previous_pointer(),
+        "available": artifacts.list_versions(),
+    }
+
+
+@app.post("/recommender/versions/{version}/activate", status_code=202)
+def activate_recommender_version(
+    version: str,
+    current_user: models.User = Depends(get_admin_user_dep),
+):
+    """Load `version` in the background and hot-swap it in when ready."""
+    from .services import artifacts
+
+    if version not in artifacts.list_versions():
+        raise HTTPException(status_code=404, detail=f"Unknown version '{version}'.")
+    artifacts.registry.activate(version)
+    return {"status": "loading", "version": version}
+
+
+@app.post("/recommender/versions/rollback")
+def rollback_recommender_version(current_user: models.User = Depends(get_admin_user_dep)):
+    from .services import artifacts
+
+    try:
+        version = artifacts.registry.rollback()
+    except artifacts.ArtifactError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": "ok", "version": version}
+
+
 # ---------- Quick Generate ----------
 
 @app.post("/quick-generate", response_model=schemas.QuickGenerateResponse)
@@ -189,6 +349,32 @@ def quick_generate(
     return schemas.QuickGenerateResponse(recipe=recipe)
 
 
+# ---------- Categories ----------
+
+@app.post("/categories/batch", response_model=List[schemas.CategoryTags])
+def tag_categories_batch(
+    req: schemas.CategoryBatchRequest,
+    current_user: models.User = Depends(get_current_user_dep),
+):
+    """Top-k category labels with probabilities for each ingredient list."""
+    from .config import CATEGORY_BATCH_MAX, CATEGORY_TOP_K
+    from .services import category_service
+
+    if len(req.items) > CATEGORY_BATCH_MAX:
+        raise HTTPException(status_code=400,
+                            detail=f"At most {CATEGORY_BATCH_MAX} items per request.")
+    top_k = CATEGORY_TOP_K if req.top_k is None else req.top_k
+    if top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be at least 1.")
+    USAGE_COUNT.labels(feature="categories_batch").inc()
+
+    tagged = category_service.tag_categories_batch(req.items, top_k=top_k)
+    return [
+        {"categories": [{"label": label, "probability": p} for label, p in tags]}
+        for tags in tagged
+    ]
+
+
 # ---------- Shopping List ----------
 
 @app.post("/shopping-list", response_model=schemas.ShoppingListRead)
@@ -1,7 +1,7 @@
 # app/metrics.py
 from __future__ import annotations
 
-from prometheus_client import Counter, Histogram, Gauge
+from prometheus_client import Counter, Histogram, Gauge, Info
 
 # -------------------------
 # Core HTTP metrics
@@ -41,4 +41,23 @@ FEEDBACK_COUNT = Counter(
     "appetite_feedback_total",
     "User feedback count by page and rating",
     ["page", "rating"],
-)
\ No newline at end of file
+)
+
+
+# -------------------------
+# Recommender artifacts
+# -------------------------
+RECOMMENDER_INFO = Info(
+    "appetite_recommender",
+    "Active recommender artifact version",
+)
+
+RECOMMENDER_RECIPES = Gauge(
+    "appetite_recommender_recipes",
+    "Number of recipes in the active recommender catalog",
+)
+
+
+def set_recommender_version(version, total_recipes: int):
+    RECOMMENDER_INFO.info({"version": str(version)})
+    RECOMMENDER_RECIPES.set(total_recipes)
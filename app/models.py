@@ -35,6 +35,16 @@ class User(Base):
         back_populates="user",
         cascade="all, delete-orphan"
     )
+    recommendations = relationship(
+        "UserRecommendation",
+        back_populates="user",
+        cascade="all, delete-orphan"
+    )
+    exclusions = relationship(
+        "UserExclusion",
+        back_populates="user",
+        cascade="all, delete-orphan"
+    )
 
 
 class PantryItem(Base):
@@ -82,4 +92,45 @@ class Feedback(Base):
 
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    user = relationship("User", back_populates="feedback_entries")
\ No newline at end of file
+    user = relationship("User", back_populates="feedback_entries")
+
+
+class UserRecommendation(Base):
+    """Precomputed suggestions written by app/jobs/nightly_recommendations.py."""
+    __tablename__ = "user_recommendations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+
+    rank = Column(Integer, nullable=False)        # 1 = best
+    recipe_id = Column(Integer, nullable=False)   # row id in the recommender catalog
+    title = Column(String(256), nullable=False)
+    score = Column(Float, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    user = relationship("User", back_populates="recommendations")
+
+
+class UserExclusion(Base):
+    """Ingredient or allergen group the user never wants recommended."""
+    __tablename__ = "user_exclusions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+
+    term = Column(String(128), nullable=False)   # see services/exclusions.py
+
+    user = relationship("User", back_populates="exclusions")
+
+
+class UserStateVersion(Base):
+    """
+    Bumped with every pantry / exclusion change, in the same transaction.
+    API workers compare it with their cached per-user state
+    (services/user_recommendations.py) and rebuild on a mismatch.
+    """
+    __tablename__ = "user_state_versions"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
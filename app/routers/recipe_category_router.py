@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
-from app.services.category_service import categorize_recipe
+from app.services.category_service import tag_categories
 
 router = APIRouter(prefix="/recipes", tags=["Recipes"])
 
@@ -9,5 +9,5 @@ class CategoryRequest(BaseModel):
 
 @router.post("/categorize")
 def categorize(req: CategoryRequest):
-    tags = categorize_recipe(req.text)
+    tags = tag_categories(req.text)
     return {"categories": tags}
\ No newline at end of file
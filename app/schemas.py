@@ -47,14 +47,60 @@ class PantryItemRead(PantryItemBase):
 # ---------- Recipes ----------
 
 class Recipe(BaseModel):
+    id: Optional[int] = None  # row id in the recommender catalog (None = generated)
     title: str
     ingredients: List[str]
     instructions: str
     category: Optional[str] = None
 
 
+class CookNowRecipe(Recipe):
+    missing: List[str]          # canonical names of the ingredients to buy
+    missing_count: int
+    covered_count: int          # recipe ingredients the pantry covers
+
+
+class SimilarRecipe(Recipe):
+    score: float                # embedding cosine with the source recipe
+    aliases: List[str] = []     # titles of near-duplicates collapsed into it
+
+
+class CookNowRequest(BaseModel):
+    category: Optional[str] = None
+    max_missing: Optional[int] = None   # default COOK_NOW_MAX_MISSING
+    limit: int = 20
+    exclude: List[str] = []             # on top of the user's stored exclusions
+
+
 class RecommendationRequest(BaseModel):
     category: Optional[str] = None
+    # Opt-in: prepend one FLAN-T5 generated recipe (adds model latency)
+    include_generated: bool = False
+    exclude: List[str] = []             # on top of the user's stored exclusions
+    # MMR lambda in [0, 1]: lower = more varied results, 1 = plain ranking
+    diversity: Optional[float] = None
+
+
+class Exclusions(BaseModel):
+    # ingredient words / names or allergen groups (GET /exclusions/groups)
+    exclude: List[str]
+
+
+class RecipeIngest(BaseModel):
+    title: str
+    ingredients: List[str]
+    instructions: str
+
+
+class RecipeIngestRequest(BaseModel):
+    recipes: List[RecipeIngest]
+
+
+class RecipeIngestResponse(BaseModel):
+    added: int
+    first_id: int               # catalog id of the first added recipe
+    segment: Optional[str] = None
+    total_recipes: int
 
 
 class QuickGenerateRequest(BaseModel):
@@ -65,6 +111,23 @@ class QuickGenerateResponse(BaseModel):
     recipe: Recipe
 
 
+# ---------- Categories ----------
+
+class CategoryBatchRequest(BaseModel):
+    # one ingredient list per item to tag
+    items: List[List[str]]
+    top_k: Optional[int] = None         # default CATEGORY_TOP_K
+
+
+class CategoryScore(BaseModel):
+    label: str
+    probability: float
+
+
+class CategoryTags(BaseModel):
+    categories: List[CategoryScore]     # most likely first
+
+
 # ---------- Shopping ----------
 
 class ShoppingListCreate(BaseModel):
@@ -0,0 +1,374 @@
+# app/services/artifacts.py
+"""
+Versioned recommender artifacts and zero-downtime hot swap.
+
+Layout:
+    model/recommender/
+        ACTIVE                      name of the active version, then the
+                                    versions active before it (newest first)
+        <version>/
+            manifest.json           version, created_at, files + sha256
+            recommender_embeddings.npy
+            recommender_metadata.pkl
+            recommender_model_info.json
+            recommender_segments/   ingested segments (see catalog.py)
+
+A version built by app/jobs/build_recommender.py holds the columnar bundle
+(columnar.py) instead of the .pkl/.npy pair; load_version() picks the
+loader from the files present.
+
+Without model/recommender/ACTIVE the flat files in model/ are served as
+version "legacy".
+
+ArtifactRegistry.activate() loads and warms the new catalog on a
+background thread, checks the manifest hashes, then swaps the single
+catalog reference in deps. Requests that already grabbed the old catalog
+finish on it. The previous catalog is kept in memory for an instant
+rollback().
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from ..config import (
+    RECOMMENDER_EMB_PATH,
+    RECOMMENDER_INFO_PATH,
+    RECOMMENDER_META_PATH,
+    RECOMMENDER_SEGMENTS_DIR,
+    RECOMMENDER_VERSIONS_DIR,
+)
+from .catalog import RecipeCatalog, load_catalog
+from .columnar import BUNDLE_FORMAT, is_bundle, load_bundle, write_bundle
+
+LEGACY_VERSION = "legacy"
+MANIFEST = "manifest.json"
+POINTER_HISTORY = 10        # previous versions remembered in ACTIVE
+ARTIFACT_FILES = (
+    "recommender_embeddings.npy",
+    "recommender_metadata.pkl",
+    "recommender_model_info.json",
+)
+
+
+class ArtifactError(Exception):
+    pass
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _atomic_write(path: str, text: str):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+# -------------------------
+# On-disk versions
+# -------------------------
+def version_dir(version: str, root: str = RECOMMENDER_VERSIONS_DIR) -> str:
+    return os.path.join(root, version)
+
+
+def list_versions(root: str = RECOMMENDER_VERSIONS_DIR) -> List[str]:
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        v for v in os.listdir(root)
+        if os.path.isfile(os.path.join(root, v, MANIFEST))
+    )
+
+
+def _read_pointer(root: str) -> List[str]:
+    path = os.path.join(root, "ACTIVE")
+    if not os.path.isfile(path):
+        return []
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def _write_pointer(history: List[str], root: str):
+    os.makedirs(root, exist_ok=True)
+    text = "".join(v + "\n" for v in history[:POINTER_HISTORY + 1])
+    _atomic_write(os.path.join(root, "ACTIVE"), text)
+
+
+def read_active_pointer(root: str = RECOMMENDER_VERSIONS_DIR) -> Optional[str]:
+    history = _read_pointer(root)
+    return history[0] if history else None
+
+
+def read_previous_pointer(root: str = RECOMMENDER_VERSIONS_DIR) -> Optional[str]:
+    """The version that was active before the current one, if recorded."""
+    history = _read_pointer(root)
+    return history[1] if len(history) > 1 else None
+
+
+def write_active_pointer(version: str, root: str = RECOMMENDER_VERSIONS_DIR):
+    """Point ACTIVE at `version`; the one it replaces becomes the rollback target."""
+    history = _read_pointer(root)
+    if history and history[0] == version:
+        return
+    _write_pointer([version] + [v for v in history if v != version], root)
+
+
+def rollback_active_pointer(root: str = RECOMMENDER_VERSIONS_DIR) -> str:
+    """Point ACTIVE back at the previously active version and return it."""
+    history = _read_pointer(root)
+    if len(history) < 2:
+        raise ArtifactError("no previous version to roll back to")
+    _write_pointer(history[1:], root)
+    return history[1]
+
+
+def clear_active_pointer(root: str = RECOMMENDER_VERSIONS_DIR):
+    path = os.path.join(root, "ACTIVE")
+    if os.path.isfile(path):
+        os.remove(path)
+
+
+def read_manifest(version: str, root: str = RECOMMENDER_VERSIONS_DIR) -> Dict:
+    with open(os.path.join(version_dir(version, root), MANIFEST)) as f:
+        return json.load(f)
+
+
+def write_manifest(vdir: str, version: str, extra: Optional[Dict] = None) -> Dict:
+    files = {}
+    for name in sorted(os.listdir(vdir)):
+        path = os.path.join(vdir, name)
+        if name == MANIFEST or not os.path.isfile(path):
+            continue
+        files[name] = {"sha256": _sha256(path), "bytes": os.path.getsize(path)}
+    manifest = {
+        "version": version,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "files": files,
+    }
+    manifest.update(extra or {})
+    _atomic_write(os.path.join(vdir, MANIFEST), json.dumps(manifest, indent=2))
+    return manifest
+
+
+def verify_version(version: str, root: str = RECOMMENDER_VERSIONS_DIR):
+    """Raise ArtifactError if any file is missing or its hash changed."""
+    manifest = read_manifest(version, root)
+    vdir = version_dir(version, root)
+    for name, meta in manifest["files"].items():
+        path = os.path.join(vdir, name)
+        if not os.path.isfile(path):
+            raise ArtifactError(f"{version}: missing {name}")
+        if _sha256(path) != meta["sha256"]:
+            raise ArtifactError(f"{version}: hash mismatch for {name}")
+
+
+def publish_version(src_dir: str, version: Optional[str] = None,
+                    root: str = RECOMMENDER_VERSIONS_DIR) -> str:
+    """Copy the three artifact files from src_dir into a new version dir."""
+    version = version or time.strftime("%Y%m%d-%H%M%S")
+    final = version_dir(version, root)
+    if os.path.exists(final):
+        raise ArtifactError(f"version {version} already exists")
+
+    tmp = version_dir(f".tmp_{version}", root)
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name in ARTIFACT_FILES:
+        src = os.path.join(src_dir, name)
+        if not os.path.isfile(src):
+            raise ArtifactError(f"missing {src}")
+        shutil.copy2(src, os.path.join(tmp, name))
+
+    with open(os.path.join(tmp, "recommender_model_info.json")) as f:
+        info = json.load(f)
+    write_manifest(tmp, version, {"embedding_model": info.get("embedding_model")})
+    os.rename(tmp, final)
+    return version
+
+
+def publish_built(write: Callable[[str], Dict], version: Optional[str] = None,
+                  root: str = RECOMMENDER_VERSIONS_DIR) -> str:
+    """
+    Publish a columnar bundle written by `write(tmp_dir)`, which returns the
+    model info. The version dir only appears once it is complete.
+    """
+    version = version or time.strftime("%Y%m%d-%H%M%S")
+    final = version_dir(version, root)
+    if os.path.exists(final):
+        raise ArtifactError(f"version {version} already exists")
+
+    tmp = version_dir(f".tmp_{version}", root)
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    info = write(tmp)
+    write_manifest(tmp, version, {"embedding_model": info.get("embedding_model"),
+                                  "format": BUNDLE_FORMAT})
+    os.rename(tmp, final)
+    return version
+
+
+def publish_bundle(catalog: RecipeCatalog, version: Optional[str] = None,
+                   root: str = RECOMMENDER_VERSIONS_DIR) -> str:
+    """Write `catalog` as a columnar bundle in a new version dir."""
+    def _write(tmp: str) -> Dict:
+        write_bundle(tmp, catalog)
+        return catalog.info
+
+    return publish_built(_write, version, root)
+
+
+def artifact_dir(version: Optional[str],
+                 root: str = RECOMMENDER_VERSIONS_DIR) -> Optional[str]:
+    """Directory holding a version's files (model/ for "legacy")."""
+    if version is None:
+        return None
+    if version == LEGACY_VERSION:
+        return os.path.dirname(RECOMMENDER_EMB_PATH)
+    return version_dir(version, root)
+
+
+def active_segments_dir(root: str = RECOMMENDER_VERSIONS_DIR) -> str:
+    version = read_active_pointer(root)
+    if version is None:
+        return RECOMMENDER_SEGMENTS_DIR
+    return os.path.join(version_dir(version, root), "recommender_segments")
+
+
+def load_version(version: str, root: str = RECOMMENDER_VERSIONS_DIR,
+                 verify: bool = True) -> RecipeCatalog:
+    """
+    Open `version`. Missing files raise FileNotFoundError; anything else
+    that keeps it from loading (a truncated or corrupt file) ArtifactError.
+    """
+    try:
+        return _load_version(version, root, verify)
+    except (ArtifactError, FileNotFoundError):
+        raise
+    except Exception as e:
+        raise ArtifactError(f"{version}: unreadable artifacts ({e!r})") from e
+
+
+def _load_version(version: str, root: str, verify: bool) -> RecipeCatalog:
+    if version == LEGACY_VERSION:
+        return load_catalog(
+            RECOMMENDER_META_PATH,
+            RECOMMENDER_EMB_PATH,
+            RECOMMENDER_INFO_PATH,
+            RECOMMENDER_SEGMENTS_DIR,
+            version=LEGACY_VERSION,
+        )
+
+    if verify:
+        verify_version(version, root)
+    vdir = version_dir(version, root)
+    if is_bundle(vdir):
+        return load_bundle(vdir, os.path.join(vdir, "recommender_segments"),
+                           version=version)
+    return load_catalog(
+        os.path.join(vdir, "recommender_metadata.pkl"),
+        os.path.join(vdir, "recommender_embeddings.npy"),
+        os.path.join(vdir, "recommender_model_info.json"),
+        os.path.join(vdir, "recommender_segments"),
+        version=version,
+    )
+
+
+def load_active_catalog(root: str = RECOMMENDER_VERSIONS_DIR) -> RecipeCatalog:
+    return load_version(read_active_pointer(root) or LEGACY_VERSION, root)
+
+
+# -------------------------
+# In-process hot swap
+# -------------------------
+class ArtifactRegistry:
+    def __init__(self, root: str = RECOMMENDER_VERSIONS_DIR):
+        self.root = root
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._lock = threading.Lock()
+        self._previous: List[RecipeCatalog] = []
+
+    def active_version(self) -> Optional[str]:
+        from ..deps import peek_catalog
+
+        catalog = peek_catalog()
+        return catalog.version if catalog is not None else None
+
+    def activate(self, version: str, background: bool = True,
+                 persist: bool = True) -> Future:
+        """Load + warm `version` off the request path, then swap it in."""
+        future = self._executor.submit(self._activate, version, persist)
+        if not background:
+            future.result()
+        return future
+
+    def _activate(self, version: str, persist: bool) -> str:
+        catalog = load_version(version, self.root).warm()
+        self._swap(catalog)
+        if persist and version != LEGACY_VERSION:
+            write_active_pointer(version, self.root)
+        return version
+
+    def _swap(self, catalog: RecipeCatalog, remember: bool = True):
+        from ..deps import get_pantry_embedding_cache, peek_catalog, set_catalog
+        from ..metrics import set_recommender_version
+
+        with self._lock:
+            old = peek_catalog()
+            set_catalog(catalog)
+            if remember and old is not None and old.version != catalog.version:
+                # Keep one previous catalog in memory for instant rollback
+                self._previous = [old]
+
+        if old is not None and old.info.get("embedding_model") != catalog.info.get("embedding_model"):
+            get_pantry_embedding_cache().clear()
+        set_recommender_version(catalog.version, len(catalog))
+
+    def rollback(self) -> str:
+        """Swap back to the previously active catalog."""
+        with self._lock:
+            if not self._previous:
+                raise ArtifactError("no previous version to roll back to")
+            previous = self._previous.pop()
+        self._swap(previous, remember=False)
+        if previous.version == LEGACY_VERSION:
+            clear_active_pointer(self.root)
+        elif read_previous_pointer(self.root) == previous.version:
+            rollback_active_pointer(self.root)
+        else:
+            write_active_pointer(previous.version, self.root)
+        return previous.version
+
+    def poll(self):
+        """Pick up an ACTIVE pointer changed by another process (CLI / worker)."""
+        wanted = read_active_pointer(self.root) or LEGACY_VERSION
+        active = self.active_version()
+        # Nothing loaded yet: the first get_catalog() reads the pointer itself
+        if active is not None and wanted != active:
+            self.activate(wanted, persist=False).result()
+
+    def start_watcher(self, interval: float):
+        def _loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.poll()
+                except Exception as e:
+                    print("⚠️ Recommender version poll failed:", e)
+
+        threading.Thread(target=_loop, name="recommender-version-watcher",
+                         daemon=True).start()
+
+
+registry = ArtifactRegistry()
@@ -0,0 +1,117 @@
+# app/services/batching_encoder.py
+"""
+Cross-request micro-batching for the query encoder.
+
+API workers serve requests on many threads, and each cache miss runs
+the transformer on a batch of one. BatchingEncoder has the same
+encode() contract as SentenceTransformer / OnnxSentenceEncoder. Small
+calls are queued, and one worker thread runs them together: it takes
+everything queued, waits up to `max_wait` seconds for more while the
+batch is under `max_batch` texts, then makes one encode() call and hands
+each caller its rows. Calls queued while a forward pass runs make up the
+next batch, so under load batches fill without waiting at all.
+
+Calls with `max_batch` or more texts, or with any encode() keyword
+(batch_size, show_progress_bar, ...), bypass the queue and go to the
+model unchanged. Identical texts within a batch are encoded once, and
+texts are passed shortest first at the model's own sub-batch size, so a
+long pantry doesn't pad the whole batch.
+
+Whether batching pays off depends on the backend and the core count; it
+is off by default (ENCODER_MAX_BATCH = 0). Measure with
+app/bench/encoder_batching.py on the serving hardware before enabling it.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Union
+
+import numpy as np
+
+
+class _Request:
+    __slots__ = ("texts", "done", "result", "error")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class BatchingEncoder:
+    def __init__(self, model, max_batch: int = 64, max_wait: float = 0.002):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "deque[_Request]" = deque()
+        self._cond = threading.Condition()
+        self._pid = None        # process the worker thread runs in
+        self.stats: Dict[str, int] = {"calls": 0, "batches": 0, "texts": 0, "bypassed": 0}
+
+    def __getattr__(self, name):
+        # Everything but encode() (dimension, tokenizer, ...) is the model's
+        return getattr(self.model, name)
+
+    def encode(self, sentences: Union[str, Iterable[str]], **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts or kwargs or len(texts) >= self.max_batch:
+            with self._cond:
+                self.stats["bypassed"] += 1
+            return self.model.encode(sentences if single else texts, **kwargs)
+
+        req = _Request(texts)
+        with self._cond:
+            self._ensure_worker()
+            self.stats["calls"] += 1
+            self._queue.append(req)
+            self._cond.notify()
+        req.done.wait()
+        if req.error is not None:
+            raise req.error
+        return req.result[0] if single else req.result
+
+    def _ensure_worker(self):
+        # Called with _cond held. A forked child has no copy of the thread.
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name="batching-encoder", daemon=True).start()
+
+    def _take_batch(self) -> List[_Request]:
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            batch, size = [], 0
+            deadline = time.monotonic() + self.max_wait
+            while True:
+                while self._queue and size + len(self._queue[0].texts) <= self.max_batch:
+                    req = self._queue.popleft()
+                    batch.append(req)
+                    size += len(req.texts)
+                remaining = deadline - time.monotonic()
+                if self._queue or size >= self.max_batch or remaining <= 0:
+                    return batch
+                self._cond.wait(remaining)
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            # Unique texts, shortest first so the model's sub-batches pad little
+            unique = sorted({t for req in batch for t in req.texts}, key=len)
+            index = {text: i for i, text in enumerate(unique)}
+            try:
+                embs = np.asarray(self.model.encode(unique), dtype=np.float32)
+                for req in batch:
+                    req.result = embs[[index[t] for t in req.texts]]
+            except Exception as e:  # every caller in the batch sees the failure
+                for req in batch:
+                    req.error = e
+            with self._cond:
+                self.stats["batches"] += 1
+                self.stats["texts"] += len(index)
+            for req in batch:
+                req.done.set()
@@ -0,0 +1,417 @@
+# app/services/catalog.py
+"""
+The recommender catalog: recipe metadata, embeddings and the derived
+indexes, plus append-only segments for recipes ingested after the
+notebook build.
+
+On disk:
+    model/recommender_embeddings.npy      base embeddings (4_Recommender.ipynb)
+    model/recommender_metadata.pkl        base metadata
+    model/recommender_segments/seg_<first>-<last>/
+        embeddings.npy
+        metadata.pkl
+
+Segments are numbered by ingestion sequence and loaded in order after the
+base, so recipe ids (row positions) never change. Compaction merges
+segments <first>..<last> into one; a segment whose range is covered by a
+wider one is ignored, so a crash mid-compaction never duplicates rows.
+Writing and compacting hold an flock on <segments>/.lock, so ingests and
+compactions in different processes never pick the same sequence number or
+merge a segment that is still being written.
+"""
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from .coverage import CoverageIndex
+from .exclusions import mask_from_index, normalize_terms, resolve
+from .ingredient_parser import canonical_names, word_set_fn
+from .lexical import LexicalIndex
+from .neighbors import NeighborTable
+from .projection import ReducedEmbeddings
+from .recipe_index import IngredientIndex
+from .vocab import IdSets
+
+_SEGMENT_RE = re.compile(r"^seg_(\d+)-(\d+)$")
+
+DISPLAY_COLUMNS = ["Title", "ingredients_text", "target_text", "categories"]
+
+META_COLUMNS = [
+    "Title", "ingredients_text", "target_text", "categories",
+    "ingredients_words", "categories_list",
+]
+
+
+def _lower_categories(categories_lists):
+    return ({str(c).lower() for c in cats} for cats in categories_lists)
+
+
+class RecipeCatalog:
+    """
+    One immutable view of the catalog. Derived structures (indexes,
+    unit-normalized embeddings) are built on first use.
+
+    Word sets and categories are kept as integer-coded IdSets (vocab.py);
+    a df passed with ingredients_words / categories_list columns is
+    interned and those object columns are dropped.
+    """
+
+    def __init__(self, df: Optional[pd.DataFrame], embeddings: np.ndarray, info: dict,
+                 ingredient_index: Optional[IngredientIndex] = None,
+                 category_index: Optional[IngredientIndex] = None,
+                 normalized_embeddings: Optional[np.ndarray] = None,
+                 version: Optional[str] = None, seg_dir: Optional[str] = None,
+                 words: Optional[IdSets] = None,
+                 categories: Optional[IdSets] = None,
+                 lexical: Optional[LexicalIndex] = None,
+                 ingredients: Optional[IdSets] = None):
+        if words is None:
+            words = IdSets.from_token_sets(df["ingredients_words"])
+            categories = IdSets.from_token_sets(_lower_categories(df["categories_list"]))
+            df = df.drop(columns=["ingredients_words", "categories_list"])
+        self.words = words
+        self.categories = categories
+        self._df = df
+        self.embeddings = embeddings
+        self.info = info
+        self._ingredient_index = ingredient_index
+        self._category_index = category_index
+        self._normalized = normalized_embeddings
+        self._lexical = lexical
+        self._ingredients = ingredients
+        self._coverage = None
+        self._exclusions: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._neighbors = None      # NeighborTable, or False when there is none
+        self._aliases = None        # recipe id -> titles collapsed into it (dedup.py)
+        self._reduced = None        # ReducedEmbeddings, or False when there are none
+        self.version = version      # artifact version ("legacy" for the flat layout)
+        self.seg_dir = seg_dir      # where ingested segments for this catalog live
+        self._lock = threading.Lock()
+
+    @property
+    def df(self) -> pd.DataFrame:
+        return self._df
+
+    @property
+    def word_scheme(self) -> str:
+        """How `words` were derived (ingredient_parser.WORD_SCHEMES)."""
+        return self.info.get("word_scheme", "split")
+
+    def query_words(self, text: str) -> Set[str]:
+        """Word set of a pantry / query string, matching this catalog's words."""
+        return word_set_fn(self.word_scheme)(text)
+
+    def __len__(self):
+        return len(self.words)
+
+    def record(self, recipe_id: int) -> dict:
+        """Display columns of one recipe (used to format results)."""
+        row = self.df.iloc[recipe_id]
+        return {c: row.get(c) for c in DISPLAY_COLUMNS}
+
+    def column(self, name: str) -> list:
+        """One display column as a list (one value per recipe)."""
+        return self.df[name].tolist()
+
+    def warm(self) -> "RecipeCatalog":
+        """Build every lazy structure now (before the catalog takes traffic)."""
+        from ..config import GAMMA_LEXICAL, RECOMMENDER_MODE, REDUCED_RESCORE_POOL
+
+        self.indexes()
+        self.normalized_embeddings
+        if GAMMA_LEXICAL or RECOMMENDER_MODE == "lexical":
+            self.lexical()
+        if REDUCED_RESCORE_POOL:
+            self.reduced()
+        return self
+
+    def as_tuple(self):
+        return self.df, self.embeddings, self.info
+
+    def indexes(self) -> Tuple[IngredientIndex, IngredientIndex]:
+        with self._lock:
+            if self._ingredient_index is None:
+                self._ingredient_index = IngredientIndex.from_id_sets(self.words)
+                self._category_index = IngredientIndex.from_id_sets(self.categories)
+            return self._ingredient_index, self._category_index
+
+    @property
+    def normalized_embeddings(self) -> np.ndarray:
+        with self._lock:
+            if self._normalized is None:
+                self._normalized = _unit_rows(self.embeddings)
+            return self._normalized
+
+    def ingredient_sets(self) -> IdSets:
+        """Canonical ingredient names per recipe (ingredient_parser)."""
+        with self._lock:
+            if self._ingredients is None:
+                self._ingredients = IdSets.from_token_sets(
+                    _ingredient_names(self.column("ingredients_text"))
+                )
+            return self._ingredients
+
+    def coverage(self) -> CoverageIndex:
+        """Index for "cook now" queries (coverage.py)."""
+        ingredients = self.ingredient_sets()
+        with self._lock:
+            if self._coverage is None:
+                from ..config import COOK_NOW_STAPLES
+
+                self._coverage = CoverageIndex(ingredients, COOK_NOW_STAPLES)
+            return self._coverage
+
+    def exclusion_mask(self, terms: Optional[Iterable[str]]) -> Optional[np.ndarray]:
+        """
+        Boolean mask of the recipes an exclusion list rules out (exclusions.py),
+        or None for an empty list. Cached per distinct list.
+        """
+        key = normalize_terms(terms)
+        if not key:
+            return None
+        with self._lock:
+            mask = self._exclusions.get(key)
+            if mask is not None:
+                self._exclusions.move_to_end(key)
+                return mask
+
+        from ..config import EXCLUSION_CACHE_SIZE
+
+        ingredient_index, _ = self.indexes()
+        mask = mask_from_index(ingredient_index, resolve(self, key), len(self))
+        mask.flags.writeable = False
+        with self._lock:
+            self._exclusions[key] = mask
+            while len(self._exclusions) > EXCLUSION_CACHE_SIZE:
+                self._exclusions.popitem(last=False)
+        return mask
+
+    def neighbors(self) -> Optional[NeighborTable]:
+        """
+        The version's precomputed neighbour table (neighbors.py), or None if
+        build_neighbors hasn't been run for it.
+        """
+        with self._lock:
+            if self._neighbors is None:
+                from .artifacts import artifact_dir
+
+                directory = artifact_dir(self.version)
+                table = NeighborTable.load(directory) if directory else None
+                # A table with more rows than recipes belongs to another build
+                self._neighbors = (table if table is not None and len(table) <= len(self)
+                                   else False)
+            return self._neighbors or None
+
+    def aliases(self) -> Dict[int, List[str]]:
+        """
+        Titles of the near-duplicates collapsed into each recipe when the
+        version was built with --dedup (dedup.py); {} otherwise.
+        """
+        with self._lock:
+            if self._aliases is None:
+                from .artifacts import artifact_dir
+                from .dedup import read_aliases
+
+                self._aliases = read_aliases(artifact_dir(self.version))
+            return self._aliases
+
+    def reduced(self) -> Optional[ReducedEmbeddings]:
+        """
+        The version's reduced-dimension embeddings (projection.py), covering
+        every recipe, or None if it was built without --reduce-dim.
+        """
+        normalized = self.normalized_embeddings
+        with self._lock:
+            if self._reduced is None:
+                from .artifacts import artifact_dir
+
+                directory = artifact_dir(self.version)
+                reduced = ReducedEmbeddings.load(directory) if directory else None
+                if reduced is not None and len(reduced) < len(self):
+                    reduced = reduced.extended(normalized[len(reduced):])
+                # More rows than recipes: the files belong to another build
+                self._reduced = (reduced if reduced is not None and len(reduced) == len(self)
+                                 else False)
+            return self._reduced or None
+
+    def lexical(self) -> LexicalIndex:
+        """TF-IDF matrix of ingredients_text (shipped vectorizer)."""
+        with self._lock:
+            if self._lexical is None:
+                from ..deps import get_lexical_vectorizer
+
+                self._lexical = LexicalIndex.from_texts(get_lexical_vectorizer(),
+                                                        self.column("ingredients_text"))
+            return self._lexical
+
+    def subset(self, rows: np.ndarray) -> "RecipeCatalog":
+        """Catalog of the recipes `rows` only, renumbered in that order."""
+        rows = np.asarray(rows)
+        ingredients = self._ingredients.subset(rows) if self._ingredients is not None else None
+        return RecipeCatalog(self.df.iloc[rows].reset_index(drop=True),
+                             np.asarray(self.embeddings)[rows],
+                             dict(self.info, total_recipes=len(rows)),
+                             words=self.words.subset(rows),
+                             categories=self.categories.subset(rows),
+                             ingredients=ingredients)
+
+    def appended(self, seg_df: pd.DataFrame, seg_emb: np.ndarray) -> "RecipeCatalog":
+        """New catalog with a segment appended; indexes are extended, not rebuilt."""
+        words = self.words.extended(seg_df["ingredients_words"])
+        categories = self.categories.extended(_lower_categories(seg_df["categories_list"]))
+        rows = seg_df.drop(columns=["ingredients_words", "categories_list"])
+        embeddings = np.vstack([self.embeddings, seg_emb.astype(self.embeddings.dtype)])
+
+        ingredient_index = category_index = normalized = lexical = ingredients = None
+        with self._lock:
+            if self._ingredient_index is not None:
+                ingredient_index = self._ingredient_index.extended(seg_df["ingredients_words"])
+                category_index = self._category_index.extended(
+                    _lower_categories(seg_df["categories_list"])
+                )
+            if self._normalized is not None:
+                normalized = np.vstack([self._normalized, _unit_rows(seg_emb)])
+            if self._lexical is not None:
+                lexical = self._lexical.extended(seg_df["ingredients_text"].tolist())
+            if self._ingredients is not None:
+                ingredients = self._ingredients.extended(
+                    _ingredient_names(seg_df["ingredients_text"])
+                )
+
+        info = dict(self.info, total_recipes=len(self) + len(seg_df))
+        return self._with_rows(rows, embeddings, info,
+                               ingredient_index=ingredient_index,
+                               category_index=category_index,
+                               normalized_embeddings=normalized,
+                               version=self.version, seg_dir=self.seg_dir,
+                               words=words, categories=categories, lexical=lexical,
+                               ingredients=ingredients)
+
+    def _with_rows(self, rows: pd.DataFrame, embeddings: np.ndarray, info: dict,
+                   **kwargs) -> "RecipeCatalog":
+        """Catalog of this one's display rows followed by `rows` (for appended)."""
+        df = pd.concat([self.df, rows], ignore_index=True)
+        return RecipeCatalog(df, embeddings, info, **kwargs)
+
+
+def _ingredient_names(texts):
+    return (canonical_names(t.lower()) if isinstance(t, str) else [] for t in texts)
+
+
+def _unit_rows(emb: np.ndarray) -> np.ndarray:
+    emb = np.asarray(emb, dtype=np.float32)
+    norms = np.linalg.norm(emb, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return emb / norms
+
+
+# -------------------------
+# Segments
+# -------------------------
+def list_segments(seg_dir: str) -> List[Tuple[int, int, str]]:
+    """(first, last, path) of live segments, in load order."""
+    if not os.path.isdir(seg_dir):
+        return []
+    found = []
+    for name in os.listdir(seg_dir):
+        m = _SEGMENT_RE.match(name)
+        if m:
+            found.append((int(m.group(1)), int(m.group(2)), os.path.join(seg_dir, name)))
+
+    # Drop segments covered by a wider (compacted) one
+    live = [
+        s for s in found
+        if not any(o is not s and o[0] <= s[0] and s[1] <= o[1]
+                   and (o[1] - o[0]) > (s[1] - s[0]) for o in found)
+    ]
+    return sorted(live)
+
+
+def read_segment(path: str) -> Tuple[pd.DataFrame, np.ndarray]:
+    return (
+        joblib.load(os.path.join(path, "metadata.pkl")),
+        np.load(os.path.join(path, "embeddings.npy")),
+    )
+
+
+@contextmanager
+def segment_lock(seg_dir: str):
+    """Exclusive cross-process lock on `seg_dir` (not reentrant)."""
+    os.makedirs(seg_dir, exist_ok=True)
+    with open(os.path.join(seg_dir, ".lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _write_segment_dir(seg_dir: str, name: str, df: pd.DataFrame, emb: np.ndarray) -> str:
+    os.makedirs(seg_dir, exist_ok=True)
+    tmp = os.path.join(seg_dir, f".tmp_{name}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    joblib.dump(df[META_COLUMNS].reset_index(drop=True), os.path.join(tmp, "metadata.pkl"))
+    np.save(os.path.join(tmp, "embeddings.npy"), emb)
+    final = os.path.join(seg_dir, name)
+    os.rename(tmp, final)
+    return final
+
+
+def write_segment(seg_dir: str, df: pd.DataFrame, emb: np.ndarray) -> str:
+    with segment_lock(seg_dir):
+        segments = list_segments(seg_dir)
+        seq = segments[-1][1] + 1 if segments else 1
+        return _write_segment_dir(seg_dir, f"seg_{seq:08d}-{seq:08d}", df, emb)
+
+
+def compact_segments(seg_dir: str, min_segments: int = 2) -> Optional[str]:
+    """
+    Merge all live segments into one (once at least `min_segments` exist).
+    Returns the new segment path.
+    """
+    with segment_lock(seg_dir):
+        segments = list_segments(seg_dir)
+        if len(segments) < max(2, min_segments):
+            return None
+
+        parts = [read_segment(path) for _, _, path in segments]
+        df = pd.concat([p[0] for p in parts], ignore_index=True)
+        emb = np.vstack([p[1] for p in parts])
+
+        name = f"seg_{segments[0][0]:08d}-{segments[-1][1]:08d}"
+        merged = _write_segment_dir(seg_dir, name, df, emb)
+        for _, _, path in segments:
+            shutil.rmtree(path, ignore_errors=True)
+        return merged
+
+
+# -------------------------
+# Loading
+# -------------------------
+def load_catalog(meta_path: str, emb_path: str, info_path: str,
+                 seg_dir: Optional[str] = None,
+                 version: Optional[str] = None) -> RecipeCatalog:
+    meta_df = joblib.load(meta_path)
+    recipe_embeddings = np.load(emb_path)
+    with open(info_path, "r") as f:
+        info = json.load(f)
+
+    catalog = RecipeCatalog(meta_df, recipe_embeddings, info,
+                            version=version, seg_dir=seg_dir)
+    for _, _, path in list_segments(seg_dir) if seg_dir else []:
+        seg_df, seg_emb = read_segment(path)
+        catalog = catalog.appended(seg_df, seg_emb)
+    return catalog
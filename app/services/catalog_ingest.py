@@ -0,0 +1,125 @@
+# app/services/catalog_ingest.py
+"""
+Add recipes to the recommender without rerunning 4_Recommender.ipynb.
+
+Only the new recipes are embedded (in batches); they are tagged with the
+notebook's category rules, written as a new segment and appended to the
+in-memory catalog. Once COMPACT_MIN_SEGMENTS segments exist they are
+merged in the background.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..config import (
+    COMPACT_MIN_SEGMENTS,
+    INGEST_BATCH_SIZE,
+    INGREDIENT_WORD_SCHEME,
+    RECOMMENDER_EMBEDDING_MODEL,
+    RECOMMENDER_SEGMENTS_DIR,
+)
+from ..deps import get_catalog, load_embed_model, set_catalog
+from ..metrics import set_recommender_version
+from .catalog import compact_segments, list_segments, write_segment
+from .category_rules import assign_categories
+from .ingredient_parser import word_set_fn
+
+# Orders appends to the in-memory catalog; segment numbering across
+# processes is guarded by catalog.segment_lock
+_ingest_lock = threading.Lock()
+_compactor = ThreadPoolExecutor(max_workers=1)
+
+
+def _norm(x) -> str:
+    if not isinstance(x, str):
+        return ""
+    return x.strip().lower()
+
+
+def build_segment_frame(raw: pd.DataFrame,
+                        word_scheme: str = INGREDIENT_WORD_SCHEME) -> pd.DataFrame:
+    """
+    `raw` has the processed-CSV columns Title, ingredients_text, target_text.
+    Adds categories and the derived word-set / category-list columns
+    (word sets per `word_scheme`, which must match the catalog's).
+    """
+    to_words = word_set_fn(word_scheme)
+    df = raw[["Title", "ingredients_text", "target_text"]].copy()
+    df = df[df["ingredients_text"].map(_norm) != ""].reset_index(drop=True)
+
+    df["categories"] = [
+        assign_categories(t, i, g)
+        for t, i, g in zip(df["Title"], df["ingredients_text"], df["target_text"])
+    ]
+    df["ingredients_words"] = df["ingredients_text"].map(lambda x: to_words(_norm(x)))
+    df["categories_list"] = df["categories"].map(
+        lambda c: [x for x in c.split("|") if x]
+    )
+    return df
+
+
+def embed_frame(df: pd.DataFrame, batch_size: int = INGEST_BATCH_SIZE,
+                model=None) -> np.ndarray:
+    """
+    Embed "Title: <title> Ingredients: <ingredients>" like the notebook.
+    Always with the PyTorch model: catalog rows must not depend on the
+    query encoder backend (EMBED_BACKEND).
+    """
+    model = model or load_embed_model(RECOMMENDER_EMBEDDING_MODEL,
+                                      backend="sentence-transformers")
+    texts = [
+        f"Title: {_norm(t)} Ingredients: {_norm(i)}"
+        for t, i in zip(df["Title"], df["ingredients_text"])
+    ]
+    parts = [
+        np.asarray(model.encode(texts[i:i + batch_size]), dtype=np.float32)
+        for i in range(0, len(texts), batch_size)
+    ]
+    return np.vstack(parts)
+
+
+def ingest_frame(raw: pd.DataFrame, batch_size: int = INGEST_BATCH_SIZE,
+                 seg_dir: Optional[str] = None) -> Dict[str, Any]:
+    df = build_segment_frame(raw, get_catalog().word_scheme)
+    if df.empty:
+        catalog = get_catalog()
+        return {"added": 0, "first_id": len(catalog), "segment": None,
+                "total_recipes": len(catalog)}
+
+    emb = embed_frame(df, batch_size)
+
+    with _ingest_lock:
+        # Load before writing, so the new segment is not read in twice
+        catalog = get_catalog()
+        seg_dir = seg_dir or catalog.seg_dir or RECOMMENDER_SEGMENTS_DIR
+        path = write_segment(seg_dir, df, emb)
+        updated = catalog.appended(df, emb)
+        # A version swap that landed meanwhile wins; the segment is on disk
+        # and is picked up when that version is next loaded
+        if set_catalog(updated, expected=catalog):
+            set_recommender_version(updated.version, len(updated))
+
+    schedule_compaction(seg_dir)
+
+    return {
+        "added": len(df),
+        "first_id": len(catalog),
+        "segment": os.path.basename(path),
+        "total_recipes": len(catalog) + len(df),
+    }
+
+
+def _compact(seg_dir: str):
+    with _ingest_lock:
+        compact_segments(seg_dir, COMPACT_MIN_SEGMENTS)
+
+
+def schedule_compaction(seg_dir: str = RECOMMENDER_SEGMENTS_DIR):
+    if len(list_segments(seg_dir)) >= COMPACT_MIN_SEGMENTS:
+        _compactor.submit(_compact, seg_dir)
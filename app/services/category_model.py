@@ -0,0 +1,148 @@
+# app/services/category_model.py
+"""
+The category classifier (TF-IDF + multinomial logistic regression) as
+plain arrays, so tagging needs neither unpickling nor scikit-learn.
+
+On disk, in CATEGORY_MODEL_DIR (app/jobs/export_category_model.py):
+    vocab.npy       S    (n_terms,) vectorizer vocabulary, UTF-8, sorted
+    idf.npy         f64  (n_terms,) idf weight of each term
+    coef.npy        f32  (n_terms, n_classes) weights, one row per term
+    intercept.npy   f64  (n_classes,)
+    classes.npy     <U   (n_classes,) labels
+    info.json       token pattern, lowercasing, source pickles
+
+Term columns are in vocabulary order, so a token's column is its
+np.searchsorted position in vocab.npy; no dict is built. Every array is
+opened with mmap_mode="r": processes share the pages through the OS
+cache, and coef rows are read only for the terms a text contains.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import List, Optional
+
+import numpy as np
+
+VOCAB_FILE = "vocab.npy"
+IDF_FILE = "idf.npy"
+COEF_FILE = "coef.npy"
+INTERCEPT_FILE = "intercept.npy"
+CLASSES_FILE = "classes.npy"
+INFO_FILE = "info.json"
+_ARRAYS = (VOCAB_FILE, IDF_FILE, COEF_FILE, INTERCEPT_FILE, CLASSES_FILE)
+
+
+class CategoryModel:
+    def __init__(self, vocab: np.ndarray, idf: np.ndarray, coef: np.ndarray,
+                 intercept: np.ndarray, classes: np.ndarray, info: dict):
+        self.vocab = vocab
+        self.idf = idf
+        self.coef = coef
+        self.intercept = intercept
+        self.classes = classes
+        self.info = info
+        self._pattern = re.compile(info["token_pattern"])
+        self._lowercase = info.get("lowercase", True)
+
+    @classmethod
+    def from_sklearn(cls, vectorizer, model, source: Optional[dict] = None
+                     ) -> "CategoryModel":
+        """Export a fitted TfidfVectorizer + multiclass LogisticRegression."""
+        p = vectorizer.get_params()
+        unsupported = (
+            p["analyzer"] != "word" or tuple(p["ngram_range"]) != (1, 1)
+            or p["tokenizer"] is not None or p["preprocessor"] is not None
+            or p["strip_accents"] is not None or p["binary"] or p["sublinear_tf"]
+            or not p["use_idf"] or p["norm"] != "l2"
+        )
+        if unsupported:
+            raise ValueError(f"Unsupported vectorizer settings: {p}")
+        if model.coef_.shape[0] != len(model.classes_) or len(model.classes_) < 3:
+            raise ValueError("Only multiclass (multinomial) classifiers are supported")
+
+        terms = sorted(vectorizer.vocabulary_, key=str.encode)
+        columns = np.array([vectorizer.vocabulary_[t] for t in terms])
+        info = {
+            "token_pattern": p["token_pattern"],
+            "lowercase": bool(p["lowercase"]),
+            "n_terms": len(terms),
+            **(source or {}),
+        }
+        return cls(
+            vocab=np.array([t.encode() for t in terms], dtype=bytes),
+            idf=np.asarray(vectorizer.idf_, dtype=np.float64)[columns],
+            coef=np.ascontiguousarray(model.coef_.T[columns], dtype=np.float32),
+            intercept=np.asarray(model.intercept_, dtype=np.float64),
+            classes=np.asarray(model.classes_).astype(str),
+            info=info,
+        )
+
+    def save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        arrays = (self.vocab, self.idf, self.coef, self.intercept, self.classes)
+        for name, arr in zip(_ARRAYS, arrays):
+            tmp = os.path.join(directory, f".tmp_{name}")
+            with open(tmp, "wb") as f:
+                np.save(f, np.asarray(arr))
+            os.replace(tmp, os.path.join(directory, name))
+        with open(os.path.join(directory, INFO_FILE), "w") as f:
+            json.dump(self.info, f, indent=2)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["CategoryModel"]:
+        paths = [os.path.join(directory, name) for name in _ARRAYS + (INFO_FILE,)]
+        if not all(os.path.isfile(p) for p in paths):
+            return None
+        with open(paths[-1]) as f:
+            info = json.load(f)
+        return cls(*(np.load(p, mmap_mode="r") for p in paths[:-1]), info=info)
+
+    def decision_function(self, texts: List[str]) -> np.ndarray:
+        """(n_texts, n_classes) logits of the l2-normalized TF-IDF rows."""
+        n = len(texts)
+        if self._lowercase:
+            texts = [t.lower() for t in texts]
+        tokens = [self._pattern.findall(t) for t in texts]
+        out = np.tile(np.asarray(self.intercept), (n, 1))
+
+        # Each distinct token is looked up in the vocabulary once
+        distinct = {}
+        token_ids = [distinct.setdefault(tok, len(distinct)) for row in tokens for tok in row]
+        if not token_ids:
+            return out
+        words = np.array([tok.encode() for tok in distinct], dtype=bytes)
+        word_cols = np.searchsorted(self.vocab, words)
+        word_cols[word_cols == len(self.vocab)] = 0
+        word_cols[np.asarray(self.vocab[word_cols]) != words] = -1
+
+        cols = word_cols[token_ids]
+        rows = np.repeat(np.arange(n), [len(row) for row in tokens])
+        known = cols >= 0
+        rows, cols = rows[known], cols[known]
+        if not len(cols):
+            return out
+
+        # Term counts per (row, term), times idf, l2-normalized per row
+        keys, counts = np.unique(rows * len(self.vocab) + cols, return_counts=True)
+        rows, cols = keys // len(self.vocab), keys % len(self.vocab)
+        weights = counts * np.asarray(self.idf)[cols]
+        norms = np.sqrt(np.bincount(rows, weights * weights, minlength=n))
+        weights /= norms[rows]
+
+        # keys are sorted, so each row's terms are one contiguous run
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        contrib = np.asarray(self.coef[cols], dtype=np.float64) * weights[:, None]
+        out[rows[starts]] += np.add.reduceat(contrib, starts, axis=0)
+        return out
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        logits = self.decision_function(texts)
+        logits -= logits.max(axis=1, keepdims=True)
+        proba = np.exp(logits)
+        proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+    def predict(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.classes)[self.decision_function(texts).argmax(axis=1)]
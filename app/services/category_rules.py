@@ -0,0 +1,129 @@
+# app/services/category_rules.py
+"""
+Rule-based recipe categories, as assigned in 3_category_tagging.ipynb.
+Used to tag newly ingested recipes the same way as the original corpus.
+"""
+from __future__ import annotations
+
+import re
+from typing import Set
+
+WORD_SPLIT_RE = re.compile(r"[,\s;:\(\)\[\]\.\-]+")
+
+MEAT_WORDS = {
+    "chicken", "beef", "pork", "bacon", "ham", "lamb", "turkey",
+    "sausage", "prosciutto", "salami"
+}
+
+FISH_WORDS = {
+    "fish", "salmon", "tuna", "shrimp", "prawn", "crab", "lobster", "cod", "trout"
+}
+
+DAIRY_WORDS = {
+    "milk", "butter", "cheese", "yogurt", "cream", "whipped cream", "parmesan", "mozzarella"
+}
+
+EGG_WORDS = {
+    "egg", "eggs", "egg yolk", "egg white"
+}
+
+PROTEIN_WORDS = MEAT_WORDS | FISH_WORDS | EGG_WORDS | {
+    "tofu", "lentil", "lentils", "beans", "black beans", "kidney beans",
+    "chickpeas", "garbanzo", "paneer", "tempeh", "edamame", "protein powder"
+}
+
+INDULGENT_WORDS = {
+    "chocolate", "brownie", "fudge", "caramel",
+    "butter", "cream", "cheese", "bacon",
+    "sugar", "syrup", "ice cream", "frosting"
+}
+
+HEALTHY_WORDS = {
+    "salad", "quinoa", "oats", "oatmeal", "kale", "broccoli",
+    "spinach", "avocado", "brown rice", "lentils", "beans", "chickpeas",
+    "olive oil", "greek yogurt"
+}
+
+FRY_WORDS = {
+    "deep-fry", "deep fry", "fried", "frying"
+}
+
+BUDGET_STAPLES = {
+    "rice", "potato", "potatoes", "pasta", "noodles", "lentils", "beans",
+    "cabbage", "carrot", "onion", "egg", "eggs", "flour", "bread"
+}
+
+EXPENSIVE_WORDS = {"truffle", "saffron", "lobster", "steak", "prosciutto"}
+
+BREAKFAST_WORDS = {
+    "pancake", "toast", "omelette", "omelet", "cereal", "oatmeal",
+    "breakfast", "granola", "smoothie", "waffle"
+}
+
+LUNCH_WORDS = {
+    "sandwich", "wrap", "burrito", "salad", "lunch", "bowl"
+}
+
+DINNER_WORDS = {
+    "stew", "roast", "casserole", "dinner", "lasagna", "curry"
+}
+
+DESSERT_WORDS = {
+    "cake", "cookie", "brownie", "pudding", "mousse", "ice cream",
+    "tart", "pie", "dessert"
+}
+
+
+def to_word_set(text) -> Set[str]:
+    if not isinstance(text, str):
+        return set()
+    return {w.strip() for w in WORD_SPLIT_RE.split(text.lower()) if w.strip()}
+
+
+def _is_quick(title: str, target_norm: str) -> bool:
+    txt = f"{title} {target_norm}".lower()
+    if "quick" in txt or "easy" in txt:
+        return True
+    return any(s in txt for s in ("15 min", "15-minute", "20 min", "20-minute"))
+
+
+def assign_categories(title, ingredients_text, target_text) -> str:
+    """Return the "|"-joined, sorted category string for one recipe."""
+    title = title if isinstance(title, str) else ""
+    target_norm = str(target_text).strip().lower() if isinstance(target_text, str) else ""
+
+    ing_words = to_word_set(ingredients_text)
+    all_words = ing_words | to_word_set(target_norm)
+
+    cats = set()
+
+    if _is_quick(title, target_norm):
+        cats.add("quick")
+
+    indulgent_hits = len(all_words & INDULGENT_WORDS)
+    if (all_words & HEALTHY_WORDS and not all_words & FRY_WORDS
+            and indulgent_hits <= 1):
+        cats.add("healthy")
+    if indulgent_hits >= 2:
+        cats.add("indulgent")
+    if ing_words & PROTEIN_WORDS:
+        cats.add("high_protein")
+    if len(ing_words & BUDGET_STAPLES) >= 2 and not ing_words & EXPENSIVE_WORDS:
+        cats.add("budget_friendly")
+
+    has_meat_or_fish = ing_words & (MEAT_WORDS | FISH_WORDS)
+    if not has_meat_or_fish:
+        cats.add("vegetarian")
+        if not ing_words & (DAIRY_WORDS | EGG_WORDS):
+            cats.add("vegan")
+
+    if all_words & BREAKFAST_WORDS:
+        cats.add("breakfast")
+    if all_words & LUNCH_WORDS:
+        cats.add("lunch")
+    if all_words & DINNER_WORDS:
+        cats.add("dinner")
+    if all_words & DESSERT_WORDS:
+        cats.add("dessert")
+
+    return "|".join(sorted(cats))
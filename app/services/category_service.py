@@ -1,12 +1,42 @@
-import os
-import joblib
+import threading
 
-MODEL_DIR = "model"
-MODEL_PATH = os.path.join(MODEL_DIR, "category_classifier.pkl")
-VECTORIZER_PATH = os.path.join(MODEL_DIR, "category_vectorizer.pkl")
+import numpy as np
 
-model = joblib.load(MODEL_PATH)
-vectorizer = joblib.load(VECTORIZER_PATH)
+from ..config import CATEGORY_CLASSIFIER_PATH, CATEGORY_MODEL_DIR, CATEGORY_VECTORIZER_PATH
+
+# The classifier is loaded on first use, not at import: memory-mapped from
+# the exported arrays (services/category_model.py), or converted from the
+# training pickles when no export exists.
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = _load_model()
+    return _model
+
+
+def _load_model():
+    from .category_model import CategoryModel
+
+    model = CategoryModel.load(CATEGORY_MODEL_DIR)
+    if model is None:
+        import joblib
+
+        model = CategoryModel.from_sklearn(
+            joblib.load(CATEGORY_VECTORIZER_PATH), joblib.load(CATEGORY_CLASSIFIER_PATH)
+        )
+    return model
+
+
+def _to_text(ingredients_list):
+    if isinstance(ingredients_list, str):
+        ingredients_list = [ingredients_list]
+    return " ".join(ingredients_list).lower().strip()
 
 
 def tag_categories(ingredients_list):
@@ -18,13 +48,33 @@ def tag_categories(ingredients_list):
     if not ingredients_list:
         return []
 
-    if isinstance(ingredients_list, str):
-        ingredients_list = [ingredients_list]
+    preds = get_model().predict([_to_text(ingredients_list)])
 
-    text = " ".join(ingredients_list).lower().strip()
+    return preds.tolist()
 
-    X = vectorizer.transform([text])
 
-    preds = model.predict(X)
+def tag_categories_batch(ingredient_lists, top_k=3):
+    """
+    Tags many ingredient lists in one vectorized pass over all their
+    tokens. Returns, per list, its top_k (label, probability) pairs, most
+    likely first; an empty list gets no labels.
+    """
+    texts = [_to_text(x) if x else "" for x in ingredient_lists]
+    if not texts:
+        return []
+
+    model = get_model()
+    proba = model.predict_proba(texts)
+    k = max(0, min(top_k, proba.shape[1]))
+    if k == 0:
+        return [[] for _ in texts]
+    top = np.argpartition(-proba, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(proba, top, axis=1), axis=1, kind="stable")
+    top = np.take_along_axis(top, order, axis=1)
+    labels = np.asarray(model.classes)[top].tolist()
+    probs = np.take_along_axis(proba, top, axis=1).tolist()
 
-    return preds.tolist()
\ No newline at end of file
+    return [
+        list(zip(row_labels, row_probs)) if text else []
+        for text, row_labels, row_probs in zip(texts, labels, probs)
+    ]
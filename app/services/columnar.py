@@ -0,0 +1,175 @@
+# app/services/columnar.py
+"""
+Columnar recommender bundle: the replacement for recommender_metadata.pkl.
+
+A bundle is an artifact version dir (see artifacts.py) containing:
+
+    recipes.arrow               Title, ingredients_text, target_text, categories
+                                (Arrow IPC, uncompressed, memory-mapped)
+    word_vocab.json             ingredient word id -> word
+    word_indptr.npy             int32 CSR row pointers (n_recipes + 1)
+    word_ids.npy                int32 word ids, sorted within each recipe
+    category_vocab.json         category id -> lowercase category
+    category_indptr.npy
+    category_ids.npy
+    ingredient_vocab.json       canonical ingredient names (coverage.py);
+    ingredient_indptr.npy       derived on load for bundles written without
+    ingredient_ids.npy
+    embeddings.npy              float32, unit-normalized rows
+    recommender_model_info.json
+
+Nothing is unpickled: the npy arrays are opened with mmap_mode="r" as the
+catalog's IdSets (vocab.py) and the Arrow file is memory-mapped, so loading
+only reads the vocabularies. A recipe's text is only read when it is
+returned as a result.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .catalog import DISPLAY_COLUMNS, RecipeCatalog, list_segments, read_segment
+from .vocab import IdSets, Vocabulary
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401
+    _HAVE_PYARROW = True
+except Exception:
+    _HAVE_PYARROW = False
+
+BUNDLE_FORMAT = "columnar-v1"
+RECIPES_FILE = "recipes.arrow"
+EMBEDDINGS_FILE = "embeddings.npy"
+INFO_FILE = "recommender_model_info.json"
+
+
+def _require_pyarrow():
+    if not _HAVE_PYARROW:
+        raise RuntimeError("pyarrow is required for columnar recommender bundles "
+                           "(pip install pyarrow)")
+
+
+# -------------------------
+# Writing
+# -------------------------
+def save_id_sets(vdir: str, prefix: str, id_sets: IdSets):
+    with open(os.path.join(vdir, f"{prefix}_vocab.json"), "w") as f:
+        json.dump(id_sets.vocab.tokens, f)
+    np.save(os.path.join(vdir, f"{prefix}_indptr.npy"), id_sets.indptr)
+    np.save(os.path.join(vdir, f"{prefix}_ids.npy"), id_sets.ids)
+
+
+def write_bundle(vdir: str, catalog: RecipeCatalog):
+    """Write `catalog` into `vdir`. The caller writes the manifest."""
+    _require_pyarrow()
+    os.makedirs(vdir, exist_ok=True)
+
+    df = catalog.df.reset_index(drop=True)
+    table = pa.Table.from_pandas(df[DISPLAY_COLUMNS], preserve_index=False)
+    with pa.OSFile(os.path.join(vdir, RECIPES_FILE), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            # One record batch: row lookups never have to search chunks
+            writer.write_table(table, max_chunksize=max(len(df), 1))
+
+    save_id_sets(vdir, "word", catalog.words)
+    save_id_sets(vdir, "category", catalog.categories)
+    save_id_sets(vdir, "ingredient", catalog.ingredient_sets())
+    np.save(os.path.join(vdir, EMBEDDINGS_FILE), catalog.normalized_embeddings)
+
+    with open(os.path.join(vdir, INFO_FILE), "w") as f:
+        json.dump(dict(catalog.info, total_recipes=len(catalog)), f, indent=4)
+
+
+# -------------------------
+# Loading
+# -------------------------
+class ColumnarCatalog(RecipeCatalog):
+    """
+    RecipeCatalog backed by a bundle. `df` (display columns) is only
+    materialized when some code asks for it (the legacy recommender_service,
+    ingestion); the ranking paths use indexes(), normalized_embeddings and
+    record(). `vdir` is None once segments are appended: the bundle's files
+    then only hold the first `bundle_rows` rows.
+    """
+
+    def __init__(self, vdir: str, info: Dict, version: Optional[str] = None,
+                 seg_dir: Optional[str] = None):
+        _require_pyarrow()
+        self.vdir = vdir
+        embeddings = np.load(os.path.join(vdir, EMBEDDINGS_FILE), mmap_mode="r")
+        self.bundle_rows = len(embeddings)
+        super().__init__(None, embeddings, info, normalized_embeddings=embeddings,
+                         version=version, seg_dir=seg_dir,
+                         words=self._id_sets("word"),
+                         categories=self._id_sets("category"),
+                         ingredients=(self._id_sets("ingredient") if os.path.exists(
+                             os.path.join(vdir, "ingredient_vocab.json")) else None))
+
+        source = pa.memory_map(os.path.join(vdir, RECIPES_FILE), "r")
+        self._set_table(pa.ipc.open_file(source).read_all())
+
+    def _set_table(self, table: "pa.Table"):
+        self._table = table
+        self._columns = {c: table.column(c) for c in DISPLAY_COLUMNS}
+        self._df_lock = threading.Lock()
+
+    def _id_sets(self, prefix: str) -> IdSets:
+        with open(os.path.join(self.vdir, f"{prefix}_vocab.json")) as f:
+            vocab = Vocabulary(json.load(f))
+        return IdSets(
+            np.load(os.path.join(self.vdir, f"{prefix}_indptr.npy"), mmap_mode="r"),
+            np.load(os.path.join(self.vdir, f"{prefix}_ids.npy"), mmap_mode="r"),
+            vocab,
+        )
+
+    def record(self, recipe_id: int) -> dict:
+        return {c: col[recipe_id].as_py() for c, col in self._columns.items()}
+
+    def column(self, name: str) -> list:
+        return self._columns[name].to_pylist()
+
+    def _with_rows(self, rows: pd.DataFrame, embeddings: np.ndarray, info: dict,
+                   **kwargs) -> RecipeCatalog:
+        # The bundle's record batches stay memory-mapped; the segment's rows
+        # are added as one more chunk
+        seg_table = pa.Table.from_pandas(rows[DISPLAY_COLUMNS], schema=self._table.schema,
+                                         preserve_index=False)
+        catalog = ColumnarCatalog.__new__(ColumnarCatalog)
+        RecipeCatalog.__init__(catalog, None, embeddings, info, **kwargs)
+        # The bundle's files lack the segment rows: nothing may mmap them as
+        # this catalog's arrays
+        catalog.vdir = None
+        catalog.bundle_rows = self.bundle_rows
+        catalog._set_table(pa.concat_tables([self._table, seg_table]))
+        return catalog
+
+    @property
+    def df(self) -> pd.DataFrame:
+        with self._df_lock:
+            if self._df is None:
+                self._df = self._table.to_pandas()
+            return self._df
+
+
+def is_bundle(vdir: str) -> bool:
+    return os.path.isfile(os.path.join(vdir, RECIPES_FILE))
+
+
+def load_bundle(vdir: str, seg_dir: Optional[str] = None,
+                version: Optional[str] = None) -> RecipeCatalog:
+    with open(os.path.join(vdir, INFO_FILE)) as f:
+        info = json.load(f)
+
+    catalog: RecipeCatalog = ColumnarCatalog(vdir, info, version=version, seg_dir=seg_dir)
+    # Ingested segments are still pickled frames; their rows are appended to
+    # the Arrow table in memory. Rebuild the bundle to fold them in.
+    for _, _, path in list_segments(seg_dir) if seg_dir else []:
+        seg_df, seg_emb = read_segment(path)
+        catalog = catalog.appended(seg_df, seg_emb)
+    return catalog
@@ -0,0 +1,97 @@
+# app/services/coverage.py
+"""
+"Cook now": recipes the pantry covers up to at most k missing ingredients.
+
+Works on canonical ingredient names (ingredient_parser.canonical_names),
+one IdSets row per recipe. missing = needed - covered, where
+    needed[r]  = ingredients of r that are not pantry staples (salt, water,
+                 ... : COOK_NOW_STAPLES), computed once per catalog
+    covered[r] = |row r ∩ pantry|, from the pantry's posting lists only
+                 (IngredientIndex.match)
+Recipes the pantry doesn't touch at all qualify when needed <= k; they are
+a prefix of the recipes sorted by `needed`, so a query never scans the
+whole catalog.
+
+A pantry name covers a recipe ingredient with the same canonical name, or
+one it is the head noun of ("onion" covers "red onion").
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .recipe_index import IngredientIndex
+from .vocab import IdSets
+
+
+class CoverageIndex:
+    def __init__(self, ingredients: IdSets, staples: Iterable[str] = ()):
+        self.ingredients = ingredients
+        self.index = IngredientIndex.from_id_sets(ingredients)
+
+        vocab = ingredients.vocab
+        self.staples: Set[str] = {s for s in staples if s in vocab}
+        staple_ids = vocab.encode(self.staples)
+        self.needed = (ingredients.lengths()
+                       - ingredients.overlap_counts(staple_ids)).astype(np.int32)
+        self._by_needed = np.argsort(self.needed, kind="stable").astype(np.int32)
+        self._needed_sorted = self.needed[self._by_needed]
+
+        self._heads = defaultdict(list)
+        for name in vocab.tokens:
+            head = name.rsplit(" ", 1)[-1]
+            if head != name:
+                self._heads[head].append(name)
+
+    def __len__(self):
+        return len(self.needed)
+
+    def covered_names(self, pantry_names: Iterable[str]) -> Set[str]:
+        """Recipe ingredient names the pantry covers (staples excluded)."""
+        covered = set()
+        for name in pantry_names:
+            if name in self.ingredients.vocab:
+                covered.add(name)
+            covered.update(self._heads.get(name, ()))
+        return covered - self.staples
+
+    def query(self, pantry_names: Iterable[str], max_missing: int,
+              allowed: Optional[np.ndarray] = None,
+              excluded: Optional[np.ndarray] = None
+              ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (recipe ids, missing count, covered count) of every recipe with at
+        most `max_missing` missing ingredients, optionally restricted to the
+        sorted id array `allowed` and to recipes not set in the boolean mask
+        `excluded`. Ids are ascending.
+        """
+        hit, counts = self.index.match(self.covered_names(pantry_names))
+        missing = self.needed[hit] - counts
+        keep = missing <= max_missing
+        hit, counts, missing = hit[keep], counts[keep], missing[keep]
+
+        # Untouched recipes that are short enough anyway
+        short = self._by_needed[:np.searchsorted(self._needed_sorted, max_missing,
+                                                 side="right")]
+        short = np.setdiff1d(short, hit, assume_unique=True)
+
+        ids = np.concatenate([hit, short]).astype(np.int32)
+        missing = np.concatenate([missing, self.needed[short]]).astype(np.int32)
+        covered = np.concatenate([counts, np.zeros(len(short), dtype=np.int32)])
+        order = np.argsort(ids, kind="stable")
+        ids, missing, covered = ids[order], missing[order], covered[order]
+
+        if allowed is not None:
+            keep = np.isin(ids, allowed, assume_unique=True)
+            ids, missing, covered = ids[keep], missing[keep], covered[keep]
+        if excluded is not None:
+            keep = ~excluded[ids]
+            ids, missing, covered = ids[keep], missing[keep], covered[keep]
+        return ids, missing, covered
+
+    def missing_names(self, recipe_id: int, pantry_names: Iterable[str]) -> List[str]:
+        covered = self.covered_names(pantry_names)
+        return [name for name in self.ingredients.tokens(recipe_id)
+                if name not in self.staples and name not in covered]
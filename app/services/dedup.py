@@ -0,0 +1,208 @@
+# app/services/dedup.py
+"""
+Near-duplicate recipe collapsing at index build time
+(python -m app.jobs.build_recommender ... --dedup).
+
+Two recipes are near-duplicates when their canonical ingredient sets
+(ingredient_parser.canonical_names) have Jaccard >= DEDUP_INGREDIENT_THRESHOLD
+and their title words Jaccard >= DEDUP_TITLE_THRESHOLD (so "Pancakes" and
+"Crepes" with the same ingredients both stay).
+
+Candidates come from MinHash LSH over the ingredient sets: one random
+uint32 per (ingredient, permutation) stands in for the hash function, a
+signature is the per-permutation minimum over the recipe's ingredients,
+and recipes sharing any band of DEDUP_NUM_PERM / DEDUP_BANDS signature rows
+are candidates. Candidates are then checked against the thresholds with the
+exact Jaccard of their ingredient sets (the signatures only estimate it).
+Near-duplicate pairs are joined into clusters (connected
+components); each cluster keeps its lowest id and records the other
+titles as aliases (ALIASES_FILE in the version dir). Serving returns them
+with the recipe (RecipeCatalog.aliases, /recipes/{id}/similar); builds from
+a version carry them over.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from .vocab import IdSets
+
+ALIASES_FILE = "aliases.json"
+
+_TITLE_WORD_RE = re.compile(r"[a-z0-9]+")
+_TITLE_STOPWORDS = {"a", "an", "and", "the", "with", "of", "in", "on", "for", "or", "my"}
+
+# Rows of ids (recipe x ingredient) gathered per signature chunk
+_CHUNK_IDS = 1 << 17
+# Bucket members are paired with the next _MAX_BUCKET_SPAN members only
+# (all pairs for smaller buckets; a chain still connects bigger ones)
+_MAX_BUCKET_SPAN = 64
+
+
+def title_words(title) -> set:
+    words = _TITLE_WORD_RE.findall(str(title or "").lower())
+    return {w for w in words if w not in _TITLE_STOPWORDS}
+
+
+def minhash_signatures(id_sets: IdSets, num_perm: int, seed: int = 0) -> np.ndarray:
+    """(n_rows, num_perm) uint32 MinHash signatures; empty rows are all max."""
+    rng = np.random.default_rng(seed)
+    hashes = rng.integers(0, np.iinfo(np.uint32).max, size=(len(id_sets.vocab), num_perm),
+                          dtype=np.uint32, endpoint=True)
+    sig = np.full((len(id_sets), num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+    lengths = id_sets.lengths()
+    indptr = np.asarray(id_sets.indptr)
+
+    lo = 0
+    while lo < len(id_sets):
+        hi = int(np.searchsorted(indptr, indptr[lo] + _CHUNK_IDS, side="right")) - 1
+        hi = min(max(hi, lo + 1), len(id_sets))
+        rows = np.flatnonzero(lengths[lo:hi]) + lo
+        if len(rows):
+            ids = np.asarray(id_sets.ids[indptr[lo]:indptr[hi]])
+            starts = indptr[rows] - indptr[lo]
+            sig[rows] = np.minimum.reduceat(hashes[ids], starts, axis=0)
+        lo = hi
+    return sig
+
+
+def lsh_candidate_pairs(sig: np.ndarray, bands: int,
+                        skip: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    (m, 2) unique row pairs (i < j) that share at least one band. A band's
+    rows are hashed to one uint64 bucket key (collisions only add candidates,
+    which are verified afterwards).
+    """
+    n, num_perm = sig.shape
+    rows_per_band = num_perm // bands
+    live = np.flatnonzero(~skip) if skip is not None else np.arange(n)
+    mult = np.random.default_rng(1).integers(1, 2**63, size=rows_per_band,
+                                             dtype=np.uint64) | np.uint64(1)
+    pairs = []
+    for b in range(bands):
+        band = sig[live, b * rows_per_band:(b + 1) * rows_per_band].astype(np.uint64)
+        with np.errstate(over="ignore"):
+            keys = (band * mult).sum(axis=1, dtype=np.uint64)
+        order = np.argsort(keys, kind="stable")
+        keys, members = keys[order], live[order]
+        for d in range(1, _MAX_BUCKET_SPAN + 1):
+            same = keys[:-d] == keys[d:]
+            if not same.any():
+                break
+            pairs.append(np.stack([members[:-d][same], members[d:][same]], 1))
+    if not pairs:
+        return np.zeros((0, 2), dtype=np.int64)
+    return np.unique(np.sort(np.concatenate(pairs), axis=1), axis=0)
+
+
+def _gather_rows(id_sets: IdSets, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(position in `rows`, id) for every id of the given rows."""
+    indptr = np.asarray(id_sets.indptr, dtype=np.int64)
+    lengths = indptr[rows + 1] - indptr[rows]
+    owner = np.repeat(np.arange(len(rows)), lengths)
+    offsets = np.arange(len(owner)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return owner, np.asarray(id_sets.ids)[indptr[rows][owner] + offsets]
+
+
+def pair_jaccard(id_sets: IdSets, pairs: np.ndarray) -> np.ndarray:
+    """Exact Jaccard of the rows of every (i, j) pair (0 for two empty rows)."""
+    out = np.zeros(len(pairs))
+    lengths = id_sets.lengths().astype(np.int64)
+    n_ids = np.int64(len(id_sets.vocab))
+    for s in range(0, len(pairs), 1 << 16):
+        p = pairs[s:s + (1 << 16)]
+        # Rows are unique, so an id shows up twice under one pair key only
+        # when both rows have it
+        keys = np.concatenate([owner * n_ids + ids for owner, ids in
+                               (_gather_rows(id_sets, p[:, 0]), _gather_rows(id_sets, p[:, 1]))])
+        keys.sort()
+        shared = keys[1:][keys[1:] == keys[:-1]] // n_ids
+        inter = np.bincount(shared, minlength=len(p))
+        union = lengths[p[:, 0]] + lengths[p[:, 1]] - inter
+        out[s:s + len(p)] = np.divide(inter, union, out=np.zeros(len(p)), where=union > 0)
+    return out
+
+
+def near_duplicate_clusters(ingredients: IdSets, titles: List[str], num_perm: int,
+                            bands: int, ingredient_threshold: float,
+                            title_threshold: float) -> Tuple[np.ndarray, int]:
+    """
+    (representative id of every recipe, number of verified pairs). A recipe
+    that is nobody's duplicate is its own representative.
+    """
+    n = len(ingredients)
+    sig = minhash_signatures(ingredients, num_perm)
+    pairs = lsh_candidate_pairs(sig, bands, skip=ingredients.lengths() == 0)
+
+    if len(pairs):
+        pairs = pairs[pair_jaccard(ingredients, pairs) >= ingredient_threshold]
+
+    words = {}
+    keep = []
+    for i, j in pairs:
+        a = words.setdefault(i, title_words(titles[i]))
+        b = words.setdefault(j, title_words(titles[j]))
+        union = len(a | b)
+        keep.append(union > 0 and len(a & b) / union >= title_threshold)
+    pairs = pairs[np.asarray(keep, dtype=bool)] if len(pairs) else pairs
+
+    graph = coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    # Lowest id of every component represents it
+    first = np.full(labels.max() + 1, n, dtype=np.int64)
+    np.minimum.at(first, labels, np.arange(n))
+    return first[labels], len(pairs)
+
+
+def dedup_catalog(catalog, num_perm: int, bands: int, ingredient_threshold: float,
+                  title_threshold: float,
+                  aliases: Optional[Dict[int, List[str]]] = None):
+    """
+    (deduplicated catalog, aliases by new recipe id, report). `aliases` are
+    the source catalog's own (a re-deduplicated version keeps them).
+    """
+    titles = catalog.column("Title")
+    rep, n_pairs = near_duplicate_clusters(catalog.ingredient_sets(), titles, num_perm,
+                                           bands, ingredient_threshold, title_threshold)
+    kept = np.flatnonzero(rep == np.arange(len(rep)))
+    new_id = np.full(len(rep), -1, dtype=np.int64)
+    new_id[kept] = np.arange(len(kept))
+
+    aliases = aliases or {}
+    merged: Dict[int, List[str]] = {}
+    for old in range(len(rep)):
+        target = int(new_id[rep[old]])
+        names = ([] if rep[old] == old else [titles[old]]) + aliases.get(old, [])
+        if names:
+            merged.setdefault(target, []).extend(names)
+
+    deduped = catalog.subset(kept)
+    _, sizes = np.unique(rep, return_counts=True)
+    report = {
+        "before": len(catalog),
+        "after": len(kept),
+        "pairs": n_pairs,
+        "clusters": int((sizes > 1).sum()),
+        "embedding_mb_before": catalog.embeddings.nbytes / 1e6,
+        "embedding_mb_after": deduped.embeddings.nbytes / 1e6,
+    }
+    return deduped, merged, report
+
+
+def write_aliases(directory: str, aliases: Dict[int, List[str]]):
+    with open(os.path.join(directory, ALIASES_FILE), "w") as f:
+        json.dump({str(k): v for k, v in sorted(aliases.items())}, f)
+
+
+def read_aliases(directory: Optional[str]) -> Dict[int, List[str]]:
+    path = os.path.join(directory, ALIASES_FILE) if directory else None
+    if not path or not os.path.isfile(path):
+        return {}
+    with open(path) as f:
+        return {int(k): v for k, v in json.load(f).items()}
@@ -0,0 +1,62 @@
+# app/services/diversify.py
+"""
+Maximal marginal relevance (MMR) re-ranking of the top candidates.
+
+Picks results one at a time, each maximizing
+    lam * relevance - (1 - lam) * max cosine to the results already picked
+so three near-identical "Chocolate Chip Cookies" don't take the top slots.
+Relevance is min-max scaled over the pool, so lam means the same whatever
+the hybrid weights. lam = 1 keeps the plain ranking.
+
+The pairwise cosines are one (N, N) matmul over the stored unit
+embeddings; each of the k picks is a few vector ops over N.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+
+def mmr(relevance: np.ndarray, emb: np.ndarray, k: int, lam: float) -> np.ndarray:
+    """Positions (into relevance / emb rows) of the k MMR picks, in pick order."""
+    n = len(relevance)
+    k = min(k, n)
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    rel = np.asarray(relevance, dtype=np.float32)
+    span = rel.max() - rel.min()
+    rel = lam * ((rel - rel.min()) / span if span > 0 else np.zeros_like(rel))
+
+    emb = np.asarray(emb, dtype=np.float32)
+    sim = emb @ emb.T
+
+    picks = np.empty(k, dtype=np.int64)
+    picks[0] = int(np.argmax(rel))
+    max_sim = sim[picks[0]].copy()
+    taken = np.zeros(n, dtype=bool)
+    taken[picks[0]] = True
+    penalty = 1.0 - lam
+    for i in range(1, k):
+        score = rel - penalty * max_sim
+        score[taken] = -np.inf
+        j = int(np.argmax(score))
+        picks[i] = j
+        taken[j] = True
+        np.maximum(max_sim, sim[j], out=max_sim)
+    return picks
+
+
+def diversify_order(final: np.ndarray, cand_ids: np.ndarray, embeddings: np.ndarray,
+                    top_k: int, lam: float, pool: int) -> np.ndarray:
+    """
+    Top_k positions into `final` (scores of the recipes `cand_ids`) after
+    MMR over its `pool` best entries; `embeddings` are the catalog's unit
+    embeddings.
+    """
+    n = min(pool, len(final))
+    if n <= 0:
+        return np.zeros(0, dtype=np.int64)
+    best = (np.argpartition(-final, n - 1)[:n] if n < len(final)
+            else np.arange(len(final)))
+    best = best[np.argsort(-final[best], kind="stable")]
+    return best[mmr(final[best], embeddings[cand_ids[best]], top_k, lam)]
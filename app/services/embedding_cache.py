@@ -0,0 +1,189 @@
+# app/services/embedding_cache.py
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+PantryInput = Union[str, Iterable[str], None]
+
+
+def normalize_pantry(pantry: PantryInput) -> List[str]:
+    """
+    Turn a pantry ("a, b, c" or ["a", "b"]) into a sorted, de-duplicated
+    list of lowercase ingredient names. Two pantries with the same items
+    in a different order share one cache key.
+    """
+    if pantry is None:
+        return []
+    if isinstance(pantry, str):
+        parts = pantry.split(",")
+    else:
+        parts = list(pantry)
+    items = {str(p).strip().lower() for p in parts}
+    return sorted(i for i in items if i)
+
+
+def pantry_key(pantry: PantryInput) -> str:
+    return ", ".join(normalize_pantry(pantry))
+
+
+def query_text(pantry: PantryInput) -> str:
+    """
+    The pantry as the recommender notebook encodes it: lowercased, in the
+    user's order (no sorting or de-duplication, which would change the
+    embedding). Full-mode embeddings are cached under this text.
+    """
+    if pantry is None:
+        return ""
+    if isinstance(pantry, str):
+        return pantry.lower().strip()
+    items = (str(p).strip().lower() for p in pantry)
+    return ", ".join(i for i in items if i)
+
+
+def _unit(v: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(v)
+    if norm == 0:
+        return v
+    return v / norm
+
+
+class _LRU:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: np.ndarray):
+        value.setflags(write=False)
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        self._data.clear()
+
+
+class PantryEmbeddingCache:
+    """
+    Caches pantry query embeddings so repeat recommendations skip the
+    SentenceTransformer.
+
+    mode="full":    one cached embedding per pantry query text (query_text).
+    mode="compose": one cached embedding per ingredient; the pantry vector
+                    is the re-normalized mean of its ingredient vectors.
+
+    `encoder` is a zero-arg callable returning the SentenceTransformer, so
+    the model is only loaded when a miss actually needs it.
+    """
+
+    def __init__(
+        self,
+        encoder: Callable[[], object],
+        max_pantries: int = 4096,
+        max_ingredients: int = 50000,
+    ):
+        self._encoder = encoder
+        self._pantries = _LRU(max_pantries)
+        self._ingredients = _LRU(max_ingredients)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "pantry_hits": 0,
+            "pantry_misses": 0,
+            "ingredient_hits": 0,
+            "ingredient_misses": 0,
+        }
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        model = self._encoder()
+        return np.asarray(model.encode(texts), dtype=np.float32)
+
+    def encode_pantry(self, pantry: PantryInput, mode: str = "full") -> np.ndarray:
+        if mode == "compose":
+            items = normalize_pantry(pantry)
+            if items:
+                return self._compose(items, self._ingredient_vectors(items))
+        key = query_text(pantry)
+        return self._pantry_vectors([key])[key]
+
+    def encode_pantries(self, pantries: List[PantryInput], mode: str = "full") -> np.ndarray:
+        """
+        Batch version of encode_pantry: all cache misses go through a single
+        encode call. Returns an (n_pantries, dim) float32 matrix.
+        """
+        if mode == "compose":
+            item_lists = [normalize_pantry(p) for p in pantries]
+            vectors = self._ingredient_vectors(
+                sorted({ing for items in item_lists for ing in items})
+            )
+            keys = [query_text(p) for p in pantries]
+            full = self._pantry_vectors([k for k, items in zip(keys, item_lists) if not items])
+            return np.stack([
+                self._compose(items, vectors) if items else full[key]
+                for key, items in zip(keys, item_lists)
+            ])
+
+        keys = [query_text(p) for p in pantries]
+        full = self._pantry_vectors(keys)
+        return np.stack([full[k] for k in keys])
+
+    def _pantry_vectors(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Embeddings of pantry texts; each distinct text is one hit or miss."""
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                cached = self._pantries.get(key)
+                if cached is not None:
+                    found[key] = cached
+            missing = [k for k in dict.fromkeys(keys) if k not in found]
+            self.stats["pantry_hits"] += len(found)
+            self.stats["pantry_misses"] += len(missing)
+        if missing:
+            embs = self._encode([f"Ingredients: {k}" for k in missing])
+            with self._lock:
+                for key, emb in zip(missing, embs):
+                    self._pantries.put(key, emb)
+                    found[key] = emb
+        return found
+
+    def _ingredient_vectors(self, items: List[str]) -> Dict[str, np.ndarray]:
+        """Unit embeddings of single ingredients, counted like _pantry_vectors."""
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for ing in dict.fromkeys(items):
+                cached = self._ingredients.get(ing)
+                if cached is not None:
+                    found[ing] = cached
+            missing = [i for i in dict.fromkeys(items) if i not in found]
+            self.stats["ingredient_hits"] += len(found)
+            self.stats["ingredient_misses"] += len(missing)
+        if missing:
+            embs = self._encode([f"Ingredients: {ing}" for ing in missing])
+            with self._lock:
+                for ing, emb in zip(missing, embs):
+                    emb = _unit(emb)
+                    self._ingredients.put(ing, emb)
+                    found[ing] = emb
+        return found
+
+    @staticmethod
+    def _compose(items: List[str], vectors: Dict[str, np.ndarray]) -> np.ndarray:
+        mean = np.mean([vectors[ing] for ing in items], axis=0)
+        return _unit(mean).astype(np.float32)
+
+    def clear(self):
+        with self._lock:
+            self._pantries.clear()
+            self._ingredients.clear()
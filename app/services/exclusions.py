@@ -0,0 +1,148 @@
+# app/services/exclusions.py
+"""
+Ingredient exclusions ("no peanuts, no shellfish").
+
+Terms are ingredient words / names or allergen group names (ALLERGEN_GROUPS,
+expanded to their terms). A term is resolved with the catalog's word
+scheme (catalog.query_words, plus plural / singular variants for the
+"split" scheme) into a group of index words; a recipe is excluded when it
+contains every word of some group ("peanut butter" needs both words).
+
+The excluded recipes are one boolean mask over the catalog, built from
+the posting lists of the excluded words and cached per catalog and term
+set (RecipeCatalog.exclusion_mask). Scoring paths drop masked ids from the
+candidate set before scoring, so no ranked result is post-filtered.
+
+Matching is deliberately broad: "butter" also excludes peanut butter and
+"flour" also almond flour. For allergies a false exclusion is the safe
+side.
+"""
+from __future__ import annotations
+
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from .. import models
+from .ingredient_parser import _singular
+
+ALLERGEN_GROUPS = {
+    "peanut": ["peanut"],
+    "tree nut": [
+        "almond", "cashew", "walnut", "pecan", "pistachio", "hazelnut",
+        "macadamia", "brazil nut", "pine nut", "chestnut", "praline", "marzipan",
+    ],
+    "shellfish": [
+        "shrimp", "prawn", "crab", "lobster", "crawfish", "crayfish",
+        "langoustine", "scallop", "clam", "mussel", "oyster", "squid",
+        "calamari", "octopus",
+    ],
+    "fish": [
+        "fish", "salmon", "tuna", "cod", "halibut", "trout", "anchovy",
+        "sardine", "mackerel", "tilapia", "snapper", "haddock", "swordfish",
+        "catfish", "sea bass",
+    ],
+    "dairy": [
+        "milk", "butter", "cheese", "cream", "yogurt", "buttermilk", "ghee",
+        "parmesan", "mozzarella", "ricotta", "feta", "mascarpone", "whey",
+        "paneer", "gruyère", "cheddar",
+    ],
+    "egg": ["egg", "mayonnaise", "meringue"],
+    "gluten": [
+        "flour", "wheat", "bread", "breadcrumb", "panko", "pasta", "noodle",
+        "barley", "rye", "couscous", "semolina", "farro", "bulgur", "spelt",
+        "tortilla", "cracker",
+    ],
+    "soy": ["soy", "tofu", "edamame", "tempeh", "miso", "tamari"],
+    "sesame": ["sesame", "tahini"],
+}
+
+MAX_TERMS = 50
+
+TokenGroups = List[Tuple[str, ...]]
+
+
+def normalize_terms(terms: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    """Lowercased, de-duplicated, sorted terms (the cache key)."""
+    if not terms:
+        return ()
+    return tuple(sorted({t.strip().lower() for t in terms if t and t.strip()}))
+
+
+def expand_terms(terms: Iterable[str]) -> List[str]:
+    out: List[str] = []
+    for t in terms:
+        out.extend(ALLERGEN_GROUPS.get(t, [t]))
+    return out
+
+
+def _variants(term: str) -> Set[str]:
+    """The term with its last word singular and plural ("split" words keep both)."""
+    head, _, last = term.rpartition(" ")
+    one = _singular(last)
+    forms = {last, one, one + "s"}
+    if one.endswith(("s", "x", "z", "ch", "sh", "o")):
+        forms.add(one + "es")
+    elif len(one) > 2 and one.endswith("y") and one[-2] not in "aeiou":
+        forms.add(one[:-1] + "ies")
+    prefix = f"{head} " if head else ""
+    return {prefix + w for w in forms}
+
+
+def resolve(catalog, terms: Sequence[str]) -> TokenGroups:
+    """
+    Token groups (AND within a group, OR across groups) in the catalog's
+    words; groups with a word no recipe has are dropped.
+    """
+    vocab = catalog.words.vocab
+    groups = set()
+    for term in expand_terms(terms):
+        for variant in _variants(term):
+            words = catalog.query_words(variant)
+            if words and all(w in vocab for w in words):
+                groups.add(tuple(sorted(words)))
+    return sorted(groups)
+
+
+def mask_from_index(index, groups: TokenGroups, n: int) -> np.ndarray:
+    """Boolean mask of the recipes (rows of `index`) matching any group."""
+    mask = np.zeros(n, dtype=bool)
+    for group in groups:
+        ids = index.get(group[0])
+        for word in group[1:]:
+            if not len(ids):
+                break
+            ids = np.intersect1d(ids, index.get(word), assume_unique=True)
+        mask[ids] = True
+    return mask
+
+
+# -------------------------
+# Per-user exclusions
+# -------------------------
+def get_user_exclusions(db: Session, user_id: int) -> List[str]:
+    rows = (
+        db.query(models.UserExclusion.term)
+        .filter(models.UserExclusion.user_id == user_id)
+        .all()
+    )
+    return sorted(term for (term,) in rows)
+
+
+def set_user_exclusions(db: Session, user_id: int, terms: Iterable[str]) -> List[str]:
+    terms = list(normalize_terms(terms))
+    if len(terms) > MAX_TERMS:
+        raise ValueError(f"at most {MAX_TERMS} exclusions")
+
+    db.query(models.UserExclusion).filter(
+        models.UserExclusion.user_id == user_id
+    ).delete(synchronize_session=False)
+    db.add_all([models.UserExclusion(user_id=user_id, term=t) for t in terms])
+
+    from .user_recommendations import bump_state_version, store
+    # Other API workers see the new version and rebuild the user's state
+    bump_state_version(db, user_id)
+    db.commit()
+    store.drop(user_id)
+    return terms
@@ -0,0 +1,273 @@
+# app/services/ingredient_parser.py
+"""
+Ingredient lines -> canonical ingredient names.
+
+    "1 1/2 sticks unsalted butter, softened"   -> "butter"
+    "2 garlic cloves, finely chopped"          -> "garlic"
+    "1 12-ounce container cherry tomatoes"     -> "cherry tomato"
+    "Freshly ground black pepper"              -> "black pepper"
+
+ingredients_text joins lines with ", ", so a line's trailing clauses
+("softened", "cut into 1-inch pieces") come out as pieces of their own;
+they are all units / descriptors and parse to "". Per piece: drop
+parentheticals and the leading quantity, resolve PHRASES ("sea bass" stays
+whole, "fat free" goes as a whole), drop units, preparation and size
+words, singularize (lemma table, then suffix rules) and map synonyms.
+
+Word scheme "parsed-v1" indexes the words of the canonical names instead
+of every token of the raw text (scheme "split", category_rules.to_word_set).
+The scheme a catalog was built with is recorded in its info, and queries
+go through the same function (RecipeCatalog.query_words).
+"""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Set
+
+from .category_rules import to_word_set
+
+WORD_SCHEME = "parsed-v1"
+
+_FRACTIONS = "½¼¾⅓⅔⅛⅜⅝⅞"
+_PAREN_RE = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+_QTY_RE = re.compile(rf"^(?:about\s+)?[\d{_FRACTIONS}][\d{_FRACTIONS}\s/\.\-–]*")
+_WORD_RE = re.compile(r"[^\W\d_]+")
+_LINE_SPLIT_RE = re.compile(r",|\s(?:and|or)\s")
+
+# Dropped wherever they appear
+UNITS = frozenset("""
+    cup cups tablespoon tablespoons tbsp tbs tbsps teaspoon teaspoons tsp tsps
+    ounce ounces oz pound pounds lb lbs gram grams g kg kilogram kilograms
+    ml milliliter milliliters l liter liters litre litres quart quarts qt
+    pint pints pt gallon gallons inch inches cm mm pinch pinches dash dashes
+    package packages pkg container containers jar jars bag bags box boxes
+    envelope envelopes packet packets carton cartons bottle bottles tub tubs
+""".split())
+
+# Only dropped right after the quantity or as the last word
+# ("2 cloves garlic", "2 garlic cloves", but "ground cloves")
+POSITION_UNITS = frozenset("""
+    clove cloves head heads stick sticks can cans bunch bunches sprig sprigs
+    slice slices piece pieces sheet sheets stalk stalks rib ribs ear ears
+    knob knobs handful handfuls drop drops loaf loaves wedge wedges
+""".split())
+
+DESCRIPTORS = frozenset("""
+    a an and or of for to into in on with from at as if then not only each
+    the plus more about such other optional preferably equipment special
+    accompaniment garnish serving taste needed desired x inch recipe
+    sprinkling brushing dusting drizzling frying greasing dipping nonstick
+    equal total approximately
+    chopped finely minced diced sliced thinly thickly halved quartered cut
+    trimmed peeled unpeeled seeded cored pitted stemmed hulled scrubbed
+    rinsed drained patted torn crushed smashed grated shredded crumbled
+    beaten separated sifted packed lightly loosely firmly coarsely roughly
+    very slightly well melted softened chilled thawed frozen toasted roasted
+    cooked divided split lengthwise crosswise diagonally removed reserved
+    large medium small extra jumbo whole thick thin ripe fresh freshly
+    ground dried room temperature cold warm lukewarm
+    unsalted salted kosher coarse fine flaky sea granulated pure plain
+    unsweetened sweetened low reduced sodium fat lean boneless skinless
+    skin virgin all purpose heavy light dark good quality store bought
+    homemade organic strips cubes rounds matchsticks parts
+""".split())
+
+# Multi-word names that contain a descriptor word ("sea", "ground") and
+# multi-word descriptors whose words are not all DESCRIPTORS ("fat free"
+# must not leave "free"). Matched before any token is dropped, with the last
+# word singularized; names map to themselves, descriptors to "".
+PHRASES: Dict[tuple, str] = {
+    **{tuple(name.split()): name for name in (
+        "sea bass", "sea bream", "sea scallop", "sea urchin", "sea trout",
+        "ground cherry", "cream of tartar", "cream of coconut",
+        "cream of mushroom soup", "cream of chicken soup",
+    )},
+    **{tuple(d.split()): "" for d in (
+        "fat free", "sugar free", "gluten free", "dairy free", "salt free",
+        "no salt added", "reduced fat", "low fat", "part skim",
+    )},
+}
+_PHRASE_LENGTHS = sorted({len(k) for k in PHRASES}, reverse=True)
+
+# Irregular singulars; everything else goes through _singular's rules
+LEMMAS: Dict[str, str] = {
+    "leaves": "leaf", "halves": "half", "loaves": "loaf", "knives": "knife",
+    "tomatoes": "tomato", "potatoes": "potato", "mangoes": "mango",
+    "chiles": "chile", "chilies": "chile", "chilis": "chile", "chillies": "chile",
+    "chili": "chile", "chilli": "chile", "jalapeno": "jalapeño",
+    "jalapenos": "jalapeño", "yoghurt": "yogurt", "yolks": "yolk",
+    "pies": "pie", "cookies": "cookie", "brownies": "brownie", "veggies": "veggie",
+}
+
+_KEEP = frozenset("""
+    molasses asparagus hummus couscous citrus octopus swiss grits
+    hibiscus bass watercress lemongrass trans
+""".split())
+
+SYNONYMS: Dict[str, str] = {
+    "scallion": "green onion",
+    "spring onion": "green onion",
+    "garbanzo bean": "chickpea",
+    "garbanzo": "chickpea",
+    "aubergine": "eggplant",
+    "courgette": "zucchini",
+    "capsicum": "bell pepper",
+    "confectioners sugar": "powdered sugar",
+    "confectioner sugar": "powdered sugar",
+    "icing sugar": "powdered sugar",
+    "caster sugar": "superfine sugar",
+    "whipping cream": "cream",
+    "double cream": "cream",
+    "prawn": "shrimp",
+    "bicarbonate soda": "baking soda",
+    "corn starch": "cornstarch",
+    "cornflour": "cornstarch",
+    "coriander leaf": "cilantro",
+}
+
+
+def _singular(word: str) -> str:
+    lemma = LEMMAS.get(word)
+    if lemma is not None:
+        return lemma
+    if len(word) <= 3 or word in _KEEP or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("shes", "ches", "xes", "zes", "sses")):
+        return word[:-2]
+    if word.endswith("oes"):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def _resolve_phrases(tokens: List[str]) -> List[str]:
+    """Longest PHRASES match first; a name becomes one token ("sea bass")."""
+    out, i = [], 0
+    while i < len(tokens):
+        for n in _PHRASE_LENGTHS:
+            if i + n <= len(tokens):
+                key = (*tokens[i:i + n - 1], _singular(tokens[i + n - 1]))
+                phrase = PHRASES.get(key)
+                if phrase is not None:
+                    if phrase:
+                        out.append(phrase)
+                    i += n
+                    break
+        else:
+            out.append(tokens[i])
+            i += 1
+    return out
+
+
+@lru_cache(maxsize=65536)
+def parse_line(line: str) -> str:
+    """Canonical ingredient name of one ingredient line ("" if none)."""
+    text = _PAREN_RE.sub(" ", line.lower()).replace("'", "")
+    qty = _QTY_RE.match(text)
+    if qty:
+        text = text[qty.end():]
+
+    tokens = _WORD_RE.findall(text)
+    if tokens and tokens[0] == "equipment":
+        return ""
+    tokens = _resolve_phrases(tokens)
+    if qty:
+        while len(tokens) > 1 and (tokens[0] in UNITS or tokens[0] in POSITION_UNITS
+                                   or tokens[0] in DESCRIPTORS):
+            tokens.pop(0)
+    tokens = [_singular(t) for t in tokens if t not in UNITS and t not in DESCRIPTORS]
+    if len(tokens) > 1 and tokens[-1] in POSITION_UNITS:
+        tokens.pop()
+    elif len(tokens) == 1 and tokens[0] in POSITION_UNITS and tokens[0] != "clove":
+        return ""  # "cut into 1-inch pieces"; ground cloves are an ingredient
+
+    name = " ".join(tokens)
+    name = SYNONYMS.get(name, name)
+    if " " in name:
+        name = " ".join(SYNONYMS.get(t, t) for t in name.split(" "))
+    return name
+
+
+def split_lines(text: str) -> List[str]:
+    """Comma pieces, with "x and y" / "x or y" split too."""
+    if not isinstance(text, str):
+        return []
+    return [p for p in _LINE_SPLIT_RE.split(text) if p.strip()]
+
+
+# Comma pieces starting with these continue the previous line ("Flaky sea
+# salt, such as Maldon, for sprinkling")
+_CONTINUATIONS = frozenset("such for plus preferably about or if with at".split())
+
+
+def ingredient_lines(text: str) -> List[str]:
+    """
+    The original ingredient lines of an ingredients_text string. Lines
+    were joined with ", ", which lines themselves contain ("butter,
+    softened"); a lowercase piece that is only preparation / descriptor
+    words, or starts with "such as", "for", ..., goes back on the line
+    before it, as does one ending in a preparation word ("center membrane
+    removed") or the middle of "a, b, or c". Commas inside parentheses
+    never split.
+    """
+    if not isinstance(text, str):
+        return []
+    pieces, depth, start = [], 0, 0
+    for i, ch in enumerate(text):
+        if ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth = max(0, depth - 1)
+        elif ch == "," and depth == 0:
+            pieces.append(text[start:i])
+            start = i + 1
+    pieces.append(text[start:])
+
+    pieces = [p.strip() for p in pieces if p.strip()]
+    first_words = [(_WORD_RE.findall(p.lower()) or [""])[0] for p in pieces]
+    lines: List[str] = []
+    for i, piece in enumerate(pieces):
+        words = _WORD_RE.findall(piece.lower())
+        continues = lines and piece[0].islower() and (
+            not parse_line(piece)
+            or first_words[i] in _CONTINUATIONS
+            or (words and words[-1] in DESCRIPTORS)               # "membrane removed"
+            or (i + 1 < len(pieces) and first_words[i + 1] in ("or", "and"))  # "a, b, or c"
+        )
+        if continues:
+            lines[-1] = f"{lines[-1]}, {piece}"
+        else:
+            lines.append(piece)
+    return lines
+
+
+def canonical_names(text: str) -> List[str]:
+    """Canonical names of every line of an ingredients_text (or pantry) string."""
+    names = []
+    for piece in split_lines(text):
+        name = parse_line(piece.strip())
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def ingredient_words(text: str) -> Set[str]:
+    """Word set of the canonical names (scheme "parsed-v1")."""
+    return {w for name in canonical_names(text) for w in name.split(" ")}
+
+
+WORD_SCHEMES: Dict[str, Callable[[str], Set[str]]] = {
+    "split": to_word_set,
+    WORD_SCHEME: ingredient_words,
+}
+
+
+def word_set_fn(scheme: str) -> Callable[[str], Set[str]]:
+    try:
+        return WORD_SCHEMES[scheme]
+    except KeyError:
+        raise ValueError(f"unknown word scheme {scheme!r}") from None
@@ -0,0 +1,87 @@
+# app/services/lexical.py
+"""
+Lexical retrieval with the shipped TF-IDF vectorizer
+(model/recommender_vectorizer.pkl, fit on ingredients_text).
+
+The recipe matrix is transformed once per catalog and kept column-major
+(CSC, float32), so a pantry query only touches the columns of its own
+terms. Rows and the query are L2-normalized, so the score is the TF-IDF
+cosine.
+
+A single query is vectorized here (analyzer + vocabulary_ + idf_, the
+same raw-count x idf, l2 weighting as transform()): vectorizer.transform
+costs ~1ms of per-call overhead, the scoring itself ~0.1ms.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from typing import List, Sequence
+
+import numpy as np
+from scipy import sparse
+
+
+class LexicalIndex:
+    def __init__(self, vectorizer, matrix: sparse.csc_matrix):
+        self.vectorizer = vectorizer
+        self.matrix = matrix
+        self._analyzer = vectorizer.build_analyzer()
+        self._vocab = vectorizer.vocabulary_
+        self._idf = vectorizer.idf_.astype(np.float32)
+        # Other weightings (binary, sublinear tf, no idf / l2) go through transform()
+        self._fast_query = (vectorizer.use_idf and vectorizer.norm == "l2"
+                            and not vectorizer.sublinear_tf and not vectorizer.binary)
+
+    @classmethod
+    def from_texts(cls, vectorizer, texts: Sequence[str]) -> "LexicalIndex":
+        return cls(vectorizer, _transform(vectorizer, texts).tocsc())
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        m = self.matrix
+        return m.data.nbytes + m.indices.nbytes + m.indptr.nbytes
+
+    def scores(self, text: str) -> np.ndarray:
+        """TF-IDF cosine of `text` with every recipe (float32, n_recipes)."""
+        terms, weights = self._query(text)
+        if not len(terms):
+            return np.zeros(len(self), dtype=np.float32)
+
+        m = self.matrix
+        starts, stops = m.indptr[terms], m.indptr[terms + 1]
+        cols = [slice(a, b) for a, b in zip(starts, stops)]
+        rows = np.concatenate([m.indices[c] for c in cols])
+        data = np.concatenate([m.data[c] * w for c, w in zip(cols, weights)])
+        return np.bincount(rows, weights=data, minlength=len(self)).astype(np.float32)
+
+    def _query(self, text: str):
+        """(term ids, l2-normalized tf-idf weights) of one query."""
+        if not self._fast_query:
+            q = _transform(self.vectorizer, [text])
+            return q.indices, q.data
+
+        counts = Counter(self._vocab[t] for t in self._analyzer(text or "")
+                         if t in self._vocab)
+        terms = np.fromiter(counts, dtype=np.int32, count=len(counts))
+        weights = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        weights *= self._idf[terms]
+        norm = np.linalg.norm(weights)
+        return terms, weights / norm if norm else weights
+
+    def scores_many(self, texts: List[str]) -> np.ndarray:
+        """(n_recipes, len(texts)) scores with one sparse matmul."""
+        q = _transform(self.vectorizer, texts)
+        return (self.matrix @ q.T).toarray().astype(np.float32, copy=False)
+
+    def extended(self, texts: Sequence[str]) -> "LexicalIndex":
+        tail = _transform(self.vectorizer, texts)
+        return LexicalIndex(self.vectorizer,
+                            sparse.vstack([self.matrix, tail], format="csc"))
+
+
+def _transform(vectorizer, texts: Sequence[str]) -> sparse.csr_matrix:
+    texts = [t if isinstance(t, str) else "" for t in texts]
+    return vectorizer.transform(texts).astype(np.float32)
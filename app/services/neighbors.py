@@ -0,0 +1,113 @@
+# app/services/neighbors.py
+"""
+Precomputed "more like this" table: the top-k most similar recipes of
+every recipe by embedding cosine (app/jobs/build_neighbors.py).
+
+On disk, next to the catalog's artifacts (artifacts.artifact_dir):
+    recommender_neighbors_ids.npy       int32   (n_recipes, k), most similar first
+    recommender_neighbors_scores.npy    float16 (n_recipes, k) cosine
+
+Both are opened with mmap_mode="r", so a lookup reads one row. Recipes
+ingested after the table was built (ids >= n_recipes) are not in it, nor
+in anyone's neighbour list, until the job runs again.
+"""
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import numpy as np
+
+IDS_FILE = "recommender_neighbors_ids.npy"
+SCORES_FILE = "recommender_neighbors_scores.npy"
+
+
+def _block_top_k(emb: np.ndarray, lo: int, hi: int, k: int
+                 ) -> Tuple[np.ndarray, np.ndarray]:
+    sims = emb[lo:hi] @ emb.T                       # (block, n)
+    rows = np.arange(hi - lo)
+    sims[rows, rows + lo] = -np.inf                 # never its own neighbour
+    top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    scores = np.take_along_axis(sims, top, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return (np.take_along_axis(top, order, axis=1).astype(np.int32),
+            np.take_along_axis(scores, order, axis=1))
+
+
+def compute_neighbors(emb: np.ndarray, k: int, block_mb: float = 256,
+                      workers: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (ids, scores) of the k nearest rows of every row of the unit-normalized
+    `emb`, by blocks of rows: each block is one (block, n) matmul plus an
+    argpartition. `block_mb` bounds the memory of the blocks in flight
+    across the `workers` threads (numpy releases the GIL in both): per row,
+    the float32 similarities, their negated copy and argpartition's int64
+    indices, (4 + 4 + 8) * n bytes.
+    """
+    emb = np.ascontiguousarray(emb, dtype=np.float32)
+    n = len(emb)
+    k = min(k, n - 1)
+    ids = np.zeros((n, max(k, 0)), dtype=np.int32)
+    scores = np.zeros((n, max(k, 0)), dtype=np.float16)
+    if k <= 0:
+        return ids, scores
+
+    block = max(1, int(block_mb * 1e6 / ((4 + 4 + 8) * n * max(workers, 1))))
+    bounds = [(lo, min(lo + block, n)) for lo in range(0, n, block)]
+
+    def _run(bound):
+        lo, hi = bound
+        ids[lo:hi], scores[lo:hi] = _block_top_k(emb, lo, hi, k)
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_run, bounds))
+    else:
+        for bound in bounds:
+            _run(bound)
+    return ids, scores
+
+
+class NeighborTable:
+    def __init__(self, ids: np.ndarray, scores: np.ndarray):
+        self.ids = ids
+        self.scores = scores
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def k(self) -> int:
+        return self.ids.shape[1]
+
+    def lookup(self, recipe_id: int, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        return (np.asarray(self.ids[recipe_id, :limit]),
+                np.asarray(self.scores[recipe_id, :limit], dtype=np.float32))
+
+    def save(self, directory: str):
+        for name, arr in ((IDS_FILE, self.ids), (SCORES_FILE, self.scores)):
+            tmp = os.path.join(directory, f".tmp_{name}")
+            with open(tmp, "wb") as f:
+                np.save(f, arr)
+            os.replace(tmp, os.path.join(directory, name))
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["NeighborTable"]:
+        paths = [os.path.join(directory, name) for name in (IDS_FILE, SCORES_FILE)]
+        if not all(os.path.isfile(p) for p in paths):
+            return None
+        return cls(*(np.load(p, mmap_mode="r") for p in paths))
+
+
+def live_neighbors(emb: np.ndarray, recipe_id: int, limit: int
+                   ) -> Tuple[np.ndarray, np.ndarray]:
+    """Same as a table row, from one matvec (recipes the table doesn't cover)."""
+    sims = emb @ emb[recipe_id]
+    sims[recipe_id] = -np.inf
+    limit = min(limit, len(sims) - 1)
+    if limit <= 0:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+    top = np.argpartition(-sims, limit - 1)[:limit]
+    top = top[np.argsort(-sims[top], kind="stable")]
+    return top.astype(np.int32), sims[top].astype(np.float32)
@@ -0,0 +1,104 @@
+# app/services/onnx_encoder.py
+"""
+SentenceTransformer-compatible query encoder on onnxruntime.
+
+Runs an (int8-quantized) ONNX export of the transformer with the Rust
+`tokenizers` tokenizer and does the sentence-transformers pooling itself:
+mean over non-padding tokens, then L2 normalization (all-MiniLM-L6-v2's
+Pooling + Normalize modules). Needs onnxruntime + tokenizers only.
+
+The export dir (app/jobs/export_onnx_encoder.py) contains:
+    model_int8.onnx      quantized graph (inputs input_ids, attention_mask
+                         [, token_type_ids]; first output last_hidden_state)
+    tokenizer.json
+    encoder_info.json    source_model, max_seq_length, normalize, model_file
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import Iterable, List, Optional, Union
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+    from tokenizers import Tokenizer
+    _HAVE_ONNXRUNTIME = True
+except Exception:
+    _HAVE_ONNXRUNTIME = False
+
+INFO_FILE = "encoder_info.json"
+
+
+class OnnxSentenceEncoder:
+    def __init__(self, model_dir: str, threads: Optional[int] = None):
+        if not _HAVE_ONNXRUNTIME:
+            raise RuntimeError("the onnx embedding backend needs onnxruntime and "
+                               "tokenizers (pip install onnxruntime tokenizers)")
+
+        with open(os.path.join(model_dir, INFO_FILE)) as f:
+            self.info = json.load(f)
+        self.source_model = self.info["source_model"]
+        self.normalize = self.info.get("normalize", True)
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.info.get("max_seq_length", 256))
+        pad_token = self.info.get("pad_token", "[PAD]")
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id(pad_token) or 0,
+                                      pad_token=pad_token)
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            opts.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, self.info.get("model_file", "model_int8.onnx")),
+            sess_options=opts,
+            providers=["CPUExecutionProvider"],
+        )
+        self._inputs = {i.name for i in self.session.get_inputs()}
+
+    @classmethod
+    def for_model(cls, name: str, model_dir: str) -> "OnnxSentenceEncoder":
+        """Load `model_dir`, refusing an export of a different model."""
+        encoder = cls(model_dir)
+        if encoder.source_model != name:
+            raise RuntimeError(f"{model_dir} holds an export of {encoder.source_model}, "
+                               f"the catalog was embedded with {name}")
+        return encoder
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.asarray([e.ids for e in encodings], dtype=np.int64)
+        mask = np.asarray([e.attention_mask for e in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": mask}
+        if "token_type_ids" in self._inputs:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        hidden = self.session.run(None, feeds)[0]          # (batch, tokens, dim)
+
+        weights = mask[..., None].astype(np.float32)
+        pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+        if self.normalize:
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            pooled = pooled / np.clip(norms, 1e-12, None)
+        return pooled.astype(np.float32)
+
+    def encode(self, sentences: Union[str, Iterable[str]], batch_size: int = 32,
+               **kwargs) -> np.ndarray:
+        """Same contract as SentenceTransformer.encode (numpy output)."""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+
+        out = np.vstack([
+            self._encode_batch(texts[i:i + batch_size])
+            for i in range(0, len(texts), batch_size)
+        ])
+        return out[0] if single else out
+
+    @property
+    def dim(self) -> int:
+        return int(self.info.get("dim", 384))
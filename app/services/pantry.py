@@ -4,6 +4,7 @@ from typing import List, Optional
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
+from .user_recommendations import bump_state_version, store as rec_store
 
 
 # -------------------------
@@ -22,8 +23,10 @@ def create_pantry_item(db: Session, user_id: int, item_in: schemas.PantryItemCre
     expiry_date=item_in.expiry_date,
     )
     db.add(item)
+    version = bump_state_version(db, user_id)
     db.commit()
     db.refresh(item)
+    rec_store.on_item_added(user_id, item, version)
     return item
 
 
@@ -56,8 +59,11 @@ def delete_pantry_item(db: Session, user_id: int, item_id: int):
     if not item:
         return False
 
+    row = (item.name, item.expiry_date, item.quantity)
     db.delete(item)
+    version = bump_state_version(db, user_id)
     db.commit()
+    rec_store.on_item_removed(user_id, row, version)
     return True
 
 
@@ -71,6 +77,7 @@ def consume_ingredients(
 ) -> List[models.PantryItem]:
 
     removed_items = []
+    removed_rows = []
 
     ingredients = [i.lower().strip() for i in ingredients]
 
@@ -80,9 +87,15 @@ def consume_ingredients(
         for item in pantry_items:
             if item.name.lower() == used:
                 removed_items.append(item)
+                removed_rows.append((item.name, item.expiry_date, item.quantity))
                 db.delete(item)
                 break
 
+    if removed_rows:
+        version = bump_state_version(db, user_id)
     db.commit()
 
+    if removed_rows:
+        rec_store.on_items_removed(user_id, removed_rows, version)
+
     return removed_items
\ No newline at end of file
@@ -0,0 +1,66 @@
+# app/services/pantry_weights.py
+"""
+Per-ingredient weights for waste-aware ranking.
+
+An item's weight is 1, plus a boost that grows as its expiry_date gets
+close (halving every EXPIRY_HALF_LIFE_DAYS), plus a smaller boost for
+holding it in quantity. Units are free text, so quantity only counts
+on a log scale up to QUANTITY_REF. A pantry word takes the largest
+weight among the items containing it.
+"""
+from __future__ import annotations
+
+import math
+from datetime import date
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+from ..config import (
+    EXPIRY_BOOST,
+    EXPIRY_HALF_LIFE_DAYS,
+    QUANTITY_BOOST,
+    QUANTITY_REF,
+    WASTE_AWARE_SCORING,
+)
+from .category_rules import to_word_set
+
+
+def item_weight(expiry_date: Optional[date] = None, quantity: Optional[float] = None,
+                today: Optional[date] = None) -> float:
+    if not WASTE_AWARE_SCORING:
+        return 1.0
+
+    weight = 1.0
+    if expiry_date is not None:
+        days_left = max((expiry_date - (today or date.today())).days, 0)
+        weight += EXPIRY_BOOST * 0.5 ** (days_left / EXPIRY_HALF_LIFE_DAYS)
+    if quantity:
+        weight += QUANTITY_BOOST * min(
+            math.log1p(max(quantity, 0.0)) / math.log1p(QUANTITY_REF), 1.0
+        )
+    return weight
+
+
+def word_weights(items: Iterable[Tuple[str, float]],
+                 words: Callable[[str], Set[str]] = to_word_set) -> Dict[str, float]:
+    """
+    (item name, item weight) pairs -> pantry word -> weight. `words` splits
+    a name; pass the catalog's query_words so keys match its word sets.
+    """
+    weights: Dict[str, float] = {}
+    for name, weight in items:
+        for w in words(name.lower()):
+            if weight > weights.get(w, 0.0):
+                weights[w] = weight
+    return weights
+
+
+def pantry_word_weights(pantry_items, today: Optional[date] = None,
+                        words: Callable[[str], Set[str]] = to_word_set) -> Dict[str, float]:
+    """Word weights for models.PantryItem rows (or anything with the same fields)."""
+    today = today or date.today()
+    return word_weights(
+        ((item.name, item_weight(item.expiry_date, item.quantity, today))
+         for item in pantry_items
+         if item.name),
+        words,
+    )
@@ -0,0 +1,157 @@
+# app/services/projection.py
+"""
+Reduced-dimension recipe embeddings for a cheap first-pass scan
+(build_recommender --reduce-dim 64).
+
+A projection maps the unit embeddings u (384-d) to r = (u - mean) @ W with
+W a (384, d) matrix: the top-d PCA components of the catalog ("pca"), or
+a random orthonormal basis scaled by sqrt(384 / d) ("random"). For a unit
+query q,
+    u . q  ~=  r . (W^T q) + mean . q
+exactly for PCA when u - mean lies in the kept subspace, and in
+expectation for a random basis, so the first pass costs d instead of 384
+multiply-adds per recipe and its scores are on the cosine scale. The
+REDUCED_RESCORE_POOL best survivors are rescored at full dimension.
+
+On disk, next to the catalog's artifacts (artifacts.artifact_dir):
+    projection_components.npy   float32 (384, d)
+    projection_mean.npy         float32 (384,)
+    reduced_embeddings.npy      float32 (n_recipes, d)
+Recipes ingested after the build are projected when the catalog loads.
+"""
+from __future__ import annotations
+
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+COMPONENTS_FILE = "projection_components.npy"
+MEAN_FILE = "projection_mean.npy"
+REDUCED_FILE = "reduced_embeddings.npy"
+
+METHODS = ("pca", "random")
+
+# Rows projected per matmul when reducing a catalog
+_CHUNK_ROWS = 65536
+
+
+def fit(emb: np.ndarray, dim: int, method: str = "pca", seed: int = 0
+        ) -> Tuple[np.ndarray, np.ndarray]:
+    """(components (D, dim), mean (D,)) fitted on the unit embeddings `emb`."""
+    emb = np.asarray(emb, dtype=np.float32)
+    d_in = emb.shape[1]
+    if not 0 < dim < d_in:
+        raise ValueError(f"dim must be in 1..{d_in - 1}, got {dim}")
+    mean = emb.mean(axis=0, dtype=np.float64)
+
+    if method == "pca":
+        # Eigenvectors of the (D, D) covariance; cheaper than an SVD of emb
+        cov = (emb.T @ emb).astype(np.float64) / len(emb) - np.outer(mean, mean)
+        values, vectors = np.linalg.eigh(cov)
+        components = vectors[:, np.argsort(values)[::-1][:dim]]
+    elif method == "random":
+        rng = np.random.default_rng(seed)
+        q, _ = np.linalg.qr(rng.standard_normal((d_in, dim)))
+        components = q * np.sqrt(d_in / dim)
+    else:
+        raise ValueError(f"unknown projection method {method!r}, expected one of {METHODS}")
+    return components.astype(np.float32), mean.astype(np.float32)
+
+
+class ReducedEmbeddings:
+    def __init__(self, components: np.ndarray, mean: np.ndarray, rows: np.ndarray):
+        self.components = components
+        self.mean = mean
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def dim(self) -> int:
+        return self.components.shape[1]
+
+    @classmethod
+    def from_embeddings(cls, emb: np.ndarray, dim: int, method: str = "pca"
+                        ) -> "ReducedEmbeddings":
+        """Fit on the unit embeddings `emb` and reduce them."""
+        components, mean = fit(emb, dim, method)
+        return cls(components, mean, _project(emb, components, mean))
+
+    def extended(self, emb: np.ndarray) -> "ReducedEmbeddings":
+        """Same projection, with the unit embeddings `emb` appended as rows."""
+        return ReducedEmbeddings(self.components, self.mean,
+                                 np.vstack([self.rows,
+                                            _project(emb, self.components, self.mean)]))
+
+    def query(self, q: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (W^T q, mean . q) of a unit query, or per row of a (m, D) block of
+        them: first-pass cosines are rows @ W^T q + mean . q.
+        """
+        q = np.asarray(q, dtype=np.float32)
+        return q @ self.components, q @ self.mean
+
+    def scores(self, q: np.ndarray, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """Approximate cosines of the unit query `q` to the rows `ids` (or all)."""
+        qr, offset = self.query(q)
+        rows = self.rows if ids is None else self.rows[ids]
+        return rows @ qr + offset
+
+    def save(self, directory: str):
+        for name, arr in ((COMPONENTS_FILE, self.components), (MEAN_FILE, self.mean),
+                          (REDUCED_FILE, self.rows)):
+            tmp = os.path.join(directory, f".tmp_{name}")
+            with open(tmp, "wb") as f:
+                np.save(f, arr)
+            os.replace(tmp, os.path.join(directory, name))
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["ReducedEmbeddings"]:
+        paths = [os.path.join(directory, name)
+                 for name in (COMPONENTS_FILE, MEAN_FILE, REDUCED_FILE)]
+        if not all(os.path.isfile(p) for p in paths):
+            return None
+        return cls(*(np.load(p) for p in paths))
+
+
+def _project(emb: np.ndarray, components: np.ndarray, mean: np.ndarray) -> np.ndarray:
+    out = np.empty((len(emb), components.shape[1]), dtype=np.float32)
+    for lo in range(0, len(emb), _CHUNK_ROWS):
+        block = np.asarray(emb[lo:lo + _CHUNK_ROWS], dtype=np.float32)
+        out[lo:lo + len(block)] = (block - mean) @ components
+    return out
+
+
+def top_rescored(reduced: ReducedEmbeddings, emb: np.ndarray, q: np.ndarray, k: int,
+                 pool: int, ids: Optional[np.ndarray] = None
+                 ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (positions into `ids` (or rows), exact cosines) of the k rows most
+    similar to the unit query `q`: the `pool` best by reduced-space score,
+    rescored against the full unit embeddings `emb`.
+    """
+    return top_rescored_many(reduced, emb, np.asarray(q)[None, :], k, pool, ids)[0]
+
+
+def top_rescored_many(reduced: ReducedEmbeddings, emb: np.ndarray, queries: np.ndarray,
+                      k: int, pool: int, ids: Optional[np.ndarray] = None
+                      ) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """top_rescored for each row of `queries`, with one first-pass matmul."""
+    qr, offset = reduced.query(queries)
+    rows = reduced.rows if ids is None else reduced.rows[ids]
+    approx = rows @ qr.T + offset                    # (n, m)
+    n = len(approx)
+    pool = min(max(pool, k), n)
+    out = []
+    for col, q in enumerate(np.asarray(queries, dtype=np.float32)):
+        if pool <= 0:
+            out.append((np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)))
+            continue
+        survivors = np.sort(np.argpartition(-approx[:, col], pool - 1)[:pool] if pool < n
+                            else np.arange(n))
+        exact = emb[survivors if ids is None else ids[survivors]] @ q
+        order = np.argsort(-exact, kind="stable")[:k]
+        out.append((survivors[order], exact[order]))
+    return out
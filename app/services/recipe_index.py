@@ -0,0 +1,144 @@
+# app/services/recipe_index.py
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+_EMPTY = np.zeros(0, dtype=np.int32)
+
+# match() counts with a dense bincount when the concatenated posting lists
+# are at least 1/_DENSE_RATIO of the catalog (cheaper than sorting them)
+_DENSE_RATIO = 16
+
+
+class IngredientIndex:
+    """
+    Inverted index over recipe word sets: token -> sorted int32 array of
+    recipe ids (row positions in the metadata DataFrame).
+
+    Matching a pantry only touches the posting lists of the pantry's
+    tokens, so the cost scales with pantry size, not catalog size.
+    """
+
+    def __init__(self, postings: Dict[str, np.ndarray], n_recipes: int):
+        self.postings = postings
+        self.n_recipes = n_recipes
+
+    @classmethod
+    def from_word_sets(cls, word_sets: Iterable[Iterable[str]]) -> "IngredientIndex":
+        lists = defaultdict(list)
+        n = 0
+        for recipe_id, words in enumerate(word_sets):
+            for w in words:
+                lists[w].append(recipe_id)
+            n = recipe_id + 1
+        postings = {w: np.asarray(ids, dtype=np.int32) for w, ids in lists.items()}
+        return cls(postings, n)
+
+    @classmethod
+    def from_id_sets(cls, id_sets) -> "IngredientIndex":
+        """Transpose a vocab.IdSets; posting lists are views of one buffer."""
+        indptr, rows = id_sets.transpose()
+        tokens = id_sets.vocab.tokens
+        postings = {
+            tokens[t]: rows[indptr[t]:indptr[t + 1]]
+            for t in range(len(tokens))
+            if indptr[t + 1] > indptr[t]
+        }
+        return cls(postings, len(id_sets))
+
+    def extended(self, word_sets: Iterable[Iterable[str]]) -> "IngredientIndex":
+        """
+        New index with `word_sets` appended as recipe ids n_recipes, ...
+        Appended ids are larger than every existing id, so posting lists
+        stay sorted by concatenation. `self` is left untouched.
+        """
+        tail = IngredientIndex.from_word_sets(word_sets)
+        postings = dict(self.postings)
+        for w, ids in tail.postings.items():
+            ids = ids + np.int32(self.n_recipes)
+            postings[w] = np.concatenate([postings[w], ids]) if w in postings else ids
+        return IngredientIndex(postings, self.n_recipes + tail.n_recipes)
+
+    def get(self, token: str) -> np.ndarray:
+        return self.postings.get(token, _EMPTY)
+
+    def _gather(self, tokens: Iterable[str], weights: Optional[Dict[str, float]]
+                ) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Concatenated posting lists of `tokens` and, with `weights`, the
+        matching per-entry weights (a token without a weight counts 1).
+        """
+        present = [t for t in set(tokens) if t in self.postings]
+        if not present:
+            return None, None
+        lists = [self.postings[t] for t in present]
+        ids = np.concatenate(lists)
+        if weights is None:
+            return ids, None
+        w = np.repeat(
+            np.asarray([weights.get(t, 1.0) for t in present], dtype=np.float64),
+            [len(l) for l in lists],
+        )
+        return ids, w
+
+    def match(self, tokens: Iterable[str],
+              weights: Optional[Dict[str, float]] = None
+              ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return (recipe ids, number of tokens each recipe contains), or with
+        `weights` (positive) the summed weight of the contained tokens.
+        """
+        ids, w = self._gather(tokens, weights)
+        if ids is None:
+            return _EMPTY, (_EMPTY if weights is None else np.zeros(0))
+        if self.n_recipes <= _DENSE_RATIO * len(ids):
+            dense = np.bincount(ids, weights=w, minlength=self.n_recipes)
+            hit = np.flatnonzero(dense).astype(np.int32)
+            return hit, (dense[hit].astype(np.int32) if w is None else dense[hit])
+        if w is None:
+            ids, counts = np.unique(ids, return_counts=True)
+            return ids.astype(np.int32), counts.astype(np.int32)
+        ids, inverse = np.unique(ids, return_inverse=True)
+        return ids.astype(np.int32), np.bincount(inverse, weights=w)
+
+    def match_counts(self, tokens: Iterable[str],
+                     weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """
+        Dense per-recipe match counts (length n_recipes). With `weights`
+        this is the recipe x token matrix times the pantry weight vector,
+        computed column-wise over the pantry's posting lists only.
+        """
+        ids, w = self._gather(tokens, weights)
+        if ids is None:
+            dtype = np.int32 if weights is None else np.float64
+            return np.zeros(self.n_recipes, dtype=dtype)
+        counts = np.bincount(ids, weights=w, minlength=self.n_recipes)
+        return counts.astype(np.int32) if w is None else counts
+
+    def top_candidates(self, tokens: Iterable[str], n: int,
+                       allowed: Optional[np.ndarray] = None,
+                       weights: Optional[Dict[str, float]] = None,
+                       excluded: Optional[np.ndarray] = None
+                       ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-n recipe ids by number (or weight) of matched tokens, optionally
+        restricted to the sorted id array `allowed` and / or to recipes not
+        set in the boolean mask `excluded`. Ids are returned in ascending
+        order.
+        """
+        ids, counts = self.match(tokens, weights)
+        if allowed is not None and len(ids):
+            keep = np.isin(ids, allowed, assume_unique=True)
+            ids, counts = ids[keep], counts[keep]
+        if excluded is not None and len(ids):
+            keep = ~excluded[ids]
+            ids, counts = ids[keep], counts[keep]
+        if len(ids) > n:
+            top = np.argpartition(-counts, n - 1)[:n]
+            top.sort()
+            ids, counts = ids[top], counts[top]
+        return ids, counts
+
@@ -4,9 +4,15 @@ from typing import List, Optional
 import random
 
 from .. import schemas
-from ..ml.inference import generate_recipe as ml_generate_recipe
 
 
+def ml_generate_recipe(*args, **kwargs):
+    # Imported on first use: the generator loads transformers/torch, which
+    # retrieval-only workers never need
+    from ..ml.inference import generate_recipe
+
+    return generate_recipe(*args, **kwargs)
+
 
 # ------------------------------------------------------------------------------
 # Title templates
@@ -55,6 +61,10 @@ def cook_recipe(db: Session, user_id: int, ingredients: List[str]):
         if item:
             db.delete(item)
 
+    # Cached recommendation states of every worker rebuild on next read
+    from .user_recommendations import bump_state_version
+
+    bump_state_version(db, user_id)
     db.commit()
     return True
 
@@ -161,4 +171,204 @@ def recommend_recipes_from_inventory(
             )
         )
 
-    return recipes
\ No newline at end of file
+    return recipes
+
+# ------------------------------------------------------------------------------
+# CATALOG RECOMMENDATIONS (retrieval first, generation opt-in)
+# ------------------------------------------------------------------------------
+# Frontend filter labels -> categories assigned by 3_category_tagging.ipynb
+_CATALOG_CATEGORIES = {
+    "cheat meal": "indulgent",
+    "comfort food": "indulgent",
+    "easy to cook": "quick",
+    "high protein": "high_protein",
+}
+
+
+def _catalog_category(category: Optional[str]) -> Optional[str]:
+    if not category or not category.strip():
+        return None
+    ck = category.lower().strip()
+    return _CATALOG_CATEGORIES.get(ck, ck.replace(" ", "_"))
+
+
+def _split_ingredients(ingredients_text) -> List[str]:
+    from .ingredient_parser import ingredient_lines
+
+    return ingredient_lines(ingredients_text)
+
+
+def recommend_recipes_from_catalog(
+    ingredients: List[str],
+    category: Optional[str] = None,
+    max_recipes: int = 5,
+    include_generated: bool = False,
+    exclude: Optional[List[str]] = None,
+    diversity: Optional[float] = None,
+) -> List[schemas.Recipe]:
+    """
+    Rank real recipes from the hybrid recommender (no model generation).
+    If the recommender artifacts are missing, fall back to
+    recommend_recipes_from_inventory. `exclude` holds ingredient / allergen
+    exclusions (exclusions.py); no recipe is generated while any are set,
+    since a generated recipe can't be checked against them.
+    """
+    from . import recommender
+    from .artifacts import ArtifactError
+
+    ingredients = [ing.strip() for ing in ingredients if ing.strip()]
+
+    if not ingredients:
+        return []
+
+    try:
+        ranked = recommender.recommend_recipes(
+            ", ".join(ingredients),
+            top_k=max_recipes,
+            category=_catalog_category(category),
+            exclude=exclude,
+            diversity=diversity,
+        )
+    except (FileNotFoundError, ArtifactError) as e:
+        print("⚠️ Recommender artifacts unavailable, falling back:", e)
+        return recommend_recipes_from_inventory(ingredients, category, max_recipes)
+
+    return _catalog_recipes(ranked, ingredients, category, max_recipes,
+                            include_generated and not exclude)
+
+
+def cook_now_for_user(
+    db: Session,
+    user_id: int,
+    max_missing: int,
+    category: Optional[str] = None,
+    limit: int = 20,
+    exclude: Optional[List[str]] = None,
+) -> List[schemas.CookNowRecipe]:
+    """
+    Catalog recipes makeable from the user's pantry (coverage.py), minus the
+    user's stored exclusions and `exclude`.
+    """
+    from . import recommender
+    from .exclusions import get_user_exclusions
+
+    names = [
+        name.strip()
+        for (name,) in db.query(models.PantryItem.name)
+        .filter(models.PantryItem.user_id == user_id)
+        .all()
+        if name and name.strip()
+    ]
+    if not names:
+        return []
+
+    ranked = recommender.cook_now(", ".join(names), max_missing, limit,
+                                  _catalog_category(category),
+                                  get_user_exclusions(db, user_id) + list(exclude or ()))
+    return [
+        schemas.CookNowRecipe(
+            id=r["id"],
+            title=r["title"],
+            ingredients=_split_ingredients(r["ingredients_text"]),
+            instructions=r["instructions"],
+            category=(r["categories"] if isinstance(r["categories"], str)
+                      else "").replace("|", ", ") or None,
+            missing=r["missing"],
+            missing_count=r["missing_count"],
+            covered_count=r["covered_count"],
+        )
+        for r in ranked
+    ]
+
+
+def similar_recipes(recipe_id: int, limit: int = 10) -> Optional[List[schemas.SimilarRecipe]]:
+    """Catalog recipes most like `recipe_id` (neighbors.py); None if unknown."""
+    from . import recommender
+
+    ranked = recommender.similar_recipes(recipe_id, limit)
+    if ranked is None:
+        return None
+    return [
+        schemas.SimilarRecipe(
+            id=r["id"],
+            title=r["title"],
+            ingredients=_split_ingredients(r["ingredients_text"]),
+            instructions=r["instructions"],
+            category=(r["categories"] if isinstance(r["categories"], str)
+                      else "").replace("|", ", ") or None,
+            score=r["score"],
+            aliases=r["aliases"],
+        )
+        for r in ranked
+    ]
+
+
+def recommend_recipes_for_user(
+    db: Session,
+    user_id: int,
+    ingredients: List[str],
+    category: Optional[str] = None,
+    max_recipes: int = 5,
+    include_generated: bool = False,
+    exclude: Optional[List[str]] = None,
+    diversity: Optional[float] = None,
+) -> List[schemas.Recipe]:
+    """
+    Same as recommend_recipes_from_catalog, but served from the user's
+    materialized state (see user_recommendations.py), which also applies
+    the user's stored exclusions.
+    """
+    from .artifacts import ArtifactError
+    from .user_recommendations import store
+
+    ingredients = [ing.strip() for ing in ingredients if ing.strip()]
+
+    if not ingredients:
+        return []
+
+    try:
+        ranked = store.get(db, user_id, _catalog_category(category), max_recipes,
+                           exclude, diversity)
+    except (FileNotFoundError, ArtifactError) as e:
+        print("⚠️ Recommender artifacts unavailable, falling back:", e)
+        return recommend_recipes_from_inventory(ingredients, category, max_recipes)
+
+    excluding = bool(exclude) or bool(store.user_exclusions(db, user_id))
+    return _catalog_recipes(ranked, ingredients, category, max_recipes,
+                            include_generated and not excluding)
+
+
+def _catalog_recipes(
+    ranked: List[dict],
+    ingredients: List[str],
+    category: Optional[str],
+    max_recipes: int,
+    include_generated: bool,
+) -> List[schemas.Recipe]:
+    recipes: List[schemas.Recipe] = []
+
+    if include_generated:
+        try:
+            ml_result = ml_generate_recipe(
+                ingredients=ingredients,
+                category=category,
+                mode="inventory"
+            )
+            if isinstance(ml_result, dict):
+                recipes.append(schemas.Recipe(**ml_result))
+        except Exception as e:
+            print("⚠️ ML generator failed, serving catalog only:", e)
+
+    for r in ranked:
+        cats = r["categories"] if isinstance(r["categories"], str) else ""
+        recipes.append(
+            schemas.Recipe(
+                id=r["id"],
+                title=r["title"],
+                ingredients=_split_ingredients(r["ingredients_text"]),
+                instructions=r["instructions"],
+                category=cats.replace("|", ", ") or None,
+            )
+        )
+
+    return recipes[:max_recipes]
@@ -1,9 +1,22 @@
-from typing import List, Optional, Dict, Any
+from typing import Any, Dict, Iterable, List, Optional
 
 import numpy as np
 
-from ..deps import get_recommender_data, get_embed_model
-from ..config import ALPHA_INGREDIENT, BETA_EMBEDDING
+from ..deps import get_catalog, get_pantry_embedding_cache
+from ..config import (
+    ALPHA_INGREDIENT,
+    BETA_EMBEDDING,
+    GAMMA_LEXICAL,
+    RECOMMENDER_MODE,
+    PANTRY_EMBED_MODE,
+    CANDIDATE_POOL_SIZE,
+    BATCH_SCORE_CHUNK,
+    RECOMMENDER_SHARDS,
+    MMR_LAMBDA,
+    MMR_POOL_SIZE,
+    REDUCED_RESCORE_POOL,
+)
+from .diversify import diversify_order
 
 
 def _normalize_text(x):
@@ -12,15 +25,6 @@ def _normalize_text(x):
     return str(x).strip().lower()
 
 
-def _to_word_set(text: str):
-    import re
-    WORD_SPLIT_RE = re.compile(r"[,\s;:\(\)\[\]\.\-]+")
-    if not isinstance(text, str):
-        return set()
-    words = [w.strip() for w in WORD_SPLIT_RE.split(text.lower()) if w.strip()]
-    return set(words)
-
-
 def _ingredient_overlap_score(pantry_words, recipe_words):
     if not pantry_words:
         return 0.0
@@ -28,88 +32,468 @@ def _ingredient_overlap_score(pantry_words, recipe_words):
     return len(inter) / float(len(pantry_words))
 
 
-def _build_pantry_embedding(pantry_ingredients: str):
-    embed_model = get_embed_model()
-    text = _normalize_text(pantry_ingredients)
-    embed_text = f"Ingredients: {text}"
-    emb = embed_model.encode([embed_text])
-    return emb[0]
+def _pantry_total(pantry_words, weights: Optional[Dict[str, float]]) -> float:
+    """Overlap denominator: number of pantry words, or their summed weight."""
+    if weights is None:
+        return float(len(pantry_words))
+    return float(sum(weights.get(w, 1.0) for w in pantry_words))
+
 
+def _build_pantry_embedding(pantry_ingredients: str, mode: Optional[str] = None):
+    cache = get_pantry_embedding_cache()
+    return cache.encode_pantry(pantry_ingredients, mode=mode or PANTRY_EMBED_MODE)
 
-def _filter_by_category(df, category: Optional[str]):
+
+def _instructions_from_target(target_text) -> str:
+    """target_text is "Title: ...\nInstructions: ..."; keep the instructions."""
+    if not isinstance(target_text, str):
+        return ""
+    if "Instructions:" in target_text:
+        return target_text.split("Instructions:", 1)[1].strip()
+    return target_text.strip()
+
+
+def _filter_by_category(catalog, category: Optional[str]) -> Optional[np.ndarray]:
+    """Sorted ids of recipes tagged `category`, or None for no filter."""
     if category is None or not str(category).strip():
-        return df.index.to_list()
-    category = category.strip().lower()
-    mask = df["categories_list"].apply(
-        lambda cats: category in [c.lower() for c in cats]
-    )
-    return df[mask].index.to_list()
+        return None
+    _, category_index = catalog.indexes()
+    return category_index.get(category.strip().lower())
+
+
+def _allowed_ids(catalog, category: Optional[str],
+                 excluded: Optional[np.ndarray]) -> np.ndarray:
+    """Sorted ids in the category (or all) minus the `excluded` mask."""
+    allowed = _filter_by_category(catalog, category)
+    if allowed is None:
+        if excluded is None:
+            return np.arange(len(catalog), dtype=np.int32)
+        return np.flatnonzero(~excluded).astype(np.int32)
+    if excluded is not None:
+        allowed = allowed[~excluded[allowed]]
+    return allowed
+
+
+def _select_candidates(catalog, pantry_words, category: Optional[str], top_k: int,
+                       weights: Optional[Dict[str, float]] = None,
+                       excluded: Optional[np.ndarray] = None):
+    """
+    Stage 1: pick candidate ids and their pantry match counts (summed word
+    weights when `weights` is given).
+
+    Uses the inverted ingredient index to keep the CANDIDATE_POOL_SIZE
+    recipes with the most pantry words; falls back to every recipe (in
+    the category) when the pantry matches fewer than top_k recipes.
+    Recipes in the `excluded` mask never become candidates.
+    """
+    ingredient_index, _ = catalog.indexes()
+
+    allowed = _filter_by_category(catalog, category)
+    if allowed is not None:
+        if excluded is not None:
+            allowed = allowed[~excluded[allowed]]
+        if not len(allowed):
+            return allowed, allowed
+
+    if CANDIDATE_POOL_SIZE and pantry_words:
+        ids, counts = ingredient_index.top_candidates(
+            pantry_words, CANDIDATE_POOL_SIZE, allowed, weights,
+            excluded=excluded if allowed is None else None,
+        )
+        if len(ids) >= top_k:
+            return ids, counts
+
+    if allowed is None:
+        allowed = _allowed_ids(catalog, None, excluded)
+    counts = ingredient_index.match_counts(pantry_words, weights)[allowed]
+    return allowed, counts
+
+
+def _min_max_norm(x):
+    if np.allclose(x.max(), x.min()):
+        return np.zeros_like(x)
+    return (x - x.min()) / (x.max() - x.min())
+
+
+def _uses_lexical(mode: str) -> bool:
+    return mode == "lexical" or GAMMA_LEXICAL > 0
+
+
+def _blend(overlap, cos, lexical):
+    """
+    Hybrid score. Without `cos` (lexical mode) the TF-IDF cosine takes the
+    embedding's weight; `lexical` is None when GAMMA_LEXICAL is off.
+    """
+    final = ALPHA_INGREDIENT * _min_max_norm(overlap)
+    if cos is not None:
+        final = final + BETA_EMBEDDING * _min_max_norm(cos)
+        gamma = GAMMA_LEXICAL
+    else:
+        gamma = BETA_EMBEDDING + GAMMA_LEXICAL
+    if lexical is not None and gamma:
+        final = final + gamma * _min_max_norm(lexical)
+    return final
+
+
+def _mmr_lambda(diversity: Optional[float]) -> Optional[float]:
+    """MMR lambda for a request (MMR_LAMBDA unless given), None for no MMR."""
+    lam = MMR_LAMBDA if diversity is None else diversity
+    return lam if lam is not None and lam < 1 else None
+
+
+def _reduced_scan(catalog, cand_ids: np.ndarray):
+    """
+    The catalog's reduced embeddings (projection.py) when scoring cand_ids
+    is a full scan worth a reduced-dimension first pass, else None.
+    """
+    if not REDUCED_RESCORE_POOL or len(cand_ids) <= max(CANDIDATE_POOL_SIZE,
+                                                        REDUCED_RESCORE_POOL):
+        return None
+    return catalog.reduced()
+
+
+def _rescore(catalog, cand_ids: np.ndarray, approx: np.ndarray, query: np.ndarray,
+             overlap: np.ndarray, lexical: Optional[np.ndarray], top_k: int):
+    """
+    (cosines, survivors): the reduced-space `approx` cosines with those of
+    the REDUCED_RESCORE_POOL (at least top_k) best candidates by first-pass
+    hybrid score recomputed at full dimension, and those candidates' sorted
+    positions. Only survivors are ranked; the rest still count for min-max
+    scaling.
+    """
+    first = _blend(overlap, approx, lexical)
+    n = min(max(REDUCED_RESCORE_POOL, top_k), len(first))
+    survivors = np.sort(np.argpartition(-first, n - 1)[:n])
+    cos = approx.astype(np.float32, copy=True)
+    cos[survivors] = catalog.normalized_embeddings[cand_ids[survivors]] @ query
+    return cos, survivors
 
 
 def recommend_recipes(pantry_ingredients: str, top_k: int = 5,
-                      category: Optional[str] = None) -> List[Dict[str, Any]]:
-    df, recipe_embeddings, _ = get_recommender_data()
+                      category: Optional[str] = None,
+                      embed_mode: Optional[str] = None,
+                      weights: Optional[Dict[str, float]] = None,
+                      mode: Optional[str] = None,
+                      exclude: Optional[Iterable[str]] = None,
+                      diversity: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    `weights` (pantry word -> weight, see pantry_weights.py) turns the
+    overlap score into the weighted share of the pantry a recipe uses;
+    without it every word weighs 1. `mode` overrides RECOMMENDER_MODE.
+    Recipes matching an `exclude` term or allergen group (exclusions.py)
+    are never scored. `diversity` is the MMR lambda (diversify.py;
+    default MMR_LAMBDA, 1 = off).
+    """
+    mode = mode or RECOMMENDER_MODE
+    if RECOMMENDER_SHARDS > 1 and not _uses_lexical(mode):
+        from .sharding import get_shard_pool
+
+        return get_shard_pool(RECOMMENDER_SHARDS).recommend(
+            pantry_ingredients, top_k, category, embed_mode, weights, exclude,
+            _mmr_lambda(diversity),
+        )
+
+    # One catalog snapshot per query: a hot swap mid-query can't mix versions
+    catalog = get_catalog()
 
     pantry_norm = _normalize_text(pantry_ingredients)
-    pantry_words = _to_word_set(pantry_norm)
+    pantry_words = catalog.query_words(pantry_norm)
 
-    candidate_idx = _filter_by_category(df, category)
-    if not candidate_idx:
+    candidate_idx, match_counts = _select_candidates(
+        catalog, pantry_words, category, top_k, weights,
+        catalog.exclusion_mask(exclude),
+    )
+    if not len(candidate_idx):
         return []
 
-    cand_embeddings = recipe_embeddings[candidate_idx]
-    cand_df = df.iloc[candidate_idx].reset_index(drop=True)
+    if pantry_words:
+        overlap_scores = match_counts / _pantry_total(pantry_words, weights)
+    else:
+        overlap_scores = np.zeros(len(candidate_idx))
 
-    overlap_scores = []
-    for _, row in cand_df.iterrows():
-        score = _ingredient_overlap_score(pantry_words, row["ingredients_words"])
-        overlap_scores.append(score)
-    overlap_scores = np.array(overlap_scores)
+    lexical = None
+    if _uses_lexical(mode):
+        lexical = catalog.lexical().scores(pantry_norm)[candidate_idx]
 
-    pantry_emb = _build_pantry_embedding(pantry_ingredients)
-    pantry_emb = pantry_emb.reshape(1, -1)
-    from sklearn.metrics.pairwise import cosine_similarity
+    # Stage 2: embedding (and/or TF-IDF) rerank of the candidates only
+    cos_sims = survivors = None
+    if mode != "lexical":
+        pantry_emb = _build_pantry_embedding(pantry_ingredients, mode=embed_mode)
+        norm = np.linalg.norm(pantry_emb)
+        if norm:
+            pantry_emb = pantry_emb / norm
 
-    cos_sims = cosine_similarity(pantry_emb, cand_embeddings)[0]
+        # Every recipe a candidate (sorted ids): scan without gathering rows
+        scan_all = len(candidate_idx) == len(catalog)
+        reduced = _reduced_scan(catalog, candidate_idx)
+        if reduced is not None:
+            approx = reduced.scores(pantry_emb, None if scan_all else candidate_idx)
+            cos_sims, survivors = _rescore(catalog, candidate_idx, approx, pantry_emb,
+                                           overlap_scores, lexical, top_k)
+        else:
+            cand_embeddings = (catalog.normalized_embeddings if scan_all
+                               else catalog.normalized_embeddings[candidate_idx])
+            # cosine similarity == dot product on unit vectors
+            cos_sims = cand_embeddings @ pantry_emb
 
-    def min_max_norm(x):
-        if np.allclose(x.max(), x.min()):
-            return np.zeros_like(x)
-        return (x - x.min()) / (x.max() - x.min())
+    final_scores = _blend(overlap_scores, cos_sims, lexical)
+    order = _top_positions(catalog, final_scores, candidate_idx, top_k,
+                           _mmr_lambda(diversity), survivors)
 
-    overlap_norm = min_max_norm(overlap_scores)
-    cos_norm = min_max_norm(cos_sims)
+    return [
+        _format_result(catalog, int(candidate_idx[j]), final_scores[j],
+                       overlap_scores[j],
+                       cos_sims[j] if cos_sims is not None else 0.0,
+                       lexical[j] if lexical is not None else 0.0)
+        for j in order
+    ]
 
-    final_scores = ALPHA_INGREDIENT * overlap_norm + BETA_EMBEDDING * cos_norm
 
-    cand_df = cand_df.copy()
-    cand_df["overlap_score"] = overlap_scores
-    cand_df["cosine_score"] = cos_sims
-    cand_df["final_score"] = final_scores
+def _top_positions(catalog, final: np.ndarray, cand_ids: np.ndarray, top_k: int,
+                   lam: Optional[float], survivors: Optional[np.ndarray] = None
+                   ) -> np.ndarray:
+    """Positions of the top_k `final` scores (MMR with `lam`), among `survivors` only if given."""
+    if survivors is not None:
+        order = _top_positions(catalog, final[survivors], cand_ids[survivors], top_k, lam)
+        return survivors[order]
+    if lam is None:
+        return np.argsort(-final, kind="stable")[:top_k]
+    return diversify_order(final, cand_ids, catalog.normalized_embeddings,
+                           top_k, lam, MMR_POOL_SIZE)
 
-    cand_df = cand_df.sort_values("final_score", ascending=False)
-    top = cand_df.head(top_k)
 
+def _format_result(catalog, recipe_id: int, final_score, overlap_score,
+                   cosine_score, lexical_score=0.0) -> Dict[str, Any]:
+    row = catalog.record(recipe_id)
+    return {
+        "id": recipe_id,
+        "title": row["Title"],
+        "ingredients_text": row["ingredients_text"],
+        "instructions": _instructions_from_target(row.get("target_text")),
+        "categories": row["categories"],
+        "final_score": float(final_score),
+        "overlap_score": float(overlap_score),
+        "cosine_score": float(cosine_score),
+        "lexical_score": float(lexical_score),
+    }
+
+
+def recommend_recipes_batch(pantries: List[str], top_k: int = 5,
+                            category: Optional[str] = None,
+                            embed_mode: Optional[str] = None,
+                            chunk_size: int = BATCH_SCORE_CHUNK,
+                            weights: Optional[List[Optional[Dict[str, float]]]] = None,
+                            mode: Optional[str] = None,
+                            exclude: Optional[Iterable[str]] = None,
+                            diversity: Optional[float] = None
+                            ) -> List[List[Dict[str, Any]]]:
+    """
+    Recommend for many pantries at once.
+
+    All pantries are encoded in one batched encode call, and each chunk of
+    `chunk_size` pantries is scored against every recipe (in the category)
+    with a single embeddings matmul. Peak scoring memory is about
+    n_recipes * chunk_size floats. Scores match recommend_recipes with
+    CANDIDATE_POOL_SIZE = 0. `weights` holds one word-weight dict (or None)
+    per pantry. TF-IDF scores (lexical mode / GAMMA_LEXICAL) are one sparse
+    matmul per chunk. `exclude` and `diversity` apply to every pantry.
+    """
+    if not pantries:
+        return []
+    mode = mode or RECOMMENDER_MODE
+    if RECOMMENDER_SHARDS > 1 and not _uses_lexical(mode):
+        from .sharding import get_shard_pool
+
+        return get_shard_pool(RECOMMENDER_SHARDS).recommend_many(
+            pantries, top_k, category, embed_mode, weights, exclude,
+            _mmr_lambda(diversity),
+        )
+
+    catalog = get_catalog()
+    ingredient_index, _ = catalog.indexes()
+
+    cand_ids = _allowed_ids(catalog, category, catalog.exclusion_mask(exclude))
+    if not len(cand_ids):
+        return [[] for _ in pantries]
+    texts = [_normalize_text(p) for p in pantries]
+
+    cand_embeddings = cand_reduced = query_embs = None
+    reduced = _reduced_scan(catalog, cand_ids) if mode != "lexical" else None
+    if reduced is not None:
+        cand_reduced = reduced.rows if len(cand_ids) == len(catalog) else reduced.rows[cand_ids]
+    elif mode != "lexical":
+        cand_embeddings = catalog.normalized_embeddings[cand_ids]
+    if mode != "lexical":
+        cache = get_pantry_embedding_cache()
+        query_embs = cache.encode_pantries(pantries, mode=embed_mode or PANTRY_EMBED_MODE)
+        norms = np.linalg.norm(query_embs, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        query_embs = query_embs / norms
+    lexical_index = catalog.lexical() if _uses_lexical(mode) else None
+
+    results: List[List[Dict[str, Any]]] = []
+
+    for start in range(0, len(pantries), chunk_size):
+        chunk = texts[start:start + chunk_size]
+
+        # (n_candidates, chunk) cosine scores in one matmul (first-pass
+        # cosines in the reduced space when scanning reduced embeddings)
+        cos_sims = None
+        if cand_reduced is not None:
+            qr, offset = reduced.query(query_embs[start:start + chunk_size])
+            cos_sims = cand_reduced @ qr.T + offset
+        elif query_embs is not None:
+            cos_sims = cand_embeddings @ query_embs[start:start + chunk_size].T
+        lex_sims = (lexical_index.scores_many(chunk)[cand_ids]
+                    if lexical_index is not None else None)
+
+        for col, pantry_norm in enumerate(chunk):
+            pantry_words = catalog.query_words(pantry_norm)
+            w = weights[start + col] if weights is not None else None
+            if pantry_words:
+                overlap = (ingredient_index.match_counts(pantry_words, w)[cand_ids]
+                           / _pantry_total(pantry_words, w))
+            else:
+                overlap = np.zeros(len(cand_ids))
+
+            cos = cos_sims[:, col] if cos_sims is not None else None
+            lexical = lex_sims[:, col] if lex_sims is not None else None
+            survivors = None
+            if cand_reduced is not None:
+                cos, survivors = _rescore(catalog, cand_ids, cos, query_embs[start + col],
+                                          overlap, lexical, top_k)
+
+            results.append(rank_candidates(
+                catalog, cand_ids, overlap, cos, top_k,
+                lexical=lexical, diversity=diversity, survivors=survivors,
+            ))
+
+    return results
+
+
+def rank_candidates(catalog, cand_ids: np.ndarray, overlap: np.ndarray,
+                    cos: Optional[np.ndarray], top_k: int,
+                    lexical: Optional[np.ndarray] = None,
+                    diversity: Optional[float] = None,
+                    survivors: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+    """
+    Blend precomputed overlap/cosine (and TF-IDF) vectors over cand_ids and
+    take top_k (MMR re-ranked with `diversity`). cos is None in lexical mode.
+    With `survivors` (positions, see _rescore) only those are ranked.
+    """
+    final = _blend(overlap, cos, lexical)
+    ranked, ranked_ids = final, cand_ids
+    if survivors is not None:
+        ranked, ranked_ids = final[survivors], cand_ids[survivors]
+
+    k = min(top_k, len(ranked))
+    if k <= 0:
+        return []
+
+    lam = _mmr_lambda(diversity)
+    if lam is None:
+        top = np.argpartition(-ranked, k - 1)[:k]
+        top = top[np.argsort(-ranked[top], kind="stable")]
+    else:
+        top = diversify_order(ranked, ranked_ids, catalog.normalized_embeddings,
+                              top_k, lam, MMR_POOL_SIZE)
+    if survivors is not None:
+        top = survivors[top]
+    return [
+        _format_result(catalog, int(cand_ids[j]), final[j], overlap[j],
+                       cos[j] if cos is not None else 0.0,
+                       lexical[j] if lexical is not None else 0.0)
+        for j in top
+    ]
+
+
+def cook_now(pantry_ingredients: str, max_missing: int = 2, top_k: int = 20,
+             category: Optional[str] = None,
+             exclude: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Recipes the pantry covers with at most `max_missing` missing canonical
+    ingredients (staples count as owned, see coverage.py). Fewest missing
+    first, then the most pantry ingredients used. No embeddings involved.
+    """
+    from .ingredient_parser import canonical_names
+
+    catalog = get_catalog()
+    coverage = catalog.coverage()
+    pantry_names = canonical_names(_normalize_text(pantry_ingredients))
+
+    excluded = catalog.exclusion_mask(exclude)
+    allowed = _filter_by_category(catalog, category)
+    if allowed is not None:
+        if excluded is not None:
+            allowed = allowed[~excluded[allowed]]
+        if not len(allowed):
+            return []
+    ids, missing, covered = coverage.query(
+        pantry_names, max_missing, allowed,
+        excluded=excluded if allowed is None else None,
+    )
+
+    order = np.lexsort((ids, -covered, missing))[:top_k]
     results = []
-    for _, row in top.iterrows():
+    for j in order:
+        rid = int(ids[j])
+        row = catalog.record(rid)
         results.append({
+            "id": rid,
             "title": row["Title"],
             "ingredients_text": row["ingredients_text"],
+            "instructions": _instructions_from_target(row.get("target_text")),
             "categories": row["categories"],
-            "final_score": float(row["final_score"]),
-            "overlap_score": float(row["overlap_score"]),
-            "cosine_score": float(row["cosine_score"]),
+            "missing_count": int(missing[j]),
+            "covered_count": int(covered[j]),
+            "missing": coverage.missing_names(rid, pantry_names),
         })
+    return results
+
+
+def similar_recipes(recipe_id: int, top_k: int = 10) -> Optional[List[Dict[str, Any]]]:
+    """
+    The top_k recipes most similar to `recipe_id` by embedding cosine, from
+    the precomputed neighbour table (one row read) when the catalog has one
+    covering the id, else from one live matvec. None for an unknown id.
+    Each result lists the titles of the near-duplicates it absorbed.
+    """
+    from .neighbors import live_neighbors
 
+    catalog = get_catalog()
+    if not 0 <= recipe_id < len(catalog):
+        return None
+
+    table = catalog.neighbors()
+    if table is not None and recipe_id < len(table) and top_k <= table.k:
+        ids, scores = table.lookup(recipe_id, top_k)
+    else:
+        ids, scores = live_neighbors(catalog.normalized_embeddings, recipe_id, top_k)
+
+    aliases = catalog.aliases()
+    results = []
+    for rid, score in zip(ids, scores):
+        row = catalog.record(int(rid))
+        results.append({
+            "id": int(rid),
+            "title": row["Title"],
+            "ingredients_text": row["ingredients_text"],
+            "instructions": _instructions_from_target(row.get("target_text")),
+            "categories": row["categories"],
+            "score": float(score),
+            "aliases": aliases.get(int(rid), []),
+        })
     return results
 
 
 def list_all_categories() -> List[str]:
-    df, _, _ = get_recommender_data()
-    cats = set()
-    for cat_str in df["categories"]:
-        if isinstance(cat_str, str) and cat_str.strip():
+    # Names keep the casing they were tagged with; spellings that differ only
+    # in case (matched as one category) are listed once
+    names: Dict[str, str] = {}
+    for cat_str in get_catalog().column("categories"):
+        if isinstance(cat_str, str):
             for c in cat_str.split("|"):
-                if c.strip():
-                    cats.add(c.strip())
-    return sorted(cats)
\ No newline at end of file
+                c = c.strip()
+                if c:
+                    names.setdefault(c.lower(), c)
+    return sorted(names.values())
\ No newline at end of file
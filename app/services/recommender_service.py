@@ -1,26 +1,12 @@
-import os
-import json
-import joblib
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 
-MODEL_DIR = "model"
-EMB_PATH = os.path.join(MODEL_DIR, "recommender_embeddings.npy")
-META_PATH = os.path.join(MODEL_DIR, "recommender_metadata.pkl")
-INFO_PATH = os.path.join(MODEL_DIR, "recommender_model_info.json")
+from ..config import BATCH_SCORE_CHUNK, PANTRY_EMBED_MODE, REDUCED_RESCORE_POOL
+from ..deps import get_catalog, get_pantry_embedding_cache
+from .projection import top_rescored, top_rescored_many
 
-# Load metadata
-meta_df = joblib.load(META_PATH)
-
-# Load recipe embeddings
-recipe_embeddings = np.load(EMB_PATH)
-
-# Load embedding model info
-with open(INFO_PATH, "r") as f:
-    info = json.load(f)
-
-embed_model = SentenceTransformer(info["embedding_model"])
+# Metadata, embeddings and the SentenceTransformer come from the active
+# recommender catalog (see services/artifacts.py), so a new artifact
+# version is hot-swapped instead of requiring a worker restart.
 
 
 def normalize_text(x):
@@ -29,35 +15,100 @@ def normalize_text(x):
     return str(x).lower().strip()
 
 
-def recommend_recipes(pantry_ingredients, top_k=5, category=None):
-    pantry_norm = normalize_text(pantry_ingredients)
+def _category_ids(catalog, category):
+    """Row ids whose categories contain `category`, or None for no filter."""
+    if not category:
+        return None
+    category = category.lower().strip()
+    meta_df = catalog.df
+    mask = meta_df["categories"].str.lower().str.contains(category).fillna(False).to_numpy()
+    return np.flatnonzero(mask)
 
-    pantry_emb = embed_model.encode([f"Ingredients: {pantry_norm}"])[0]
-    pantry_emb = pantry_emb.reshape(1, -1)
-
-    sims = cosine_similarity(pantry_emb, recipe_embeddings)[0]
-
-    # CATEGORY FILTER
-    if category:
-        category = category.lower().strip()
-        mask = meta_df["categories"].str.lower().str.contains(category)
-        meta_filtered = meta_df[mask].copy()
-        sims_filtered = sims[mask]
-    else:
-        meta_filtered = meta_df.copy()
-        sims_filtered = sims
-
-    # TOP K
-    top_idx = np.argsort(sims_filtered)[::-1][:top_k]
 
+def _format(catalog, rows, scores):
     results = []
-    for idx in top_idx:
-        row = meta_filtered.iloc[idx]
+    for row_id, score in zip(rows, scores):
+        row = catalog.record(int(row_id))
         results.append({
+            "id": int(row_id),
             "title": row["Title"],
             "ingredients_text": row["ingredients_text"],
             "categories": row["categories"],
-            "score": float(sims_filtered[idx])
+            "score": float(score)
         })
+    return results
+
+
+def recommend_recipes(pantry_ingredients, top_k=5, category=None, embed_mode=None):
+    catalog = get_catalog()
+
+    pantry_emb = get_pantry_embedding_cache().encode_pantry(
+        pantry_ingredients, mode=embed_mode or PANTRY_EMBED_MODE
+    )
+    norm = np.linalg.norm(pantry_emb)
+    if norm:
+        pantry_emb = pantry_emb / norm
 
-    return results
\ No newline at end of file
+    # CATEGORY FILTER
+    ids = _category_ids(catalog, category)
+
+    reduced = catalog.reduced() if REDUCED_RESCORE_POOL else None
+    if reduced is not None:
+        # Reduced-dimension first pass, survivors rescored at full dimension
+        top, scores = top_rescored(reduced, catalog.normalized_embeddings, pantry_emb,
+                                   top_k, REDUCED_RESCORE_POOL, ids)
+    else:
+        # cosine similarity == dot product on unit vectors
+        sims = catalog.normalized_embeddings @ pantry_emb
+        sims_filtered = sims if ids is None else sims[ids]
+
+        # TOP K
+        top = np.argsort(sims_filtered)[::-1][:top_k]
+        scores = sims_filtered[top]
+
+    rows = top if ids is None else ids[top]
+    return _format(catalog, rows, scores)
+
+
+def recommend_recipes_batch(pantries, top_k=5, category=None, embed_mode=None,
+                            chunk_size=BATCH_SCORE_CHUNK):
+    """
+    recommend_recipes for many pantries: one batched encode call and one
+    embeddings matmul per chunk of `chunk_size` pantries.
+    """
+    if not pantries:
+        return []
+    catalog = get_catalog()
+
+    embs = get_pantry_embedding_cache().encode_pantries(
+        pantries, mode=embed_mode or PANTRY_EMBED_MODE
+    )
+    norms = np.linalg.norm(embs, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    embs = (embs / norms).astype(np.float32)
+
+    ids = _category_ids(catalog, category)
+    emb = catalog.normalized_embeddings
+    cand = emb if ids is None else emb[ids]
+    k = min(top_k, len(cand))
+    reduced = catalog.reduced() if REDUCED_RESCORE_POOL else None
+
+    results = []
+    for start in range(0, len(embs), chunk_size):
+        block = embs[start:start + chunk_size]
+        if k <= 0:
+            results.extend([] for _ in block)
+            continue
+        if reduced is not None:
+            picks = top_rescored_many(reduced, emb, block, k, REDUCED_RESCORE_POOL, ids)
+        else:
+            # (n_candidates, chunk) cosine scores in one matmul
+            sims = cand @ block.T
+            top = np.argpartition(-sims, k - 1, axis=0)[:k]
+            order = np.argsort(-np.take_along_axis(sims, top, axis=0), axis=0, kind="stable")
+            top = np.take_along_axis(top, order, axis=0)
+            picks = [(top[:, col], sims[top[:, col], col]) for col in range(len(block))]
+        for top_col, scores in picks:
+            rows = top_col if ids is None else ids[top_col]
+            results.append(_format(catalog, rows, scores))
+    return results
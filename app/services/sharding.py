@@ -0,0 +1,358 @@
+# app/services/sharding.py
+"""
+Sharded recommender: the catalog is split into N contiguous id ranges,
+each owned by a worker process.
+
+Workers only need the word / category id sets and the normalized
+embeddings, which they open with mmap_mode="r" from a columnar bundle dir
+(or from arrays exported to a temp dir for in-memory catalogs), so all
+shards share the same page cache. The coordinator (the API process)
+encodes the pantry, fans the query out and formats the merged results.
+
+The hybrid score min-max normalizes overlap and cosine over every
+candidate, so a query takes two rounds:
+    1. "score": each shard scores its recipes and returns min/max stats
+    2. "rank":  each shard ranks with the global stats and returns its
+                local top-k; the coordinator merges them with a heap
+Shards score every recipe in their range (the recommend_recipes_batch
+semantics), so results match recommend_recipes with CANDIDATE_POOL_SIZE = 0.
+Exclusion terms are resolved to word groups by the coordinator; each shard
+builds the excluded mask over its own range from its posting lists. With
+MMR (diversify.py) shards return their MMR_POOL_SIZE best and the
+coordinator re-ranks the merged pool.
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import multiprocessing as mp
+import os
+import shutil
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .diversify import mmr
+from .exclusions import TokenGroups, mask_from_index, normalize_terms, resolve
+from .recipe_index import IngredientIndex
+from .vocab import IdSets, Vocabulary
+
+# (pantry words, word weights or None, unit pantry embedding, category or None,
+#  excluded word groups)
+ShardQuery = Tuple[List[str], Optional[Dict[str, float]], np.ndarray, Optional[str],
+                   TokenGroups]
+# (min overlap, max overlap, min cosine, max cosine) or None if no candidates
+ShardStats = Optional[Tuple[float, float, float, float]]
+
+
+def shard_bounds(n: int, n_shards: int) -> List[Tuple[int, int]]:
+    edges = np.linspace(0, n, n_shards + 1).astype(int)
+    return [(int(edges[i]), int(edges[i + 1])) for i in range(n_shards)]
+
+
+def _load_id_sets(data_dir: str, prefix: str, lo: int, hi: int) -> IdSets:
+    with open(os.path.join(data_dir, f"{prefix}_vocab.json")) as f:
+        vocab = Vocabulary(json.load(f))
+    indptr = np.load(os.path.join(data_dir, f"{prefix}_indptr.npy"), mmap_mode="r")
+    ids = np.load(os.path.join(data_dir, f"{prefix}_ids.npy"), mmap_mode="r")
+    start, stop = int(indptr[lo]), int(indptr[hi])
+    return IdSets(np.asarray(indptr[lo:hi + 1]) - start, ids[start:stop], vocab)
+
+
+def export_shared_arrays(catalog, data_dir: str):
+    """Write the arrays shards need (same file names as a columnar bundle)."""
+    from .columnar import save_id_sets
+
+    save_id_sets(data_dir, "word", catalog.words)
+    save_id_sets(data_dir, "category", catalog.categories)
+    np.save(os.path.join(data_dir, "embeddings.npy"), catalog.normalized_embeddings)
+
+
+# -------------------------
+# Worker side
+# -------------------------
+class _Shard:
+    def __init__(self, data_dir: str, lo: int, hi: int, alpha: float, beta: float):
+        self.lo = lo
+        self.alpha = alpha
+        self.beta = beta
+        self.embeddings = np.load(os.path.join(data_dir, "embeddings.npy"),
+                                  mmap_mode="r")[lo:hi]
+        self.index = IngredientIndex.from_id_sets(_load_id_sets(data_dir, "word", lo, hi))
+        self.categories = IngredientIndex.from_id_sets(
+            _load_id_sets(data_dir, "category", lo, hi)
+        )
+        self._pending: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self._excluded: Dict[tuple, np.ndarray] = {}
+
+    def _excluded_mask(self, groups: TokenGroups) -> np.ndarray:
+        key = tuple(groups)
+        mask = self._excluded.get(key)
+        if mask is None:
+            if len(self._excluded) >= 64:
+                self._excluded.clear()
+            mask = self._excluded[key] = mask_from_index(self.index, groups,
+                                                         len(self.embeddings))
+        return mask
+
+    def score(self, queries: Sequence[ShardQuery]) -> List[ShardStats]:
+        self._pending = []
+        stats: List[ShardStats] = []
+        for words, weights, emb, category, excluded in queries:
+            mask = self._excluded_mask(excluded) if excluded else None
+            if category:
+                cand = self.categories.get(category)
+                if mask is not None:
+                    cand = cand[~mask[cand]]
+                cos = self.embeddings[cand] @ emb
+            elif mask is not None:
+                cand = np.flatnonzero(~mask).astype(np.int32)
+                cos = self.embeddings[cand] @ emb
+            else:
+                cand = np.arange(len(self.embeddings), dtype=np.int32)
+                cos = self.embeddings @ emb  # no gather copy for a full scan
+
+            if words and len(cand):
+                total = (float(len(words)) if weights is None
+                         else float(sum(weights.get(w, 1.0) for w in words)))
+                overlap = self.index.match_counts(words, weights)[cand] / total
+            else:
+                overlap = np.zeros(len(cand))
+
+            self._pending.append((cand, overlap, cos))
+            stats.append((float(overlap.min()), float(overlap.max()),
+                          float(cos.min()), float(cos.max())) if len(cand) else None)
+        return stats
+
+    def rank(self, stats: Sequence[ShardStats], top_k: int
+             ) -> List[List[Tuple[float, int, float, float]]]:
+        results = []
+        for (cand, overlap, cos), s in zip(self._pending, stats):
+            k = min(top_k, len(cand))
+            if s is None or k <= 0:
+                results.append([])
+                continue
+            final = (self.alpha * _scaled(overlap, s[0], s[1])
+                     + self.beta * _scaled(cos, s[2], s[3]))
+            top = np.argpartition(-final, k - 1)[:k]
+            results.append([
+                (float(final[j]), int(cand[j]) + self.lo, float(overlap[j]), float(cos[j]))
+                for j in top
+            ])
+        self._pending = []
+        return results
+
+
+def _scaled(x: np.ndarray, lo: float, hi: float) -> np.ndarray:
+    # Same as recommender._min_max_norm, with global min/max
+    if np.allclose(hi, lo):
+        return np.zeros_like(x)
+    return (x - lo) / (hi - lo)
+
+
+def _shard_main(conn, data_dir: str, lo: int, hi: int, alpha: float, beta: float):
+    try:
+        shard = _Shard(data_dir, lo, hi, alpha, beta)
+    except Exception as e:
+        conn.send(("error", repr(e)))
+        return
+    conn.send(("ok", hi - lo))
+    while True:
+        msg = conn.recv()
+        if msg is None:
+            break
+        op, args = msg
+        try:
+            conn.send(("ok", getattr(shard, op)(*args)))
+        except Exception as e:
+            conn.send(("error", repr(e)))
+    conn.close()
+
+
+# -------------------------
+# Coordinator side
+# -------------------------
+class ShardError(Exception):
+    pass
+
+
+class ShardedRecommender:
+    """
+    Coordinator for `n_shards` worker processes over one catalog snapshot.
+    Queries are serialized (one in flight); recommend_many() sends a whole
+    batch per round to amortize the IPC.
+    """
+
+    def __init__(self, catalog, n_shards: int):
+        from ..config import ALPHA_INGREDIENT, BETA_EMBEDDING
+
+        self.catalog = catalog
+        self.n_shards = n_shards
+        self._lock = threading.Lock()   # one query round in flight; held by close()
+        self._closed = False
+
+        self._tmp_dir = None
+        data_dir = getattr(catalog, "vdir", None)
+        if data_dir is None or getattr(catalog, "bundle_rows", None) != len(catalog):
+            # In-memory catalog (legacy pickle), or a bundle with ingested
+            # segments whose rows are not in the bundle's files
+            self._tmp_dir = data_dir = tempfile.mkdtemp(prefix="appetite_shards_")
+            export_shared_arrays(catalog, data_dir)
+
+        ctx = mp.get_context("spawn")
+        self._conns = []
+        self._procs = []
+        for lo, hi in shard_bounds(len(catalog), n_shards):
+            parent, child = ctx.Pipe()
+            proc = ctx.Process(
+                target=_shard_main,
+                args=(child, data_dir, lo, hi, ALPHA_INGREDIENT, BETA_EMBEDDING),
+                name=f"recommender-shard-{lo}-{hi}",
+                daemon=True,
+            )
+            proc.start()
+            self._conns.append(parent)
+            self._procs.append(proc)
+        try:
+            self._gather()  # wait until every shard has loaded
+        except ShardError:
+            self.close()
+            raise
+
+    def _gather(self) -> List[Any]:
+        # Every shard answers before an error is raised, so no reply is left
+        # in a pipe to be read as the answer to the next round
+        out, errors = [], []
+        for conn in self._conns:
+            try:
+                status, value = conn.recv()
+            except (EOFError, OSError) as e:  # the worker died
+                status, value = "error", repr(e)
+            if status != "ok":
+                errors.append(value)
+            out.append(value)
+        if errors:
+            raise ShardError("; ".join(errors))
+        return out
+
+    def _broadcast(self, op: str, per_shard_args: List[tuple]) -> List[Any]:
+        for conn, args in zip(self._conns, per_shard_args):
+            conn.send((op, args))
+        return self._gather()
+
+    def recommend_many(self, pantries: List[str], top_k: int = 5,
+                       category: Optional[str] = None,
+                       embed_mode: Optional[str] = None,
+                       weights: Optional[List[Optional[Dict[str, float]]]] = None,
+                       exclude: Optional[Sequence[str]] = None,
+                       mmr_lambda: Optional[float] = None
+                       ) -> List[List[Dict[str, Any]]]:
+        from ..config import MMR_POOL_SIZE, PANTRY_EMBED_MODE
+        from ..deps import get_pantry_embedding_cache
+        from .recommender import _format_result, _normalize_text
+
+        if not pantries:
+            return []
+        category = category.strip().lower() if category and category.strip() else None
+
+        embs = get_pantry_embedding_cache().encode_pantries(
+            pantries, mode=embed_mode or PANTRY_EMBED_MODE
+        )
+        norms = np.linalg.norm(embs, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        embs = (embs / norms).astype(np.float32)
+
+        excluded = resolve(self.catalog, normalize_terms(exclude))
+        queries = [
+            (sorted(self.catalog.query_words(_normalize_text(p))),
+             weights[i] if weights is not None else None,
+             embs[i], category, excluded)
+            for i, p in enumerate(pantries)
+        ]
+
+        pool = top_k if mmr_lambda is None else max(top_k, MMR_POOL_SIZE)
+        shard_tops = None
+        with self._lock:
+            if not self._closed:
+                shard_stats = self._broadcast("score", [(queries,)] * self.n_shards)
+                merged = [_merge_stats(s[q] for s in shard_stats)
+                          for q in range(len(queries))]
+                shard_tops = self._broadcast("rank", [(merged, pool)] * self.n_shards)
+        if shard_tops is None:
+            # Replaced after a catalog swap between get_shard_pool() and here
+            return get_shard_pool(self.n_shards).recommend_many(
+                pantries, top_k, category, embed_mode, weights, exclude, mmr_lambda
+            )
+
+        results = []
+        for q in range(len(queries)):
+            # Each shard's list is unsorted; the heap picks the global top_k
+            best = heapq.nlargest(pool, (t for tops in shard_tops for t in tops[q]),
+                                  key=lambda t: (t[0], -t[1]))
+            if mmr_lambda is not None and best:
+                emb = self.catalog.normalized_embeddings[[t[1] for t in best]]
+                best = [best[j] for j in mmr(np.array([t[0] for t in best]), emb,
+                                             top_k, mmr_lambda)]
+            results.append([
+                _format_result(self.catalog, rid, final, overlap, cos)
+                for final, rid, overlap, cos in best
+            ])
+        return results
+
+    def recommend(self, pantry_ingredients: str, top_k: int = 5,
+                  category: Optional[str] = None, embed_mode: Optional[str] = None,
+                  weights: Optional[Dict[str, float]] = None,
+                  exclude: Optional[Sequence[str]] = None,
+                  mmr_lambda: Optional[float] = None) -> List[Dict[str, Any]]:
+        return self.recommend_many([pantry_ingredients], top_k, category, embed_mode,
+                                   [weights], exclude, mmr_lambda)[0]
+
+    def close(self):
+        """Stop the workers once the query round in flight (if any) is done."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._shutdown()
+
+    def _shutdown(self):
+        for conn in self._conns:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self._procs:
+            proc.join(timeout=5)
+        if self._tmp_dir:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+
+def _merge_stats(stats) -> ShardStats:
+    stats = [s for s in stats if s is not None]
+    if not stats:
+        return None
+    return (min(s[0] for s in stats), max(s[1] for s in stats),
+            min(s[2] for s in stats), max(s[3] for s in stats))
+
+
+# -------------------------
+# Process-wide pool
+# -------------------------
+_pool: Optional[ShardedRecommender] = None
+_pool_lock = threading.Lock()
+
+
+def get_shard_pool(n_shards: int) -> ShardedRecommender:
+    """The shard pool for the active catalog; restarted after a catalog swap."""
+    global _pool
+    from ..deps import get_catalog
+
+    catalog = get_catalog()
+    with _pool_lock:
+        if _pool is None or _pool.catalog is not catalog or _pool.n_shards != n_shards:
+            old, _pool = _pool, ShardedRecommender(catalog, n_shards)
+            if old is not None:
+                old.close()
+        return _pool
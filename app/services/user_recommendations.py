@@ -0,0 +1,270 @@
+# app/services/user_recommendations.py
+"""
+Per-user materialized recommendation state.
+
+For every active user we keep:
+  - items:          (name, weight) counts of the pantry, in the user's order
+  - word_weights:   pantry word -> weights of the pantry items containing it
+                    (the word's weight is the largest, see pantry_weights.py)
+  - exclude:        the user's stored exclusions (exclusions.py), applied
+                    to every ranking on top of per-request ones
+  - ranked:         (category, request exclusions, MMR lambda) -> ranked
+                    result list, the USER_RANKED_CACHE_SIZE most recent
+
+Rankings come from recommender.recommend_recipes with the pantry's word
+weights, so a user's results are scored exactly like any other query
+(candidate pool, reduced scan, shards). Pantry changes (create_pantry_item
+/ delete_pantry_item / consume_ingredients) call on_item_added /
+on_item_removed, which update the weights, drop the ranked lists and
+schedule a background re-rank. Reads are a dict lookup when nothing
+changed. Expiry weights depend on the date, so a state is rebuilt once per
+day.
+
+Every change also bumps the user's row in user_state_versions in the same
+transaction. States remember the version they reflect, and a read that
+finds a newer one (another API worker changed the pantry or exclusions)
+rebuilds from the DB. The store lock only guards the user -> state map;
+building, updating and ranking a state hold that state's own lock, so
+requests for different users run concurrently.
+"""
+from __future__ import annotations
+
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..config import MMR_LAMBDA_STEP, USER_RANKED_CACHE_SIZE, USER_REC_CACHE_SIZE
+from ..deps import get_catalog
+from .exclusions import get_user_exclusions, normalize_terms
+from .pantry_weights import item_weight
+from .recommender import recommend_recipes
+
+# (name, expiry_date, quantity) of one pantry item
+ItemRow = Tuple[str, Optional[date], Optional[float]]
+# (category or None, normalized request exclusions, diversity_key() or None)
+RankKey = Tuple[Optional[str], Tuple[str, ...], Optional[float]]
+
+
+def state_version(db: Session, user_id: int) -> int:
+    version = (
+        db.query(models.UserStateVersion.version)
+        .filter(models.UserStateVersion.user_id == user_id)
+        .scalar()
+    )
+    return version or 0
+
+
+def bump_state_version(db: Session, user_id: int) -> int:
+    """Increment the user's state version; commit it with the change."""
+    updated = (
+        db.query(models.UserStateVersion)
+        .filter(models.UserStateVersion.user_id == user_id)
+        .update({models.UserStateVersion.version: models.UserStateVersion.version + 1},
+                synchronize_session=False)
+    )
+    if not updated:
+        db.add(models.UserStateVersion(user_id=user_id, version=1))
+        db.flush()
+    return state_version(db, user_id)
+
+
+def diversity_key(diversity: Optional[float]) -> Optional[float]:
+    """MMR lambda clamped to [0, 1] and rounded to MMR_LAMBDA_STEP."""
+    if diversity is None:
+        return None
+    steps = round(min(max(diversity, 0.0), 1.0) / MMR_LAMBDA_STEP)
+    return round(steps * MMR_LAMBDA_STEP, 6)
+
+
+class UserRecState:
+    def __init__(self, items: Iterable[ItemRow], exclude: Iterable[str] = (),
+                 db_version: int = 0):
+        # State is tied to one catalog snapshot (ids and word scheme), to one
+        # day (expiry weights) and to one user_state_versions value
+        self.catalog = get_catalog()
+        self.today = date.today()
+        self.db_version = db_version
+        self.lock = threading.Lock()
+        self.items: Counter = Counter()
+        self.word_weights: Dict[str, Counter] = defaultdict(Counter)
+        self.exclude = normalize_terms(exclude)
+        self.ranked: "OrderedDict[RankKey, List[Dict[str, Any]]]" = OrderedDict()
+        self.version = 0
+        for name, expiry_date, quantity in items:
+            self.add(name, expiry_date, quantity)
+
+    def is_current(self, db_version: int) -> bool:
+        return (self.catalog is get_catalog() and self.today == date.today()
+                and self.db_version == db_version)
+
+    def weights(self) -> Dict[str, float]:
+        """Pantry word -> its largest item weight (recommend_recipes weights)."""
+        return {w: max(weights) for w, weights in self.word_weights.items()}
+
+    def pantry(self) -> str:
+        """The pantry as a query string, names in the order they were added."""
+        return ", ".join(dict.fromkeys(name for name, _ in self.items))
+
+    def _apply(self, words, weight: float, delta: int):
+        for w in words:
+            self.word_weights[w][weight] += delta
+            if self.word_weights[w][weight] <= 0:
+                del self.word_weights[w][weight]
+            if not self.word_weights[w]:
+                del self.word_weights[w]
+
+    def add(self, name: str, expiry_date: Optional[date] = None,
+            quantity: Optional[float] = None):
+        name = (name or "").strip().lower()
+        if not name:
+            return
+        weight = item_weight(expiry_date, quantity, self.today)
+        self.items[name, weight] += 1
+        self._apply(self.catalog.query_words(name), weight, +1)
+        self._invalidate()
+
+    def remove(self, name: str, expiry_date: Optional[date] = None,
+               quantity: Optional[float] = None):
+        name = (name or "").strip().lower()
+        weight = item_weight(expiry_date, quantity, self.today)
+        if self.items.get((name, weight), 0) <= 0:
+            return
+        self.items[name, weight] -= 1
+        if not self.items[name, weight]:
+            del self.items[name, weight]
+        self._apply(self.catalog.query_words(name), weight, -1)
+        self._invalidate()
+
+    def _invalidate(self):
+        self.ranked = OrderedDict()
+        self.version += 1
+
+    def remember(self, key: RankKey, ranked: List[Dict[str, Any]]):
+        self.ranked[key] = ranked
+        self.ranked.move_to_end(key)
+        while len(self.ranked) > USER_RANKED_CACHE_SIZE:
+            self.ranked.popitem(last=False)
+
+    def rank(self, category: Optional[str], top_k: int,
+             exclude: Tuple[str, ...] = (),
+             diversity: Optional[float] = None) -> List[Dict[str, Any]]:
+        if not self.items:
+            return []
+        return recommend_recipes(self.pantry(), top_k, category, weights=self.weights(),
+                                 exclude=self.exclude + exclude, diversity=diversity)
+
+
+class UserRecStore:
+    def __init__(self, max_users: int = 1024):
+        self.max_users = max_users
+        self._states: "OrderedDict[int, UserRecState]" = OrderedDict()
+        self._lock = threading.Lock()   # guards _states only
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def _cached(self, user_id: int, db_version: int) -> Optional[UserRecState]:
+        with self._lock:
+            state = self._states.get(user_id)
+            if state is None or not state.is_current(db_version):
+                return None
+            self._states.move_to_end(user_id)
+            return state
+
+    def _load(self, db: Session, user_id: int) -> UserRecState:
+        # Version first: a change committed after this read makes the state
+        # look stale on the next request, never the other way round
+        db_version = state_version(db, user_id)
+        state = self._cached(user_id, db_version)
+        if state is not None:
+            return state
+
+        rows = (
+            db.query(models.PantryItem.name, models.PantryItem.expiry_date,
+                     models.PantryItem.quantity)
+            .filter(models.PantryItem.user_id == user_id)
+            .all()
+        )
+        state = UserRecState((tuple(row) for row in rows),
+                             get_user_exclusions(db, user_id), db_version)
+        with self._lock:
+            current = self._states.get(user_id)
+            if current is not None and current.is_current(db_version):
+                return current  # built by a concurrent request meanwhile
+            self._states[user_id] = state
+            self._states.move_to_end(user_id)
+            while len(self._states) > self.max_users:
+                self._states.popitem(last=False)
+        return state
+
+    def get(self, db: Session, user_id: int, category: Optional[str] = None,
+            top_k: int = 5, exclude: Optional[Iterable[str]] = None,
+            diversity: Optional[float] = None) -> List[Dict[str, Any]]:
+        key = (category.strip().lower() if category and category.strip() else None,
+               normalize_terms(exclude), diversity_key(diversity))
+        state = self._load(db, user_id)
+        with state.lock:
+            cached = state.ranked.get(key)
+            if cached is None or len(cached) < top_k:
+                cached = state.rank(key[0], top_k, key[1], key[2])
+            state.remember(key, cached)
+            return cached[:top_k]
+
+    def user_exclusions(self, db: Session, user_id: int) -> Tuple[str, ...]:
+        """The user's stored exclusions (as cached with their state)."""
+        return self._load(db, user_id).exclude
+
+    def on_item_added(self, user_id: int, item: models.PantryItem, db_version: int):
+        self._update(user_id, [(item.name, item.expiry_date, item.quantity)], [], db_version)
+
+    def on_item_removed(self, user_id: int, item: ItemRow, db_version: int):
+        self._update(user_id, [], [item], db_version)
+
+    def on_items_removed(self, user_id: int, items: List[ItemRow], db_version: int):
+        self._update(user_id, [], items, db_version)
+
+    def _update(self, user_id: int, added: List[ItemRow], removed: List[ItemRow],
+                db_version: int):
+        """Apply a change committed as `db_version` (one bump per change)."""
+        with self._lock:
+            state = self._states.get(user_id)
+        if state is None:
+            return  # built lazily from the DB on next read
+        with state.lock:
+            if state.db_version != db_version - 1:
+                # Another worker changed this user in between: rebuild on read
+                self._forget(user_id, state)
+                return
+            for item in added:
+                state.add(*item)
+            for item in removed:
+                state.remove(*item)
+            state.db_version = db_version
+            version = state.version
+        self._executor.submit(self._refresh, state, version)
+
+    def _refresh(self, state: UserRecState, version: int, top_k: int = 5):
+        with state.lock:
+            if state.version != version or (None, (), None) in state.ranked:
+                return
+            state.remember((None, (), None), state.rank(None, top_k))
+
+    def _forget(self, user_id: int, state: UserRecState):
+        with self._lock:
+            if self._states.get(user_id) is state:
+                del self._states[user_id]
+
+    def drop(self, user_id: int):
+        """Forget a user's state (rebuilt from the DB on next read)."""
+        with self._lock:
+            self._states.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+
+
+store = UserRecStore(max_users=USER_REC_CACHE_SIZE)
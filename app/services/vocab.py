@@ -0,0 +1,165 @@
+# app/services/vocab.py
+"""
+Integer-coded token sets.
+
+Vocabulary interns words (or categories) to dense int ids. IdSets stores one
+sorted id set per recipe as a slice of a single int32 buffer (CSR: indptr +
+ids), instead of one Python set of str per row. Built incrementally into
+array("i") buffers and exposed as NumPy views without copying, so the same
+layout can be written to / memory-mapped from .npy files (columnar.py).
+"""
+from __future__ import annotations
+
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+_EMPTY = np.zeros(0, dtype=np.int32)
+
+
+class Vocabulary:
+    def __init__(self, tokens: Iterable[str] = ()):
+        self.tokens: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for t in tokens:
+            self.intern(t)
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self._ids
+
+    def intern(self, token: str) -> int:
+        i = self._ids.get(token)
+        if i is None:
+            i = self._ids[token] = len(self.tokens)
+            self.tokens.append(token)
+        return i
+
+    def get(self, token: str, default: int = -1) -> int:
+        return self._ids.get(token, default)
+
+    def encode(self, tokens: Iterable[str], add: bool = False) -> np.ndarray:
+        """Sorted unique ids of `tokens`; unknown tokens are dropped unless `add`."""
+        if add:
+            ids = {self.intern(t) for t in tokens}
+        else:
+            ids = {self._ids[t] for t in tokens if t in self._ids}
+        return np.array(sorted(ids), dtype=np.int32)
+
+    def decode(self, ids: Iterable[int]) -> List[str]:
+        return [self.tokens[i] for i in ids]
+
+    def copy(self) -> "Vocabulary":
+        other = Vocabulary()
+        other.tokens = list(self.tokens)
+        other._ids = dict(self._ids)
+        return other
+
+
+class IdSets:
+    """
+    Row r is ids[indptr[r]:indptr[r + 1]], sorted and unique. Rows are
+    read-only views; extended() returns a new IdSets.
+    """
+
+    def __init__(self, indptr: np.ndarray, ids: np.ndarray, vocab: Vocabulary):
+        self.indptr = indptr
+        self.ids = ids
+        self.vocab = vocab
+
+    @classmethod
+    def from_token_sets(cls, rows: Iterable[Iterable[str]],
+                        vocab: Optional[Vocabulary] = None) -> "IdSets":
+        """Intern every token of every row (into `vocab`, or a new one)."""
+        vocab = vocab if vocab is not None else Vocabulary()
+        indptr = array("i", [0])
+        ids = array("i")
+        for tokens in rows:
+            ids.extend(sorted({vocab.intern(t) for t in tokens}))
+            indptr.append(len(ids))
+        return cls(
+            np.frombuffer(indptr, dtype=np.int32),
+            np.frombuffer(ids, dtype=np.int32) if len(ids) else _EMPTY,
+            vocab,
+        )
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def __getitem__(self, r: int) -> np.ndarray:
+        return self.ids[self.indptr[r]:self.indptr[r + 1]]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for r in range(len(self)):
+            yield self[r]
+
+    @property
+    def nbytes(self) -> int:
+        return self.indptr.nbytes + self.ids.nbytes
+
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def tokens(self, r: int) -> List[str]:
+        return self.vocab.decode(self[r])
+
+    # -------------------------
+    # Set operations (query ids: sorted unique int32, see Vocabulary.encode)
+    # -------------------------
+    def contains(self, r: int, token_id: int) -> bool:
+        row = self[r]
+        i = np.searchsorted(row, token_id)
+        return bool(i < len(row) and row[i] == token_id)
+
+    def intersection(self, r: int, query: np.ndarray) -> np.ndarray:
+        return np.intersect1d(self[r], query, assume_unique=True)
+
+    def union(self, r: int, query: np.ndarray) -> np.ndarray:
+        return np.union1d(self[r], query)
+
+    def difference(self, r: int, query: np.ndarray) -> np.ndarray:
+        return np.setdiff1d(self[r], query, assume_unique=True)
+
+    def overlap_counts(self, query: np.ndarray) -> np.ndarray:
+        """|row ∩ query| for every row at once."""
+        if not len(query) or not len(self.ids):
+            return np.zeros(len(self), dtype=np.int32)
+        hits = np.concatenate([[0], np.cumsum(np.isin(self.ids, query))])
+        return (hits[self.indptr[1:]] - hits[self.indptr[:-1]]).astype(np.int32)
+
+    # -------------------------
+    # Derived layouts
+    # -------------------------
+    def transpose(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (indptr, rows) of the token -> rows CSR, indexed by token id. Rows
+        are ascending within every token.
+        """
+        rows = np.repeat(np.arange(len(self), dtype=np.int32), self.lengths())
+        # Stable sort keeps row ids ascending inside each token
+        order = np.argsort(self.ids, kind="stable")
+        indptr = np.searchsorted(self.ids[order], np.arange(len(self.vocab) + 1))
+        return indptr, rows[order]
+
+    def subset(self, rows: np.ndarray) -> "IdSets":
+        """Rows `rows` (in that order) as a new IdSets sharing the vocab."""
+        rows = np.asarray(rows)
+        lengths = self.lengths()[rows]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int32)
+        np.cumsum(lengths, out=indptr[1:])
+        src = np.repeat(np.asarray(self.indptr)[rows] - indptr[:-1], lengths) \
+            + np.arange(indptr[-1])
+        return IdSets(indptr, np.asarray(self.ids)[src].astype(np.int32), self.vocab)
+
+    def extended(self, rows: Iterable[Iterable[str]]) -> "IdSets":
+        """New IdSets with `rows` appended; new tokens go into a copied vocab."""
+        vocab = self.vocab.copy()
+        tail = IdSets.from_token_sets(rows, vocab)
+        return IdSets(
+            np.concatenate([self.indptr, tail.indptr[1:] + self.indptr[-1]]).astype(np.int32),
+            np.concatenate([self.ids, tail.ids]).astype(np.int32),
+            vocab,
+        )
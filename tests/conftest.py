@@ -0,0 +1,87 @@
+"""
+A small synthetic catalog installed as the active one, and a deterministic
+stand-in for the query encoder, so the services run without the shipped
+artifacts. `db` is an in-memory SQLite session with one user.
+"""
+import random
+import zlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import deps, models
+from app.database import Base
+from app.services.catalog import RecipeCatalog
+from app.services.catalog_ingest import build_segment_frame
+
+INGREDIENTS = [
+    "onion", "red onion", "garlic", "chicken breast", "chicken thighs", "ground beef",
+    "shrimp", "sea bass", "eggs", "milk", "heavy cream", "cheddar cheese",
+    "parmesan", "peanut butter", "peanuts", "almonds", "soy sauce", "rice",
+    "spaghetti", "tomatoes", "tomato paste", "bell pepper", "red bell pepper",
+    "carrots", "potatoes", "spinach", "basil", "cilantro", "lime", "lemon",
+    "ginger", "honey", "salt", "black pepper", "olive oil", "sugar", "flour",
+    "butter", "water", "walnuts",
+]
+
+
+def make_raw(n: int, seed: int = 7) -> pd.DataFrame:
+    rng = random.Random(seed)
+    return pd.DataFrame({
+        "Title": [f"Recipe {i}" for i in range(n)],
+        "ingredients_text": [", ".join(rng.sample(INGREDIENTS, rng.randint(2, 8)))
+                             for _ in range(n)],
+        "target_text": ["Mix everything. Cook until done."] * n,
+    })
+
+
+def make_catalog(n: int = 300, dim: int = 16, seed: int = 7) -> RecipeCatalog:
+    df = build_segment_frame(make_raw(n, seed))
+    emb = np.random.default_rng(seed).normal(size=(len(df), dim)).astype(np.float32)
+    info = {"embedding_model": "test-encoder", "word_scheme": "parsed-v1",
+            "total_recipes": len(df)}
+    return RecipeCatalog(df, emb, info, version="test")
+
+
+class HashEncoder:
+    """Same text -> same vector; unrelated texts are near-orthogonal."""
+
+    def __init__(self, dim: int = 16):
+        self.dim = dim
+
+    def encode(self, texts, **kwargs):
+        return np.vstack([
+            np.random.default_rng(zlib.crc32(t.encode())).normal(size=self.dim)
+            for t in texts
+        ]).astype(np.float32)
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    from app.services.user_recommendations import store
+
+    catalog = make_catalog()
+    monkeypatch.setattr(deps, "_catalog", catalog)
+    monkeypatch.setattr(deps, "_query_encoder", lambda name: HashEncoder())
+    deps.get_pantry_embedding_cache.cache_clear()
+    store.clear()
+    yield catalog
+    deps.get_pantry_embedding_cache.cache_clear()
+    store.clear()
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False},
+                           poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(models.User(id=1, username="cook", password_hash="x"))
+    session.commit()
+    yield session
+    session.close()
@@ -0,0 +1,52 @@
+import threading
+
+import numpy as np
+
+from app.services.batching_encoder import BatchingEncoder
+
+from .conftest import HashEncoder
+
+
+class RecordingEncoder(HashEncoder):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def encode(self, texts, **kwargs):
+        self.calls.append((texts, kwargs))
+        return super().encode([texts] if isinstance(texts, str) else texts)
+
+
+def test_keyword_options_reach_the_model():
+    model = RecordingEncoder()
+    encoder = BatchingEncoder(model, max_batch=8)
+    encoder.encode(["eggs"], show_progress_bar=True, batch_size=4)
+    assert model.calls == [(["eggs"], {"show_progress_bar": True, "batch_size": 4})]
+    assert encoder.stats["bypassed"] == 1
+
+
+def test_concurrent_calls_match_direct_encoding():
+    model = RecordingEncoder()
+    encoder = BatchingEncoder(model, max_batch=16, max_wait=0.01)
+    texts = [f"Ingredients: pantry {i}" for i in range(64)]
+    results = {}
+
+    def client(i):
+        results[i] = encoder.encode([texts[i], texts[(i + 1) % 64]])
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(64)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    direct = HashEncoder()
+    for i, out in results.items():
+        np.testing.assert_array_equal(out, direct.encode([texts[i], texts[(i + 1) % 64]]))
+    assert encoder.stats["batches"] < 64
+    assert all(not kwargs for _, kwargs in model.calls)
+
+
+def test_single_string():
+    encoder = BatchingEncoder(HashEncoder(), max_batch=8)
+    np.testing.assert_array_equal(encoder.encode("eggs"), HashEncoder().encode(["eggs"])[0])
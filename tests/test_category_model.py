@@ -0,0 +1,71 @@
+"""The exported category classifier (category_model.py) against scikit-learn."""
+import os
+
+import numpy as np
+import pytest
+
+from app.config import CATEGORY_CLASSIFIER_PATH, CATEGORY_MODEL_DIR, CATEGORY_VECTORIZER_PATH
+from app.jobs.export_category_model import TEST_CSV, _sha256, check
+from app.services.category_model import CategoryModel
+
+from .conftest import make_raw
+
+sklearn = pytest.importorskip("sklearn")
+
+ODD_TEXTS = ["", "zzzunknownzzz", "salt salt salt salt", "Ñoquis, crème fraîche, jalapeño"]
+
+
+def texts(n=300):
+    if os.path.isfile(TEST_CSV):
+        import pandas as pd
+
+        df = pd.read_csv(TEST_CSV, usecols=["ingredients_text"]).dropna()
+        return df["ingredients_text"].str.lower().head(n).tolist() + ODD_TEXTS
+    return make_raw(n, seed=5)["ingredients_text"].str.lower().tolist() + ODD_TEXTS
+
+
+def fitted():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    raw = make_raw(400, seed=1)
+    labels = np.array(["dessert", "main", "side", "snack"])[np.arange(len(raw)) % 4]
+    vectorizer = TfidfVectorizer()
+    model = LogisticRegression(max_iter=500).fit(
+        vectorizer.fit_transform(raw["ingredients_text"]), labels)
+    return vectorizer, model
+
+
+def test_export_matches_sklearn(tmp_path):
+    vectorizer, model = fitted()
+    exported = CategoryModel.from_sklearn(vectorizer, model)
+    assert check(exported, vectorizer, model, texts()) <= 1e-4
+
+    exported.save(str(tmp_path))
+    loaded = CategoryModel.load(str(tmp_path))
+    assert check(loaded, vectorizer, model, texts()) <= 1e-4
+
+
+def test_rejects_unsupported_vectorizer():
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer, model = fitted()
+    bigrams = TfidfVectorizer(ngram_range=(1, 2)).fit(["eggs milk", "flour sugar"])
+    with pytest.raises(ValueError):
+        CategoryModel.from_sklearn(bigrams, model)
+
+
+@pytest.mark.skipif(not (os.path.isfile(CATEGORY_CLASSIFIER_PATH)
+                         and os.path.isfile(CATEGORY_VECTORIZER_PATH)),
+                    reason="category classifier pickles not present")
+def test_shipped_arrays_match_shipped_pickles():
+    import joblib
+
+    exported = CategoryModel.load(CATEGORY_MODEL_DIR)
+    assert exported is not None, "run python -m app.jobs.export_category_model"
+    assert exported.info["classifier_sha256"] == _sha256(CATEGORY_CLASSIFIER_PATH)
+    assert exported.info["vectorizer_sha256"] == _sha256(CATEGORY_VECTORIZER_PATH)
+
+    vectorizer = joblib.load(CATEGORY_VECTORIZER_PATH)
+    model = joblib.load(CATEGORY_CLASSIFIER_PATH)
+    assert check(exported, vectorizer, model, texts(2000)) <= 1e-4
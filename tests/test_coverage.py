@@ -0,0 +1,68 @@
+"""Cook-now coverage against a brute-force set computation."""
+import random
+
+import numpy as np
+import pytest
+
+from app.config import COOK_NOW_STAPLES
+from app.services import recommender
+from app.services.ingredient_parser import canonical_names
+
+from .conftest import INGREDIENTS
+
+
+def brute_force(catalog, pantry_names, max_missing):
+    pantry = set(pantry_names)
+    staples = set(COOK_NOW_STAPLES)
+    out = {}
+    for rid, text in enumerate(catalog.column("ingredients_text")):
+        needed = [n for n in canonical_names(text.lower()) if n not in staples]
+        owned = [n for n in needed if n in pantry or n.rsplit(" ", 1)[-1] in pantry]
+        missing = [n for n in needed if n not in owned]
+        if len(missing) <= max_missing:
+            out[rid] = (len(missing), len(owned), missing)
+    return out
+
+
+def pantries(n=100, seed=3):
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield canonical_names(", ".join(rng.sample(INGREDIENTS, rng.randint(0, 12))))
+
+
+@pytest.mark.parametrize("max_missing", [0, 2, 4])
+def test_query_matches_brute_force(catalog, max_missing):
+    coverage = catalog.coverage()
+    for names in pantries():
+        ids, missing, covered = coverage.query(names, max_missing)
+        expected = brute_force(catalog, names, max_missing)
+        assert ids.tolist() == sorted(expected)
+        assert missing.tolist() == [expected[r][0] for r in ids]
+        assert covered.tolist() == [expected[r][1] for r in ids]
+        for r in ids[:10]:
+            assert sorted(coverage.missing_names(int(r), names)) == sorted(expected[r][2])
+
+
+def test_query_respects_allowed_and_excluded(catalog):
+    coverage = catalog.coverage()
+    rng = np.random.default_rng(0)
+    allowed = np.sort(rng.choice(len(catalog), 100, replace=False)).astype(np.int32)
+    excluded = rng.random(len(catalog)) < 0.3
+    for names in pantries(20):
+        full, _, _ = coverage.query(names, 3)
+        ids, _, _ = coverage.query(names, 3, allowed=allowed)
+        assert ids.tolist() == [r for r in full if r in set(allowed.tolist())]
+        ids, _, _ = coverage.query(names, 3, excluded=excluded)
+        assert ids.tolist() == [r for r in full if not excluded[r]]
+
+
+def test_cook_now_orders_fewest_missing_first(catalog):
+    pantry = "onion, garlic, chicken breast, rice, eggs, milk, tomatoes, spinach"
+    names = canonical_names(pantry)
+    expected = brute_force(catalog, names, 2)
+    results = recommender.cook_now(pantry, max_missing=2, top_k=len(catalog))
+    assert sorted(r["id"] for r in results) == sorted(expected)
+    keys = [(r["missing_count"], -r["covered_count"], r["id"]) for r in results]
+    assert keys == sorted(keys)
+    for r in results:
+        assert sorted(r["missing"]) == sorted(expected[r["id"]][2])
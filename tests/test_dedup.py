@@ -0,0 +1,115 @@
+"""Near-duplicate collapsing (dedup.py) and serving its aliases."""
+import numpy as np
+import pandas as pd
+
+from app import deps
+from app.config import (
+    DEDUP_BANDS,
+    DEDUP_INGREDIENT_THRESHOLD,
+    DEDUP_NUM_PERM,
+    DEDUP_TITLE_THRESHOLD,
+)
+from app.services import artifacts, recommender
+from app.services.catalog import RecipeCatalog
+from app.services.catalog_ingest import build_segment_frame
+from app.services.dedup import dedup_catalog, pair_jaccard, read_aliases, write_aliases
+
+from .conftest import make_raw
+
+STEW = "beef chuck, carrots, potatoes, onion, garlic, tomato paste, beef stock, thyme"
+DUPES = pd.DataFrame({
+    "Title": ["Classic Beef Stew", "Classic Beef Stew", "Beef Stew (Classic)",
+              "Beef Bourguignon", "Lemon Bars", "Lemon Bars!"],
+    "ingredients_text": [STEW, STEW, STEW.replace("thyme", "fresh thyme"), STEW,
+                         "flour, butter, sugar, lemons, eggs, powdered sugar",
+                         "flour, butter, sugar, lemons, eggs, powdered sugar"],
+    "target_text": ["Cook."] * 6,
+})
+
+# Exact ingredient Jaccard 7/9 (just under the threshold); the MinHash
+# signatures of the pair agree on more than 80% of their rows
+HUMMUS = "lemon juice, pine nuts, cumin, sesame seeds, chickpeas, parsley, paprika"
+NEAR = pd.DataFrame({
+    "Title": ["Hummus Bowl", "Hummus Bowl"],
+    "ingredients_text": [HUMMUS + ", garlic", HUMMUS + ", tahini"],
+    "target_text": ["Blend."] * 2,
+})
+
+
+def make_catalog(*extra):
+    raw = pd.concat([make_raw(40, seed=11), DUPES, *extra], ignore_index=True)
+    df = build_segment_frame(raw)
+    emb = np.random.default_rng(0).normal(size=(len(df), 8)).astype(np.float32)
+    return RecipeCatalog(df, emb, {"embedding_model": "test-encoder",
+                                   "word_scheme": "parsed-v1", "total_recipes": len(df)})
+
+
+def dedup(catalog, aliases=None):
+    return dedup_catalog(catalog, DEDUP_NUM_PERM, DEDUP_BANDS,
+                         DEDUP_INGREDIENT_THRESHOLD, DEDUP_TITLE_THRESHOLD, aliases)
+
+
+def test_collapses_near_duplicates_only():
+    catalog = make_catalog()
+    deduped, aliases, report = dedup(catalog)
+    titles = deduped.column("Title")
+
+    assert report["before"] - report["after"] == 3
+    assert titles.count("Classic Beef Stew") == 1
+    assert "Beef Stew (Classic)" not in titles
+    assert "Beef Bourguignon" in titles          # same ingredients, other title
+    assert titles.count("Lemon Bars") == 1 and "Lemon Bars!" not in titles
+
+    stew = titles.index("Classic Beef Stew")
+    assert sorted(aliases[stew]) == ["Beef Stew (Classic)", "Classic Beef Stew"]
+    assert aliases[titles.index("Lemon Bars")] == ["Lemon Bars!"]
+
+
+
+def test_pair_just_under_threshold_stays():
+    catalog = make_catalog(NEAR)
+    n = len(catalog)
+    jaccard = pair_jaccard(catalog.ingredient_sets(), np.array([[n - 2, n - 1]]))[0]
+    assert jaccard == 7 / 9 < DEDUP_INGREDIENT_THRESHOLD
+
+    deduped, _, report = dedup(catalog)
+    assert report["before"] - report["after"] == 3
+    assert deduped.column("Title").count("Hummus Bowl") == 2
+
+def test_kept_rows_stay_aligned():
+    catalog = make_catalog()
+    deduped, _, _ = dedup(catalog)
+    old = catalog.column("Title")
+    old_text = catalog.column("ingredients_text")
+    for new_id, title in enumerate(deduped.column("Title")):
+        old_id = next(i for i, t in enumerate(old)
+                      if t == title and old_text[i] == deduped.record(new_id)["ingredients_text"])
+        np.testing.assert_array_equal(deduped.embeddings[new_id], catalog.embeddings[old_id])
+        assert deduped.words.tokens(new_id) == catalog.words.tokens(old_id)
+
+
+def test_rededup_keeps_earlier_aliases():
+    catalog = make_catalog()
+    deduped, aliases, _ = dedup(catalog)
+    again, again_aliases, report = dedup(deduped, aliases)
+    assert report["before"] == report["after"]
+    assert again_aliases == aliases
+
+
+def test_similar_results_carry_aliases(monkeypatch, tmp_path):
+    deduped, aliases, _ = dedup(make_catalog())
+    write_aliases(str(tmp_path), aliases)
+    assert read_aliases(str(tmp_path)) == aliases
+
+    catalog = RecipeCatalog(deduped.df, deduped.embeddings, deduped.info,
+                            words=deduped.words, categories=deduped.categories,
+                            version="v-dedup")
+    monkeypatch.setattr(deps, "_catalog", catalog)
+    monkeypatch.setattr(artifacts, "artifact_dir", lambda version: str(tmp_path))
+
+    stew = catalog.column("Title").index("Classic Beef Stew")
+    source = catalog.column("Title").index("Beef Bourguignon")
+    results = recommender.similar_recipes(source, top_k=len(catalog) - 1)
+    by_id = {r["id"]: r for r in results}
+    assert sorted(by_id[stew]["aliases"]) == sorted(aliases[stew])
+    assert all(r["aliases"] == aliases.get(r["id"], []) for r in results)
@@ -0,0 +1,96 @@
+"""Excluded recipes never come back, whichever path scores the query."""
+import numpy as np
+import pytest
+
+from app import models
+from app.config import CANDIDATE_POOL_SIZE
+from app.services import exclusions, recommender
+from app.services.ingredient_parser import canonical_names
+from app.services.user_recommendations import state_version, store
+
+PANTRY = "peanut butter, honey, milk, rice, shrimp, garlic, onion, almonds"
+EXCLUDE = ["peanut", "shellfish", "dairy"]
+BANNED = {"peanut", "shrimp", "milk", "cream", "cheese", "butter", "parmesan"}
+
+
+def assert_clean(results):
+    assert results
+    for r in results:
+        words = {w for name in canonical_names(r["ingredients_text"].lower())
+                 for w in name.split(" ")}
+        assert not words & BANNED, (r["title"], r["ingredients_text"])
+
+
+def test_mask_matches_terms(catalog):
+    mask = catalog.exclusion_mask(EXCLUDE)
+    for rid, text in enumerate(catalog.column("ingredients_text")):
+        words = {w for name in canonical_names(text.lower()) for w in name.split(" ")}
+        assert mask[rid] == bool(words & BANNED)
+
+
+@pytest.mark.parametrize("pool", [0, CANDIDATE_POOL_SIZE, 20])
+@pytest.mark.parametrize("diversity", [None, 0.5])
+def test_recommend_recipes(catalog, monkeypatch, pool, diversity):
+    monkeypatch.setattr(recommender, "CANDIDATE_POOL_SIZE", pool)
+    assert_clean(recommender.recommend_recipes(PANTRY, top_k=len(catalog),
+                                               exclude=EXCLUDE, diversity=diversity))
+
+
+def test_recommend_recipes_category(catalog):
+    category = sorted(catalog.indexes()[1].postings)[0]
+    results = recommender.recommend_recipes(PANTRY, top_k=50, category=category,
+                                            exclude=EXCLUDE)
+    assert_clean(results)
+    assert all(category in r["categories"].lower() for r in results)
+
+
+def test_recommend_recipes_batch(catalog):
+    batches = recommender.recommend_recipes_batch([PANTRY, "shrimp, milk", "rice"],
+                                                  top_k=50, exclude=EXCLUDE)
+    for results in batches:
+        assert_clean(results)
+
+
+def test_cook_now(catalog):
+    assert_clean(recommender.cook_now(PANTRY, max_missing=4, top_k=len(catalog),
+                                      exclude=EXCLUDE))
+
+
+def test_sharded(catalog):
+    from app.services.sharding import ShardedRecommender
+
+    pool = ShardedRecommender(catalog, 2)
+    try:
+        results = pool.recommend(PANTRY, top_k=50, exclude=EXCLUDE)
+    finally:
+        pool.close()
+    assert_clean(results)
+
+
+def test_user_state(catalog, db):
+    for name in PANTRY.split(", "):
+        db.add(models.PantryItem(user_id=1, name=name))
+    db.commit()
+    exclusions.set_user_exclusions(db, 1, ["peanut", "dairy"])
+    assert_clean(store.get(db, 1, top_k=50, exclude=["shellfish"]))
+    # Stored exclusions alone
+    results = store.get(db, 1, top_k=50)
+    banned = np.flatnonzero(catalog.exclusion_mask(["peanut", "dairy"]))
+    assert results and not {r["id"] for r in results} & set(banned.tolist())
+
+
+def test_set_exclusions_bumps_state_version(catalog, db):
+    before = state_version(db, 1)
+    exclusions.set_user_exclusions(db, 1, ["egg"])
+    assert state_version(db, 1) == before + 1
+
+
+def test_ranked_lists_are_bounded(catalog, db):
+    from app.config import USER_RANKED_CACHE_SIZE
+
+    db.add(models.PantryItem(user_id=1, name="rice"))
+    db.commit()
+    for term in ["egg", "milk", "rice", "lime", "honey", "basil", "ginger", "garlic",
+                 "onion", "spinach", "carrot", "lemon"]:
+        store.get(db, 1, top_k=5, exclude=[term])
+    assert len(store._load(db, 1).ranked) == USER_RANKED_CACHE_SIZE
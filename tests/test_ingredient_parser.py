@@ -0,0 +1,43 @@
+import pytest
+
+from app.services.ingredient_parser import canonical_names, ingredient_lines, parse_line
+
+
+@pytest.mark.parametrize("line, name", [
+    ("1 1/2 sticks unsalted butter, softened", "butter"),
+    ("2 garlic cloves, finely chopped", "garlic"),
+    ("1 12-ounce container cherry tomatoes", "cherry tomato"),
+    ("Freshly ground black pepper", "black pepper"),
+    ("1/2 teaspoon ground cloves", "clove"),
+    ("3 scallions, thinly sliced", "green onion"),
+])
+def test_parse_line(line, name):
+    assert parse_line(line) == name
+
+
+@pytest.mark.parametrize("line, name", [
+    ("2 cups fat free milk", "milk"),
+    ("1 cup fat-free sour cream", "sour cream"),
+    ("1 cup part-skim ricotta", "ricotta"),
+    ("1 pound sea bass fillets", "sea bass fillet"),
+    ("4 sea scallops", "sea scallop"),
+    ("1/2 teaspoon cream of tartar", "cream of tartar"),
+    ("1 can low fat cream of mushroom soup", "cream of mushroom soup"),
+])
+def test_phrases_are_kept_or_dropped_whole(line, name):
+    assert parse_line(line) == name
+
+
+def test_descriptor_only_pieces_parse_to_nothing():
+    assert parse_line("cut into 1-inch pieces") == ""
+    assert canonical_names("2 eggs, beaten, 1 cup flour") == ["egg", "flour"]
+
+
+def test_ingredient_lines_rejoins_trailing_clauses():
+    text = ("1 1/2 sticks unsalted butter, softened, Flaky sea salt, such as "
+            "Maldon, for sprinkling, 2 limes (juiced, about 1/4 cup)")
+    assert ingredient_lines(text) == [
+        "1 1/2 sticks unsalted butter, softened",
+        "Flaky sea salt, such as Maldon, for sprinkling",
+        "2 limes (juiced, about 1/4 cup)",
+    ]
@@ -0,0 +1,19 @@
+"""The int8 ONNX query encoder must embed like the PyTorch model."""
+import os
+
+import pytest
+
+from app.config import ONNX_ENCODER_DIR, RECOMMENDER_EMBEDDING_MODEL
+from app.jobs.export_onnx_encoder import MIN_COSINE, MODEL_FILE, check_equivalence
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("tokenizers")
+pytest.importorskip("torch")
+pytest.importorskip("sentence_transformers")
+
+
+@pytest.mark.skipif(not os.path.isfile(os.path.join(ONNX_ENCODER_DIR, MODEL_FILE)),
+                    reason="no ONNX export (python -m app.jobs.export_onnx_encoder)")
+def test_onnx_matches_pytorch():
+    check = check_equivalence(RECOMMENDER_EMBEDDING_MODEL, ONNX_ENCODER_DIR)
+    assert check["min_cos"] >= MIN_COSINE, check
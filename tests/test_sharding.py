@@ -0,0 +1,39 @@
+"""Shard workers score every row of a bundle catalog with appended segments."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import deps
+from app.services import recommender
+from app.services.catalog_ingest import build_segment_frame
+
+pytest.importorskip("pyarrow")
+
+PANTRY = "saffron, quinoa, garlic"
+
+
+def test_appended_bundle(catalog, monkeypatch, tmp_path):
+    from app.services.columnar import load_bundle, write_bundle
+    from app.services.sharding import ShardedRecommender
+
+    write_bundle(str(tmp_path), catalog)
+    bundle = load_bundle(str(tmp_path), version="test")
+    seg = build_segment_frame(pd.DataFrame({
+        "Title": [f"Saffron quinoa {i}" for i in range(20)],
+        "ingredients_text": ["saffron, quinoa, garlic, olive oil"] * 20,
+        "target_text": ["Simmer."] * 20,
+    }))
+    emb = np.random.default_rng(3).normal(size=(len(seg), 16)).astype(np.float32)
+    appended = bundle.appended(seg, emb)
+    assert appended.vdir is None and appended.bundle_rows == len(catalog)
+
+    monkeypatch.setattr(deps, "_catalog", appended)
+    monkeypatch.setattr(recommender, "CANDIDATE_POOL_SIZE", 0)
+    pool = ShardedRecommender(appended, 2)
+    try:
+        got = pool.recommend(PANTRY, top_k=10, mmr_lambda=1.0)
+    finally:
+        pool.close()
+    want = recommender.recommend_recipes(PANTRY, 10, diversity=1.0)
+    assert [r["id"] for r in got] == [r["id"] for r in want]
+    assert any(r["id"] >= len(catalog) for r in got)
@@ -0,0 +1,37 @@
+"""Per-user rankings match recommend_recipes and are keyed by rounded diversity."""
+from datetime import date, timedelta
+
+import pytest
+
+from app import models
+from app.services import recommender
+from app.services.pantry_weights import item_weight
+from app.services.user_recommendations import diversity_key, store
+
+
+def test_diversity_shares_rounded_keys(catalog, db):
+    assert diversity_key(None) is None
+    assert diversity_key(0.5012) == diversity_key(0.4989) == 0.5
+    assert diversity_key(-3) == 0.0 and diversity_key(7) == 1.0
+
+    db.add(models.PantryItem(user_id=1, name="rice"))
+    db.commit()
+    for i in range(50):
+        store.get(db, 1, top_k=5, diversity=0.3 + i * 1e-4)
+    assert list(store._load(db, 1).ranked) == [(None, (), 0.3)]
+
+
+@pytest.mark.parametrize("pool", [0, 20])
+def test_ranks_like_recommend_recipes(catalog, db, monkeypatch, pool):
+    monkeypatch.setattr(recommender, "CANDIDATE_POOL_SIZE", pool)
+    soon = date.today() + timedelta(days=1)
+    db.add_all([models.PantryItem(user_id=1, name="rice"),
+                models.PantryItem(user_id=1, name="garlic", expiry_date=soon),
+                models.PantryItem(user_id=1, name="tomato")])
+    db.commit()
+    weights = {w: 1.0 for w in catalog.query_words("rice, tomato")}
+    weights.update({w: item_weight(soon) for w in catalog.query_words("garlic")})
+
+    got = store.get(db, 1, top_k=8)
+    want = recommender.recommend_recipes("rice, garlic, tomato", 8, weights=weights)
+    assert got and [r["id"] for r in got] == [r["id"] for r in want]